@@ -0,0 +1,127 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from core.codec import DocumentResponse, dumps
+from core.config import settings
+from core.event_hub import event_hub
+from repositories import event_repository
+from repositories.event import FEED_FIELDS
+from schemas.event import EventPage
+
+router = APIRouter()
+
+
+def event_to_dict(event: dict) -> dict:
+    """Expand a stored event's one-letter fields (see repositories/event.py)"""
+    return {
+        "id": str(event["_id"]),
+        "type": event["k"],
+        "gig_id": event["g"],
+        "user_ids": event.get("u", []),
+        "application_id": event.get("a"),
+        "status": event.get("s"),
+        "reason": event.get("r"),
+        "created_at": event["_id"].generation_time.replace(tzinfo=None),
+    }
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[ObjectId]:
+    if not cursor:
+        return None
+    if not ObjectId.is_valid(cursor):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return ObjectId(cursor)
+
+
+async def feed_page(feed: str, key: str, before: Optional[str], limit: int) -> DocumentResponse:
+    # One extra event tells whether there is an older page
+    events = await event_repository.feed(feed, key, parse_cursor(before), limit + 1).to_list(None)
+    next_cursor = str(events[limit - 1]["_id"]) if len(events) > limit else None
+    return DocumentResponse(dumps({
+        "items": [event_to_dict(event) for event in events[:limit]],
+        "next_cursor": next_cursor,
+    }))
+
+
+def sse(event: dict) -> bytes:
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+        str(event["_id"]).encode(), event["k"].encode(), dumps(event_to_dict(event))
+    )
+
+
+async def event_stream(request: Request, feed: str, key: str, after: Optional[ObjectId]) -> AsyncIterator[bytes]:
+    """Server-sent events of a feed: missed events since ``after`` first, then new ones as recorded"""
+    # Subscribed before catching up, so nothing recorded in between is missed
+    with event_hub.subscribe([f"{FEED_FIELDS[feed]}:{key}"]) as subscription:
+        caught_up = set()
+        last_id = after
+        while last_id is not None:
+            missed = await event_repository.since(feed, key, last_id, settings.activity_max_page_size).to_list(None)
+            for event in missed:
+                caught_up.add(event["_id"])
+                last_id = event["_id"]
+                yield sse(event)
+            if len(missed) < settings.activity_max_page_size:
+                break
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), settings.activity_stream_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                return  # Fell too far behind; the client reconnects with Last-Event-ID
+            if event["_id"] in caught_up:
+                continue  # Already sent while catching up
+            yield sse(event)
+
+
+def stream_response(request: Request, feed: str, key: str) -> StreamingResponse:
+    after = parse_cursor(request.headers.get("last-event-id") or request.query_params.get("after"))
+    return StreamingResponse(
+        event_stream(request, feed, key, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/activity/users/{user_id}", response_model=EventPage)
+async def get_user_activity(
+    user_id: str,
+    before: Optional[str] = None,
+    limit: int = Query(settings.activity_page_size, ge=1, le=settings.activity_max_page_size),
+):
+    """Activity on a user's gigs and applications, newest first; page with ``before``"""
+    return await feed_page("user", user_id, before, limit)
+
+
+@router.get("/activity/gigs/{gig_id}", response_model=EventPage)
+async def get_gig_activity(
+    gig_id: str,
+    before: Optional[str] = None,
+    limit: int = Query(settings.activity_page_size, ge=1, le=settings.activity_max_page_size),
+):
+    """Activity on a gig and its applications, newest first; page with ``before``"""
+    return await feed_page("gig", gig_id, before, limit)
+
+
+@router.get("/activity/users/{user_id}/stream")
+async def stream_user_activity(user_id: str, request: Request):
+    """Live activity of a user as server-sent events; resumes after Last-Event-ID"""
+    return stream_response(request, "user", user_id)
+
+
+@router.get("/activity/gigs/{gig_id}/stream")
+async def stream_gig_activity(gig_id: str, request: Request):
+    """Live activity of a gig as server-sent events; resumes after Last-Event-ID"""
+    return stream_response(request, "gig", gig_id)
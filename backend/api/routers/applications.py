@@ -1,11 +1,19 @@
+import logging
+
 from fastapi import APIRouter, HTTPException, status
 from bson import ObjectId
-from core.database import applications_collection, gigs_collection
+from core.codec import DocumentCodec
+from repositories import application_repository, event_repository, gig_repository, student_repository
 from schemas.application import ApplicationCreate, ApplicationResponse
+from schemas.batch import BatchRequest, BatchResponse
 from .notifications import create_or_update_application_notification, create_application_status_notification
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+application_codec = DocumentCodec(ApplicationResponse)
+
 
 @router.post("/applications", response_model=ApplicationResponse, status_code=status.HTTP_201_CREATED)
 async def create_application(application: ApplicationCreate):
@@ -15,15 +23,24 @@ async def create_application(application: ApplicationCreate):
     application_dict = application.model_dump()
     application_dict["status"] = "pending"
     application_dict["applied_at"] = datetime.utcnow()
-    
-    print(f"Creating application: gig_id={application_dict.get('gig_id')}, student_id={application_dict.get('student_id')}")
-    
-    result = await applications_collection.insert_one(application_dict)
-    created_application = await applications_collection.find_one({"_id": result.inserted_id})
+    if not application_dict.get("student_id"):
+        # Resolve student_id from the e-mail when the student is registered; otherwise the
+        # application stays e-mail only until backfill_student_ids.py is rerun
+        student = await student_repository.by_email(application_dict["student_email"])
+        if student:
+            application_dict["student_id"] = str(student["_id"])
+    
+    application_id = await application_repository.insert(application_dict)
+    logger.info("Application created", extra={
+        "application_id": str(application_id),
+        "gig_id": application_dict.get("gig_id"),
+        "student_id": application_dict.get("student_id"),
+    })
+    created_application = await application_repository.get(application_id)
     created_application["id"] = str(created_application["_id"])
     
     # Get gig details for notification
-    gig = await gigs_collection.find_one({"_id": ObjectId(application_dict["gig_id"])})
+    gig = await gig_repository.load(application_dict["gig_id"])
     if gig:
         # Create or update notification for professor
         await create_or_update_application_notification(
@@ -35,28 +52,31 @@ async def create_application(application: ApplicationCreate):
     return created_application
 
 
+@router.post("/applications/batch", response_model=BatchResponse[ApplicationResponse])
+async def get_applications_batch(request: BatchRequest):
+    """Get several applications by ID in one request, in the order requested"""
+    applications = await application_repository.get_many(request.ids, application_codec.projection)
+    return application_codec.response(application_codec.batch(request.ids, applications))
+
+
 @router.get("/applications/gig/{gig_id}", response_model=list[ApplicationResponse])
 async def get_gig_applications(gig_id: str):
     """Get all applications for a specific gig"""
-    applications = []
-    async for application in applications_collection.find({"gig_id": gig_id}):
-        application["id"] = str(application["_id"])
-        applications.append(application)
-    return applications
+    applications = [
+        application_codec.to_dict(application)
+        async for application in application_repository.for_gig(gig_id, application_codec.projection)
+    ]
+    return application_codec.response(applications)
 
 
 @router.get("/applications/check/{gig_id}/{student_id}")
 async def check_application_exists(gig_id: str, student_id: str):
     """Check if a student has already applied to a gig"""
-    print(f"Checking application: gig_id={gig_id}, student_id={student_id}")
-    
-    existing = await applications_collection.find_one({
-        "gig_id": gig_id,
-        "student_id": student_id
+    existing = await application_repository.find_existing(gig_id, student_id)
+    logger.debug("Checked application", extra={
+        "gig_id": gig_id, "student_id": student_id, "has_applied": existing is not None
     })
     
-    print(f"Found existing application: {existing is not None}")
-    
     if existing:
         existing["id"] = str(existing["_id"])
         del existing["_id"]
@@ -68,8 +88,6 @@ async def check_application_exists(gig_id: str, student_id: str):
 @router.put("/applications/{application_id}/status")
 async def update_application_status(application_id: str, status: str):
     """Update application status (accept/reject)"""
-    print(f"Updating application {application_id} to status: {status}")
-    
     if not ObjectId.is_valid(application_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -83,36 +101,38 @@ async def update_application_status(application_id: str, status: str):
         )
     
     # Get application before update to get student_id and gig_id
-    application_before = await applications_collection.find_one({"_id": ObjectId(application_id)})
+    application_before = await application_repository.get(application_id)
     if not application_before:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found"
         )
     
-    result = await applications_collection.update_one(
-        {"_id": ObjectId(application_id)},
-        {"$set": {"status": status}}
-    )
-    
-    print(f"Update result: matched={result.matched_count}, modified={result.modified_count}")
-    
-    if result.matched_count == 0:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
+    application = await application_repository.update_and_get(application_id, {"status": status})
     
-    application = await applications_collection.find_one({"_id": ObjectId(application_id)})
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found after update"
         )
     
-    # Create notification for student if status changed
-    if status in ["accepted", "rejected"]:
-        gig = await gigs_collection.find_one({"_id": ObjectId(application_before["gig_id"])})
+    logger.info("Application status updated", extra={
+        "application_id": application_id,
+        "gig_id": application_before["gig_id"],
+        "previous_status": application_before.get("status"),
+        "status": status,
+    })
+    
+    # Record the event and notify the student only when the status actually changed
+    if status in ["accepted", "rejected"] and application_before.get("status") != status:
+        gig = await gig_repository.load(application_before["gig_id"])
+        await event_repository.record(
+            f"application_{status}",
+            application_before["gig_id"],
+            [application_before.get("student_id"), gig and gig.get("professor_id")],
+            status=status,
+            application_id=application_id,
+        )
         if gig:
             await create_application_status_notification(
                 student_id=application_before["student_id"],
@@ -123,5 +143,5 @@ async def update_application_status(application_id: str, status: str):
     
     application["id"] = str(application["_id"])
     del application["_id"]
-    print(f"Returning application: {application}")
+    logger.debug("Returning application", extra={"application_id": application_id, "status": status})
     return application
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, status
 from bson import ObjectId
-from core.database import professors_collection
+from pymongo.errors import DuplicateKeyError
+from repositories import professor_repository
 from core.auth import verify_password, get_password_hash, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from schemas.auth import LoginRequest, RegisterRequest, Token
 from schemas.professor import ProfessorResponse
@@ -12,14 +13,6 @@ router = APIRouter()
 @router.post("/register", response_model=ProfessorResponse, status_code=status.HTTP_201_CREATED)
 async def register(request: RegisterRequest):
     """Register a new professor"""
-    # Check if email already exists
-    existing = await professors_collection.find_one({"email": request.email})
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
     # Hash the password
     hashed_password = get_password_hash(request.password)
     
@@ -36,8 +29,16 @@ async def register(request: RegisterRequest):
         "previous_publications": request.previous_publications,
     }
     
-    result = await professors_collection.insert_one(professor_dict)
-    created_professor = await professors_collection.find_one({"_id": result.inserted_id})
+    # The unique index on email rejects duplicates, no pre-check needed
+    try:
+        professor_id = await professor_repository.insert(professor_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    created_professor = await professor_repository.get(professor_id)
     created_professor["id"] = str(created_professor["_id"])
     
     return created_professor
@@ -47,7 +48,7 @@ async def register(request: RegisterRequest):
 async def login(request: LoginRequest):
     """Login with email and password"""
     # Find professor by email
-    professor = await professors_collection.find_one({"email": request.email})
+    professor = await professor_repository.by_email(request.email)
     
     if not professor:
         raise HTTPException(
@@ -95,7 +96,7 @@ async def get_current_user(token: str):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    professor = await professors_collection.find_one({"email": email})
+    professor = await professor_repository.by_email(email)
     if professor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,18 +1,32 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
 from bson import ObjectId
-from core.database import gigs_collection
+from core.codec import DocumentCodec, DocumentResponse, dumps
+from core.config import settings
+from core.singleflight import SingleFlight
+from repositories import event_repository, gig_repository
+from schemas.batch import BatchRequest, BatchResponse
 from schemas.gig import GigCreate, GigUpdate, GigClose, GigHold, GigResponse
+from .notifications import notify_saved_search_matches
 
 router = APIRouter()
 
+gig_codec = DocumentCodec(GigResponse)
+
+# Students hit the same listing and the same gigs at once when new gigs are announced;
+# concurrent identical reads share one query and one encoded body
+list_gigs_flight = SingleFlight("list_all_gigs")
+get_gig_flight = SingleFlight("get_gig")
+
 
 @router.post("/gigs", response_model=GigResponse, status_code=status.HTTP_201_CREATED)
-async def create_gig(gig: GigCreate):
+async def create_gig(gig: GigCreate, background_tasks: BackgroundTasks):
     """Create a new gig"""
     gig_dict = gig.model_dump()
     gig_dict["status"] = "open"  # Set default status
-    result = await gigs_collection.insert_one(gig_dict)
-    created_gig = await gigs_collection.find_one({"_id": result.inserted_id})
+    gig_id = await gig_repository.insert(gig_dict)
+    created_gig = await gig_repository.get(gig_id)
+    # Matched against saved searches after the response is sent
+    background_tasks.add_task(notify_saved_search_matches, created_gig)
     created_gig["id"] = str(created_gig["_id"])
     return created_gig
 
@@ -20,27 +34,32 @@ async def create_gig(gig: GigCreate):
 @router.get("/gigs", response_model=list[GigResponse])
 async def list_all_gigs(status: str = None, professor_id: str = None):
     """List all gigs (public endpoint for students) with optional filters"""
-    query = {}
-    if status:
-        query["status"] = status
-    if professor_id:
-        query["professor_id"] = professor_id
-    
-    gigs = []
-    async for gig in gigs_collection.find(query):
-        gig["id"] = str(gig["_id"])
-        gigs.append(gig)
-    return gigs
+    status, professor_id = status or None, professor_id or None
+
+    async def query() -> bytes:
+        return dumps([
+            gig_codec.to_dict(gig)
+            async for gig in gig_repository.list(status, professor_id, gig_codec.projection)
+        ])
+
+    return DocumentResponse(await list_gigs_flight.do((status, professor_id), query))
+
+
+@router.post("/gigs/batch", response_model=BatchResponse[GigResponse])
+async def get_gigs_batch(request: BatchRequest):
+    """Get several gigs by ID in one request, in the order requested"""
+    gigs = await gig_repository.get_many(request.ids, gig_codec.projection)
+    return gig_codec.response(gig_codec.batch(request.ids, gigs))
 
 
 @router.get("/gigs/professor/{professor_id}", response_model=list[GigResponse])
 async def get_professor_gigs(professor_id: str):
     """Get all gigs for a specific professor"""
-    gigs = []
-    async for gig in gigs_collection.find({"professor_id": professor_id}):
-        gig["id"] = str(gig["_id"])
-        gigs.append(gig)
-    return gigs
+    gigs = [
+        gig_codec.to_dict(gig)
+        async for gig in gig_repository.by_professor(professor_id, gig_codec.projection)
+    ]
+    return gig_codec.response(gigs)
 
 
 @router.get("/gigs/{gig_id}", response_model=GigResponse)
@@ -52,14 +71,39 @@ async def get_gig(gig_id: str):
             detail="Invalid gig ID"
         )
     
-    gig = await gigs_collection.find_one({"_id": ObjectId(gig_id)})
+    async def query() -> bytes:
+        gig = await gig_repository.get(gig_id, gig_codec.projection)
+        if not gig:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Gig not found"
+            )
+        return dumps(gig_codec.to_dict(gig))
+
+    return DocumentResponse(await get_gig_flight.do(gig_id.lower(), query))
+
+
+@router.get("/gigs/{gig_id}/similar", response_model=list[GigResponse])
+async def get_similar_gigs(
+    gig_id: str,
+    limit: int = Query(settings.similar_gigs_limit, ge=1, le=settings.similar_gigs_max_limit),
+):
+    """Open gigs similar to this one in description, technologies and area of study"""
+    if not ObjectId.is_valid(gig_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid gig ID"
+        )
+    
+    gig = await gig_repository.get(gig_id, {"lsh_bands": 1, "description": 1, "technologies": 1, "area_of_study": 1})
     if not gig:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gig not found"
         )
-    gig["id"] = str(gig["_id"])
-    return gig
+    
+    similar = await gig_repository.similar(gig, limit, gig_codec.projection)
+    return gig_codec.response(gig_codec.to_list(similar))
 
 
 @router.put("/gigs/{gig_id}", response_model=GigResponse)
@@ -79,18 +123,13 @@ async def update_gig(gig_id: str, gig_update: GigUpdate):
             detail="No fields to update"
         )
     
-    result = await gigs_collection.update_one(
-        {"_id": ObjectId(gig_id)},
-        {"$set": update_data}
-    )
-    
-    if result.matched_count == 0:
+    gig = await gig_repository.update_and_get(gig_id, update_data)
+    if not gig:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gig not found"
         )
     
-    gig = await gigs_collection.find_one({"_id": ObjectId(gig_id)})
     gig["id"] = str(gig["_id"])
     return gig
 
@@ -110,18 +149,14 @@ async def close_gig(gig_id: str, close_data: GigClose):
     if close_data.publication_venue:
         update_dict["publication_venue"] = close_data.publication_venue
     
-    result = await gigs_collection.update_one(
-        {"_id": ObjectId(gig_id)},
-        {"$set": update_dict}
-    )
-    
-    if result.matched_count == 0:
+    gig = await gig_repository.update_and_get(gig_id, update_dict)
+    if not gig:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gig not found"
         )
     
-    gig = await gigs_collection.find_one({"_id": ObjectId(gig_id)})
+    await event_repository.record("gig_closed", gig_id, [gig.get("professor_id")], status="closed")
     gig["id"] = str(gig["_id"])
     return gig
 
@@ -135,24 +170,25 @@ async def put_gig_on_hold(gig_id: str, hold_data: GigHold):
             detail="Invalid gig ID"
         )
     
-    result = await gigs_collection.update_one(
-        {"_id": ObjectId(gig_id)},
-        {"$set": {"status": "on-hold", "paused_reason": hold_data.paused_reason}}
+    gig = await gig_repository.update_and_get(
+        gig_id,
+        {"status": "on-hold", "paused_reason": hold_data.paused_reason}
     )
-    
-    if result.matched_count == 0:
+    if not gig:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gig not found"
         )
     
-    gig = await gigs_collection.find_one({"_id": ObjectId(gig_id)})
+    await event_repository.record(
+        "gig_on_hold", gig_id, [gig.get("professor_id")], status="on-hold", reason=hold_data.paused_reason
+    )
     gig["id"] = str(gig["_id"])
     return gig
 
 
 @router.put("/gigs/{gig_id}/activate", response_model=GigResponse)
-async def activate_gig(gig_id: str):
+async def activate_gig(gig_id: str, background_tasks: BackgroundTasks):
     """Activate gig from on-hold status"""
     if not ObjectId.is_valid(gig_id):
         raise HTTPException(
@@ -160,18 +196,16 @@ async def activate_gig(gig_id: str):
             detail="Invalid gig ID"
         )
     
-    result = await gigs_collection.update_one(
-        {"_id": ObjectId(gig_id)},
-        {"$set": {"status": "open", "paused_reason": None}}
-    )
-    
-    if result.matched_count == 0:
+    gig = await gig_repository.update_and_get(gig_id, {"status": "open", "paused_reason": None})
+    if not gig:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gig not found"
         )
     
-    gig = await gigs_collection.find_one({"_id": ObjectId(gig_id)})
+    await event_repository.record("gig_activated", gig_id, [gig.get("professor_id")], status="open")
+    # A no-op for gigs whose alerts already went out when they were first opened
+    background_tasks.add_task(notify_saved_search_matches, gig)
     gig["id"] = str(gig["_id"])
     return gig
 
@@ -185,9 +219,7 @@ async def delete_gig(gig_id: str):
             detail="Invalid gig ID"
         )
     
-    result = await gigs_collection.delete_one({"_id": ObjectId(gig_id)})
-    
-    if result.deleted_count == 0:
+    if not await gig_repository.delete(gig_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gig not found"
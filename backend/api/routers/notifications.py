@@ -1,32 +1,30 @@
 from fastapi import APIRouter, HTTPException, status
 from bson import ObjectId
 from typing import List
-from core.database import notifications_collection
+from core.codec import DocumentCodec
+from core.config import settings
+from repositories import gig_repository, notification_repository, saved_search_repository
 from schemas.notification import NotificationCreate, NotificationResponse
 
 router = APIRouter()
 
+notification_codec = DocumentCodec(NotificationResponse)
+
 
 @router.get("/notifications/{user_id}", response_model=List[NotificationResponse])
 async def get_user_notifications(user_id: str):
     """Get all notifications for a user"""
-    notifications = []
-    async for notification in notifications_collection.find(
-        {"user_id": user_id}
-    ).sort("created_at", -1):  # Most recent first
-        notification["id"] = str(notification["_id"])
-        del notification["_id"]
-        notifications.append(notification)
-    return notifications
+    notifications = [
+        notification_codec.to_dict(notification)
+        async for notification in notification_repository.for_user(user_id, notification_codec.projection)
+    ]
+    return notification_codec.response(notifications)
 
 
 @router.get("/notifications/{user_id}/unread")
 async def get_unread_count(user_id: str):
     """Get count of unread notifications"""
-    count = await notifications_collection.count_documents({
-        "user_id": user_id,
-        "read": False
-    })
+    count = await notification_repository.unread_count(user_id)
     return {"unread_count": count}
 
 
@@ -39,12 +37,7 @@ async def mark_notification_as_read(notification_id: str):
             detail="Invalid notification ID"
         )
     
-    result = await notifications_collection.update_one(
-        {"_id": ObjectId(notification_id)},
-        {"$set": {"read": True}}
-    )
-    
-    if result.matched_count == 0:
+    if not await notification_repository.update(notification_id, {"read": True}):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
@@ -56,12 +49,9 @@ async def mark_notification_as_read(notification_id: str):
 @router.put("/notifications/{user_id}/mark-all-read")
 async def mark_all_as_read(user_id: str):
     """Mark all notifications as read for a user"""
-    result = await notifications_collection.update_many(
-        {"user_id": user_id, "read": False},
-        {"$set": {"read": True}}
-    )
+    modified_count = await notification_repository.mark_all_read(user_id)
     
-    return {"success": True, "modified_count": result.modified_count}
+    return {"success": True, "modified_count": modified_count}
 
 
 @router.delete("/notifications/{notification_id}")
@@ -73,11 +63,7 @@ async def delete_notification(notification_id: str):
             detail="Invalid notification ID"
         )
     
-    result = await notifications_collection.delete_one(
-        {"_id": ObjectId(notification_id)}
-    )
-    
-    if result.deleted_count == 0:
+    if not await notification_repository.delete(notification_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
@@ -91,29 +77,18 @@ async def create_or_update_application_notification(professor_id: str, gig_id: s
     from datetime import datetime
     
     # Check if there's already a pending application notification for this gig
-    existing = await notifications_collection.find_one({
-        "user_id": professor_id,
-        "user_type": "professor",
-        "metadata.gig_id": gig_id,
-        "metadata.notification_type": "new_applications",
-        "read": False
-    })
+    existing = await notification_repository.unread_application_notice(professor_id, gig_id)
     
     if existing:
         # Update existing notification - increment count
         current_count = existing.get("metadata", {}).get("count", 1)
         new_count = current_count + 1
         
-        await notifications_collection.update_one(
-            {"_id": existing["_id"]},
-            {
-                "$set": {
-                    "message": f"You have {new_count} new applications for {gig_title}",
-                    "created_at": datetime.utcnow(),
-                    "metadata.count": new_count
-                }
-            }
-        )
+        await notification_repository.update(existing["_id"], {
+            "message": f"You have {new_count} new applications for {gig_title}",
+            "created_at": datetime.utcnow(),
+            "metadata.count": new_count
+        })
     else:
         # Create new notification
         notification = {
@@ -131,7 +106,7 @@ async def create_or_update_application_notification(professor_id: str, gig_id: s
             },
             "created_at": datetime.utcnow()
         }
-        await notifications_collection.insert_one(notification)
+        await notification_repository.insert(notification)
 
 
 async def create_application_status_notification(
@@ -176,4 +151,34 @@ async def create_application_status_notification(
     else:
         return  # Don't create notification for pending status
     
-    await notifications_collection.insert_one(notification)
+    await notification_repository.insert(notification)
+
+
+async def notify_saved_search_matches(gig: dict):
+    """Notify every student with a saved search matching a newly opened gig, once per gig"""
+    from datetime import datetime
+
+    if not await gig_repository.claim_alerts(gig["_id"]):
+        return
+    student_ids = await saved_search_repository.matching_students(gig)
+    gig_id = str(gig["_id"])
+    created_at = datetime.utcnow()
+    batch_size = settings.saved_search_alert_batch_size
+    for start in range(0, len(student_ids), batch_size):
+        await notification_repository.insert_many([
+            {
+                "user_id": student_id,
+                "user_type": "student",
+                "title": "New Gig For You",
+                "message": f"{gig['title']} matches one of your saved searches",
+                "type": "info",
+                "read": False,
+                "link": f"/student/gigs/{gig_id}",
+                "metadata": {
+                    "gig_id": gig_id,
+                    "notification_type": "saved_search_match"
+                },
+                "created_at": created_at
+            }
+            for student_id in student_ids[start:start + batch_size]
+        ], ordered=False)
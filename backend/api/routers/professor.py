@@ -1,25 +1,33 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, status
 from bson import ObjectId
-from core.database import professors_collection
+from pymongo.errors import DuplicateKeyError
+from core.codec import DocumentCodec, DocumentResponse, dumps
+from core.config import settings
+from repositories import gig_repository, professor_repository
+from schemas.application import ApplicantInbox, ApplicationSummary, InboxApplication
 from schemas.professor import ProfessorCreate, ProfessorUpdate, ProfessorResponse
 
 router = APIRouter()
 
+professor_codec = DocumentCodec(ProfessorResponse)
+inbox_codecs = {"summary": DocumentCodec(ApplicationSummary), "full": DocumentCodec(InboxApplication)}
+
 
 @router.post("/professors", response_model=ProfessorResponse, status_code=status.HTTP_201_CREATED)
 async def create_professor(professor: ProfessorCreate):
     """Create a new professor profile"""
-    # Check if email already exists
-    existing = await professors_collection.find_one({"email": professor.email})
-    if existing:
+    professor_dict = professor.model_dump()
+    # The unique index on email rejects duplicates, no pre-check needed
+    try:
+        professor_id = await professor_repository.insert(professor_dict)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Professor with this email already exists"
         )
     
-    professor_dict = professor.model_dump()
-    result = await professors_collection.insert_one(professor_dict)
-    created_professor = await professors_collection.find_one({"_id": result.inserted_id})
+    created_professor = await professor_repository.get(professor_id)
     created_professor["id"] = str(created_professor["_id"])
     return created_professor
 
@@ -33,7 +41,7 @@ async def get_professor(professor_id: str):
             detail="Invalid professor ID"
         )
     
-    professor = await professors_collection.find_one({"_id": ObjectId(professor_id)})
+    professor = await professor_repository.get(professor_id)
     if not professor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,27 +68,81 @@ async def update_professor(professor_id: str, professor_update: ProfessorUpdate)
             detail="No fields to update"
         )
     
-    result = await professors_collection.update_one(
-        {"_id": ObjectId(professor_id)},
-        {"$set": update_data}
-    )
+    try:
+        professor = await professor_repository.update_and_get(professor_id, update_data)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Professor with this email already exists"
+        )
     
-    if result.matched_count == 0:
+    if not professor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Professor not found"
         )
     
-    professor = await professors_collection.find_one({"_id": ObjectId(professor_id)})
     professor["id"] = str(professor["_id"])
     return professor
 
 
+@router.get("/professors/{professor_id}/applications", response_model=ApplicantInbox)
+async def get_professor_applications(
+    professor_id: str,
+    application_status: Optional[Literal["pending", "accepted", "rejected"]] = Query(None, alias="status"),
+    gig_id: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = Query(settings.inbox_page_size, ge=1, le=settings.inbox_max_page_size),
+    view: Literal["summary", "full"] = "summary",
+):
+    """Applications to all of a professor's gigs, newest first; page with ``before``"""
+    for value, name in ((professor_id, "professor ID"), (gig_id, "gig ID"), (before, "cursor")):
+        if value is not None and not ObjectId.is_valid(value):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid {name}"
+            )
+    
+    codec = inbox_codecs[view]
+    # One extra application tells whether there is an older page
+    applications = await gig_repository.applicant_inbox(
+        professor_id,
+        status=application_status,
+        gig_id=gig_id,
+        before=ObjectId(before) if before else None,
+        limit=limit + 1,
+        projection=codec.projection,
+    ).to_list(None)
+    next_cursor = str(applications[limit - 1]["_id"]) if len(applications) > limit else None
+    return DocumentResponse(dumps({"items": codec.to_list(applications[:limit]), "next_cursor": next_cursor}))
+
+
 @router.get("/professors", response_model=list[ProfessorResponse])
-async def list_professors():
-    """List all professors"""
-    professors = []
-    async for professor in professors_collection.find():
-        professor["id"] = str(professor["_id"])
-        professors.append(professor)
-    return professors
+async def list_professors(
+    department: Optional[str] = None,
+    college_name: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100, description="Prefix search over name and research areas"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.directory_page_size, ge=1, le=settings.directory_max_page_size),
+):
+    """List professors by name, one page at a time, with optional filters and search"""
+    # The unfiltered first page is what nearly every visitor loads, so it is served from cache
+    default_page = not (department or college_name or (q and q.strip()) or skip) and limit == settings.directory_page_size
+    cache = professor_repository.directory_cache
+    if default_page:
+        cached = cache.get("default")
+        if cached is not None:
+            return DocumentResponse(cached)
+        # A professor written while the page is read invalidates the cache; don't store the stale page
+        generation = cache.generation
+
+    professors = [
+        professor_codec.to_dict(professor)
+        async for professor in professor_repository.directory(
+            department, college_name, q, skip, limit, professor_codec.projection
+        )
+    ]
+    response = professor_codec.response(professors)
+    if default_page:
+        cache.set("default", response.body, generation)
+    return response
@@ -0,0 +1,231 @@
+import re
+import zipfile
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response, StreamingResponse
+
+from core.config import settings
+from core.storage import FileTooLarge, StoredFile, get_storage
+from repositories import application_repository, gig_repository, student_repository, to_object_id
+from schemas.resume import ResumeInfo
+
+router = APIRouter()
+
+RESUME_CONTENT_TYPES = {
+    "application/pdf": ".pdf",
+    "application/msword": ".doc",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+}
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+_UNSAFE_FILENAME = re.compile(r"[^\w.\- ]+")
+
+
+def resume_url(student_id: str) -> str:
+    return f"/api/students/{student_id}/resume"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end inclusive) of a single-range Range header; None to send the whole file
+
+    Raises 416 for a range outside the file. Multi-range requests get the whole file,
+    which RFC 9110 allows.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def safe_filename(name: str) -> str:
+    return _UNSAFE_FILENAME.sub("_", name).strip() or "resume"
+
+
+async def student_resume(student_id: str) -> StoredFile:
+    student = await student_repository.get(student_id, {"resume_file_id": 1})
+    if not student:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    stored = await get_storage().info(student["resume_file_id"]) if student.get("resume_file_id") else None
+    if stored is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No resume uploaded")
+    return stored
+
+
+@router.put("/students/{student_id}/resume", response_model=ResumeInfo)
+async def upload_resume(student_id: str, request: Request, filename: str = "resume.pdf"):
+    """Upload a student's resume as the raw request body, replacing any previous one"""
+    if to_object_id(student_id) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid student ID")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in RESUME_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Resume must be one of: {', '.join(RESUME_CONTENT_TYPES)}"
+        )
+    max_bytes = settings.resume_max_bytes
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Resume larger than {max_bytes // (1024 * 1024)} MiB"
+        )
+    student = await student_repository.get(student_id, {"resume_file_id": 1})
+    if not student:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+
+    storage = get_storage()
+    try:
+        # Written chunk by chunk as the body arrives; chunked uploads are capped while streaming
+        stored = await storage.save(request.stream(), safe_filename(filename), content_type, max_bytes)
+    except FileTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Resume larger than {max_bytes // (1024 * 1024)} MiB"
+        )
+    if stored.length == 0:
+        await storage.delete(stored.id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty resume")
+
+    await student_repository.update(student_id, {"resume_file_id": stored.id, "resume_url": resume_url(student_id)})
+    if student.get("resume_file_id"):
+        await storage.delete(student["resume_file_id"])
+
+    return ResumeInfo(
+        file_id=stored.id,
+        filename=stored.filename,
+        content_type=stored.content_type,
+        size=stored.length,
+        etag=stored.etag,
+        uploaded_at=stored.uploaded_at,
+        resume_url=resume_url(student_id),
+    )
+
+
+@router.get("/students/{student_id}/resume")
+async def download_resume(student_id: str, request: Request):
+    """Download a student's resume; supports Range, If-Range and If-None-Match"""
+    stored = await student_resume(student_id)
+    etag = f'"{stored.etag}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'inline; filename="{stored.filename}"',
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if not if_range or if_range.strip() == etag:
+        # A stale If-Range validator means the client's partial copy is outdated: send it all
+        byte_range = parse_range(request.headers.get("range"), stored.length)
+
+    storage = get_storage()
+    if byte_range is None:
+        headers["Content-Length"] = str(stored.length)
+        return StreamingResponse(storage.read(stored.id), media_type=stored.content_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stored.length}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        storage.read(stored.id, start, end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=stored.content_type,
+        headers=headers,
+    )
+
+
+class _ZipSink:
+    """Write-only, non-seekable target for ZipFile; bytes are taken out as they are written"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def zip_stream(entries: List[Tuple[str, StoredFile]]) -> AsyncIterator[bytes]:
+    """A zip archive of stored files, produced while the files are read
+
+    The archive is written to a non-seekable sink, so ZipFile puts sizes and CRCs in data
+    descriptors after each entry and nothing has to be buffered. Entries are stored
+    uncompressed: PDF and DOCX content is already compressed.
+    """
+    storage = get_storage()
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, stored in entries:
+            info = zipfile.ZipInfo(name, date_time=stored.uploaded_at.timetuple()[:6])
+            with archive.open(info, "w", force_zip64=stored.length >= zipfile.ZIP64_LIMIT) as entry:
+                async for chunk in storage.read(stored.id):
+                    entry.write(chunk)
+                    yield sink.take()
+            yield sink.take()
+    yield sink.take()
+
+
+@router.get("/gigs/{gig_id}/resumes.zip")
+async def download_gig_resumes(gig_id: str):
+    """Download the uploaded resumes of everyone who applied to a gig as one zip archive"""
+    gig = await gig_repository.get(gig_id, {"title": 1})
+    if not gig:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Gig not found")
+
+    student_ids = [
+        application["student_id"]
+        async for application in application_repository.for_gig(gig_id, {"student_id": 1})
+        if application.get("student_id")
+    ]
+    students = await student_repository.get_many(student_ids, {"name": 1, "reg_no": 1, "resume_file_id": 1})
+
+    students = [student for student in students if student and student.get("resume_file_id")]
+    # Every file's metadata in one query before the archive starts
+    stored_files = await get_storage().info_many(student["resume_file_id"] for student in students)
+    entries, names = [], set()
+    for student in students:
+        stored = stored_files.get(student["resume_file_id"])
+        if stored is None:
+            continue
+        extension = RESUME_CONTENT_TYPES.get(stored.content_type, "")
+        name = safe_filename(f"{student['name']} - {student.get('reg_no', student['_id'])}") + extension
+        if name in names:
+            name = safe_filename(f"{student['name']} - {student['_id']}") + extension
+        names.add(name)
+        entries.append((name, stored))
+    if not entries:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No uploaded resumes for this gig")
+
+    archive_name = safe_filename(f"{gig['title']} resumes") + ".zip"
+    return StreamingResponse(
+        zip_stream(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{archive_name}"'},
+    )
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, status
+from bson import ObjectId
+from datetime import datetime
+from typing import List
+
+from core.codec import DocumentCodec
+from core.config import settings
+from repositories import saved_search_repository, student_repository
+from schemas.saved_search import SavedSearchCreate, SavedSearchResponse
+
+router = APIRouter()
+
+saved_search_codec = DocumentCodec(SavedSearchResponse)
+
+
+@router.post(
+    "/students/{student_id}/saved-searches",
+    response_model=SavedSearchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_saved_search(student_id: str, search: SavedSearchCreate):
+    """Save a search; the student is notified of new gigs that match it"""
+    if not ObjectId.is_valid(student_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid student ID"
+        )
+    if not await student_repository.get(student_id, {"_id": 1}):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    if not await student_repository.reserve_saved_search(student_id, settings.saved_searches_per_student):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.saved_searches_per_student} saved searches per student"
+        )
+
+    document = {**search.model_dump(), "student_id": student_id, "created_at": datetime.utcnow()}
+    try:
+        document["_id"] = await saved_search_repository.insert(document)
+    except BaseException:
+        await student_repository.release_saved_search(student_id)
+        raise
+    return saved_search_codec.response(saved_search_codec.to_dict(document), status.HTTP_201_CREATED)
+
+
+@router.get("/students/{student_id}/saved-searches", response_model=List[SavedSearchResponse])
+async def list_saved_searches(student_id: str):
+    """Get a student's saved searches, oldest first"""
+    searches = [
+        saved_search_codec.to_dict(search)
+        async for search in saved_search_repository.for_student(student_id, saved_search_codec.projection)
+    ]
+    return saved_search_codec.response(searches)
+
+
+@router.delete("/students/{student_id}/saved-searches/{search_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_saved_search(student_id: str, search_id: str):
+    """Delete one of a student's saved searches"""
+    if not ObjectId.is_valid(search_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid saved search ID"
+        )
+
+    if not await saved_search_repository.delete_for_student(student_id, search_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Saved search not found"
+        )
+    await student_repository.release_saved_search(student_id)
+
+    return None
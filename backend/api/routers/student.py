@@ -4,14 +4,29 @@ from typing import List
 from datetime import datetime
 import hashlib
 
-from core.database import database, professors_collection, gigs_collection, applications_collection
-from schemas.student import StudentCreate, StudentResponse, StudentLogin, StudentUpdate
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from core.codec import DocumentCodec
+from core.database import duplicate_key_field
+from repositories import application_repository, gig_repository, student_repository
+from schemas.student import (
+    StudentCreate, StudentResponse, StudentLogin, StudentUpdate, StudentImportError, StudentImportResult
+)
+from schemas.batch import BatchRequest, BatchResponse
 from core.auth import create_access_token
 
 router = APIRouter()
 
-# Create students collection reference
-students_collection = database["students"]
+student_codec = DocumentCodec(StudentResponse)
+
+# Upper bound on rows accepted by a single roster import request
+MAX_IMPORT_BATCH = 5000
+
+# Error messages for the unique indexes on the students collection
+DUPLICATE_STUDENT_DETAILS = {
+    "email": "Email already registered",
+    "reg_no": "Registration number already exists",
+}
 
 
 def hash_password(password: str) -> str:
@@ -40,43 +55,95 @@ def student_doc_to_response(doc) -> dict:
     }
 
 
+def build_student_document(student: StudentCreate) -> dict:
+    """Build the stored document for a new student"""
+    student_dict = student.model_dump(exclude={"password"})
+    student_dict["password"] = hash_password(student.password)
+    student_dict["skills"] = []
+    student_dict["resume_url"] = None
+    student_dict["bio"] = None
+    student_dict["created_at"] = datetime.utcnow()
+    return student_dict
+
+
+def duplicate_student_detail(error_details: dict) -> str:
+    """Map a duplicate key error on the students collection to a client-facing message"""
+    field = duplicate_key_field(error_details)
+    return DUPLICATE_STUDENT_DETAILS.get(field, "Student already registered")
+
+
 @router.post("/students/register", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
 async def register_student(student: StudentCreate):
     """Register a new student"""
-    # Check if email already exists
-    existing = await students_collection.find_one({"email": student.email})
-    if existing:
+    student_dict = build_student_document(student)
+    
+    # The unique indexes on email and reg_no reject duplicates, no pre-check needed
+    try:
+        student_id = await student_repository.insert(student_dict)
+    except DuplicateKeyError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            detail=duplicate_student_detail(e.details)
         )
     
-    # Check if reg_no already exists
-    existing_reg = await students_collection.find_one({"reg_no": student.reg_no})
-    if existing_reg:
+    created_doc = await student_repository.get(student_id)
+    
+    return student_doc_to_response(created_doc)
+
+
+@router.post("/students/import", response_model=StudentImportResult)
+async def import_students(students: List[StudentCreate]):
+    """Bulk register students from a roster upload"""
+    if not students:
+        raise HTTPException(status_code=400, detail="No students to import")
+    if len(students) > MAX_IMPORT_BATCH:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Registration number already exists"
+            status_code=400,
+            detail=f"Too many students in one import (max {MAX_IMPORT_BATCH})"
         )
     
-    # Create student document
-    student_dict = student.model_dump(exclude={"password"})
-    student_dict["password"] = hash_password(student.password)
-    student_dict["skills"] = []
-    student_dict["resume_url"] = None
-    student_dict["bio"] = None
-    student_dict["created_at"] = datetime.utcnow()
+    documents = [build_student_document(student) for student in students]
     
-    result = await students_collection.insert_one(student_dict)
-    created_doc = await students_collection.find_one({"_id": result.inserted_id})
+    # Unordered so one duplicate row does not stop the rest of the roster
+    errors = []
+    try:
+        await student_repository.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            index = write_error["index"]
+            if write_error.get("code") == 11000:
+                detail = duplicate_student_detail(write_error)
+            else:
+                detail = write_error.get("errmsg", "Insert failed")
+            errors.append(StudentImportError(
+                index=index,
+                email=students[index].email,
+                reg_no=students[index].reg_no,
+                detail=detail,
+            ))
     
-    return student_doc_to_response(created_doc)
+    # insert_many assigns _id client-side, so rows without a write error were stored
+    failed = {error.index for error in errors}
+    inserted_ids = [str(doc["_id"]) for i, doc in enumerate(documents) if i not in failed]
+    
+    return StudentImportResult(
+        inserted_count=len(inserted_ids),
+        inserted_ids=inserted_ids,
+        errors=errors,
+    )
+
+
+@router.post("/students/batch", response_model=BatchResponse[StudentResponse])
+async def get_students_batch(request: BatchRequest):
+    """Get several student profiles by ID in one request, in the order requested"""
+    students = await student_repository.get_many(request.ids, student_codec.projection)
+    return student_codec.response(student_codec.batch(request.ids, students))
 
 
 @router.post("/students/login")
 async def login_student(credentials: StudentLogin):
     """Student login"""
-    student_doc = await students_collection.find_one({"email": credentials.email})
+    student_doc = await student_repository.by_email(credentials.email)
     
     if not student_doc:
         raise HTTPException(
@@ -111,7 +178,7 @@ async def get_student(student_id: str):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid student ID")
     
-    doc = await students_collection.find_one({"_id": oid})
+    doc = await student_repository.get(oid)
     if not doc:
         raise HTTPException(status_code=404, detail="Student not found")
     
@@ -134,11 +201,7 @@ async def update_student(student_id: str, update_data: StudentUpdate):
     
     update_dict["updated_at"] = datetime.utcnow()
     
-    result = await students_collection.find_one_and_update(
-        {"_id": oid},
-        {"$set": update_dict},
-        return_document=True
-    )
+    result = await student_repository.update_and_get(oid, update_dict)
     
     if not result:
         raise HTTPException(status_code=404, detail="Student not found")
@@ -155,21 +218,17 @@ async def get_student_applications(student_id: str):
         raise HTTPException(status_code=400, detail="Invalid student ID")
     
     # Verify student exists
-    student = await students_collection.find_one({"_id": oid})
+    student = await student_repository.get(oid)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
     # Find applications by student_id or by email (for backward compatibility)
+    found = [app async for app in application_repository.for_student(student_id, student["email"])]
+    # Gig details for all of them in one query
+    gigs = await gig_repository.load_many(app["gig_id"] for app in found)
+    
     applications = []
-    async for app in applications_collection.find({
-        "$or": [
-            {"student_id": student_id},
-            {"student_email": student["email"]}
-        ]
-    }):
-        # Get gig details
-        gig = await gigs_collection.find_one({"_id": ObjectId(app["gig_id"])})
-        
+    for app, gig in zip(found, gigs):
         app_data = {
             "id": str(app["_id"]),
             "gig_id": app["gig_id"],
@@ -0,0 +1,134 @@
+"""
+Backfill student_id on applications stored before it was recorded
+
+    cd backend
+    python backfill_student_ids.py                 # run, or resume an interrupted run
+    python backfill_student_ids.py --status        # show progress without changing anything
+
+Older applications only carry student_email, which is why a student's applications are
+queried with {"$or": [{"student_id": ...}, {"student_email": ...}]}. This job resolves each
+legacy application's e-mail to the student's _id, a batch at a time in _id order: one $in
+lookup on students and one update_many per student per batch.
+
+Progress is stored in the ``migrations`` collection after every batch, so an interrupted run
+resumes after the last finished batch. Once no legacy applications remain, set
+APPLICATIONS_BY_STUDENT_ID=true so routers query student_id alone. Applications whose
+e-mail matches no student are reported and left as they are.
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from core.config import settings
+from core.database import create_client
+
+MIGRATION_ID = "backfill_application_student_ids"
+
+# Matches a missing field, an explicit null and the empty string, which create_application
+# also treats as missing
+LEGACY = {"student_id": {"$in": [None, ""]}}
+
+
+async def show_status(db) -> int:
+    state = await db.migrations.find_one({"_id": MIGRATION_ID})
+    remaining = await db.applications.count_documents(LEGACY)
+    if state is None:
+        print("Backfill has not run yet")
+    else:
+        done = f"completed {state['completed_at']:%Y-%m-%d %H:%M} UTC" if state.get("completed_at") else "in progress"
+        print(f"Backfill {done}: {state['scanned']:,} scanned, {state['updated']:,} updated, "
+              f"{state['unresolved']:,} without a matching student")
+    print(f"{remaining:,} applications without student_id")
+    return remaining
+
+
+async def backfill(args):
+    if args.mongodb_url:
+        settings.mongodb_url = args.mongodb_url
+    if args.database:
+        settings.database_name = args.database
+    client = create_client()
+    db = client[settings.database_name]
+
+    if args.status:
+        await show_status(db)
+        client.close()
+        return
+
+    state = None if args.restart else await db.migrations.find_one({"_id": MIGRATION_ID})
+    if state and state.get("completed_at"):
+        print("Backfill already completed; rerun with --restart to scan again")
+        await show_status(db)
+        client.close()
+        return
+    if state:
+        print(f"Resuming after {state['scanned']:,} scanned applications")
+    else:
+        state = {"_id": MIGRATION_ID, "last_id": None, "scanned": 0, "updated": 0, "unresolved": 0,
+                 "started_at": datetime.utcnow(), "completed_at": None}
+
+    started = time.perf_counter()
+    while True:
+        query = dict(LEGACY)
+        if state["last_id"] is not None:
+            query["_id"] = {"$gt": state["last_id"]}
+        batch = await db.applications.find(query, {"student_email": 1}).sort("_id", 1).limit(args.batch_size).to_list(None)
+        if not batch:
+            break
+
+        emails = {application["student_email"] for application in batch if application.get("student_email")}
+        students = {
+            student["email"]: str(student["_id"])
+            async for student in db.students.find({"email": {"$in": list(emails)}}, {"email": 1})
+        }
+        by_student = defaultdict(list)
+        for application in batch:
+            student_id = students.get(application.get("student_email"))
+            if student_id:
+                by_student[student_id].append(application["_id"])
+            else:
+                state["unresolved"] += 1
+        for student_id, application_ids in by_student.items():
+            # LEGACY again, in case the application was updated since it was read
+            result = await db.applications.update_many(
+                {"_id": {"$in": application_ids}, **LEGACY}, {"$set": {"student_id": student_id}}
+            )
+            state["updated"] += result.modified_count
+
+        state["scanned"] += len(batch)
+        state["last_id"] = batch[-1]["_id"]
+        await db.migrations.replace_one({"_id": MIGRATION_ID}, state, upsert=True)
+        elapsed = time.perf_counter() - started
+        print(f"  {state['scanned']:,} scanned, {state['updated']:,} updated "
+              f"({state['scanned'] / elapsed if elapsed else 0:,.0f}/s)", flush=True)
+        if args.pause_ms:
+            # Leave room for production traffic on the applications collection
+            await asyncio.sleep(args.pause_ms / 1000)
+
+    state["completed_at"] = datetime.utcnow()
+    await db.migrations.replace_one({"_id": MIGRATION_ID}, state, upsert=True)
+    print(f"✓ Backfill complete in {time.perf_counter() - started:.1f}s")
+    remaining = await show_status(db)
+    if remaining:
+        print("✗ Some applications still have no student_id; keep APPLICATIONS_BY_STUDENT_ID=false "
+              "until those students register and the backfill is rerun with --restart")
+    else:
+        print("✓ Every application has a student_id; set APPLICATIONS_BY_STUDENT_ID=true")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill student_id on legacy applications")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause-ms", type=float, default=0, help="sleep between batches")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and scan from the start")
+    parser.add_argument("--status", action="store_true", help="report progress and exit")
+    parser.add_argument("--mongodb-url", help=f"default: {settings.mongodb_url}")
+    parser.add_argument("--database", help=f"default: {settings.database_name}")
+    asyncio.run(backfill(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
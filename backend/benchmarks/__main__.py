@@ -0,0 +1,96 @@
+"""
+Run the micro-benchmark suite and compare it with a stored baseline
+
+    cd backend
+    python -m benchmarks --save                 # record results/benchmarks.json
+    python -m benchmarks                        # compare with it, exit 1 on regression
+    python -m benchmarks -k list_all_gigs --tolerance 0.2
+
+A benchmark regresses when its best time per operation is more than --tolerance slower
+than the baseline's. The baseline is machine specific; record it on the machine that
+runs the comparison.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+from pathlib import Path
+
+from benchmarks.suite import measure, select
+
+DEFAULT_BASELINE = Path("results") / "benchmarks.json"
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+async def run_suite(args) -> dict:
+    results = {}
+    for benchmark in select(args.k):
+        result = await measure(benchmark, args.repeat)
+        results[benchmark.name] = result
+        print(f"  {benchmark.name:<36} {format_time(result['best_s']):>10} {format_time(result['median_s']):>10}"
+              f"  {benchmark.description}", flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time router, serializer and auth hot paths in isolation")
+    parser.add_argument("-k", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    args = parser.parse_args()
+
+    # Slow-query and budget warnings are expected at these sizes
+    logging.basicConfig(level=logging.ERROR)
+
+    print(f"  {'benchmark':<36} {'best':>10} {'median':>10}")
+    results = asyncio.run(run_suite(args))
+
+    if args.save:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"results": {}}
+        baseline["results"].update(results)
+        baseline["python"] = platform.python_version()
+        baseline["machine"] = platform.node()
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save to record one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = []
+    print(f"\nCompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<36} (not in baseline)")
+            continue
+        change = result["best_s"] / before["best_s"] - 1
+        flag = ""
+        if change > args.tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -args.tolerance:
+            flag = "  faster"
+        print(f"  {name:<36} {format_time(before['best_s']):>10} -> {format_time(result['best_s']):>10} "
+              f"{change:>+8.1%}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Minimal in-process ASGI driver for benchmarks
+
+Calls the application directly, without sockets or an HTTP client, so the measured time
+is the application's own cost.
+"""
+from typing import Iterable, Tuple
+
+
+async def call(app, method: str, path: str, query: str = "", body: bytes = b"",
+               headers: Iterable[Tuple[bytes, bytes]] = ()) -> Tuple[int, dict, bytes]:
+    """Run one request through ``app`` and return (status, headers, body)"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"bench")] + list(headers),
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response = {"status": None, "headers": {}, "body": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], b"".join(response["body"])
+
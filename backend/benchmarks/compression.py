@@ -0,0 +1,58 @@
+"""
+CPU cost and ratio of each response compression level on realistic gig list payloads
+
+Prints, for each payload size, the compressed size and time of every encoding and level.
+LEVELS in core/compression.py picks, per size band, the highest level whose throughput
+keeps the compression cost small next to the time it saves on a slow link.
+
+    cd backend
+    python -m benchmarks.compression --sizes 10,100,1000,10000 --repeat 3
+"""
+import argparse
+import time
+
+from core.codec import DocumentCodec
+from core.compression import AVAILABLE_ENCODINGS, compress, level_for
+from schemas.gig import GigResponse
+from benchmarks.serialization import make_gigs
+
+# zstd 19 and brotli 11 are left out: they take seconds on the larger payloads
+LEVEL_RANGES = {"zstd": (1, 3, 6, 9, 12), "br": (1, 3, 4, 5, 6, 9), "gzip": (1, 3, 4, 6, 9)}
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="gigs per payload")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--link-mbps", type=float, default=10, help="client bandwidth used to estimate time saved")
+    args = parser.parse_args()
+
+    codec = DocumentCodec(GigResponse)
+    for count in (int(size) for size in args.sizes.split(",")):
+        body = codec.response(codec.to_list(make_gigs(count))).body
+        print(f"\n{count} gigs: {len(body) / 1024:.1f} KiB")
+        print(f"  {'encoding':<6} {'level':>5} {'ratio':>7} {'ms':>8} {'MB/s':>8} {'net ms saved':>13}")
+        for encoding in AVAILABLE_ENCODINGS:
+            chosen = level_for(encoding, len(body))
+            for level in LEVEL_RANGES[encoding]:
+                compressed = compress(encoding, body, level)
+                seconds = best_of(args.repeat, lambda: compress(encoding, body, level))
+                transfer_saved = (len(body) - len(compressed)) * 8 / (args.link_mbps * 1e6)
+                marker = "  <- LEVELS" if level == chosen else ""
+                print(
+                    f"  {encoding:<6} {level:>5} {len(body) / len(compressed):>6.1f}x {seconds * 1000:>8.2f} "
+                    f"{len(body) / seconds / 1e6:>8.0f} {(transfer_saved - seconds) * 1000:>13.1f}{marker}"
+                )
+
+
+if __name__ == "__main__":
+    main()
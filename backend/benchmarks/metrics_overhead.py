@@ -0,0 +1,124 @@
+"""
+Measure the request overhead of MetricsMiddleware
+
+Two otherwise identical FastAPI apps serve gig endpoints shaped like the real ones, one
+with the middleware installed. The detail endpoint awaits a simulated database round trip
+(--db-latency-ms) the way the real handlers await Motor; the list endpoint spends its time
+validating and serializing a page of gigs. Rounds alternate between the apps so drift in
+machine load affects both equally, and the fastest round of each is compared.
+
+    cd backend
+    python -m benchmarks.metrics_overhead --requests 1000 --rounds 15 --max-overhead 2.0
+
+Exits with status 1 when the measured overhead exceeds --max-overhead percent.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from bson import ObjectId
+from fastapi import FastAPI
+
+from core.metrics import MetricsMiddleware, Registry
+from schemas.gig import GigResponse
+from benchmarks.asgi import call
+
+
+def make_gig(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "professor_id": str(ObjectId()),
+        "title": f"Research gig {i}",
+        "description": "Study of efficient indexing structures for large scale document stores. " * 3,
+        "area_of_study": "Databases",
+        "technologies": "Python, MongoDB, FastAPI",
+        "funded": i % 2 == 0,
+        "candidate_count": 3,
+        "status": "open",
+    }
+
+
+def build_app(instrumented: bool, list_size: int, db_latency: float) -> FastAPI:
+    app = FastAPI()
+    gigs = [make_gig(i) for i in range(list_size)]
+    for gig in gigs:
+        gig["id"] = str(gig["_id"])
+
+    @app.get("/api/gigs", response_model=list[GigResponse])
+    async def list_all_gigs(status: str = None):
+        return gigs
+
+    @app.get("/api/gigs/{gig_id}", response_model=GigResponse)
+    async def get_gig(gig_id: str):
+        await asyncio.sleep(db_latency)
+        return gigs[0]
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware, registry=Registry())
+    return app
+
+
+async def time_round(app, path: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, "GET", path)
+    return (time.perf_counter() - start) / requests
+
+
+async def measure(path: str, requests: int, rounds: int, list_size: int, db_latency: float) -> dict:
+    bare = build_app(False, list_size, db_latency)
+    instrumented = build_app(True, list_size, db_latency)
+
+    # Warm both apps (middleware stack build, pydantic schema caches)
+    await time_round(bare, path, 200)
+    await time_round(instrumented, path, 200)
+
+    bare_times, instrumented_times = [], []
+    for _ in range(rounds):
+        bare_times.append(await time_round(bare, path, requests))
+        instrumented_times.append(await time_round(instrumented, path, requests))
+
+    # The fastest round is the one least disturbed by other processes
+    bare_best = min(bare_times)
+    instrumented_best = min(instrumented_times)
+    return {
+        "path": path,
+        "bare_us": bare_best * 1e6,
+        "instrumented_us": instrumented_best * 1e6,
+        "overhead_us": (instrumented_best - bare_best) * 1e6,
+        "overhead_pct": (instrumented_best - bare_best) / bare_best * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--list-size", type=int, default=50, help="gigs returned by the list endpoint")
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="simulated database round trip")
+    parser.add_argument("--max-overhead", type=float, default=2.0, help="allowed overhead in percent")
+    args = parser.parse_args()
+
+    paths = ["/api/gigs", f"/api/gigs/{ObjectId()}"]
+    db_latency = args.db_latency_ms / 1000
+    results = [
+        asyncio.run(measure(path, args.requests, args.rounds, args.list_size, db_latency)) for path in paths
+    ]
+
+    print(f"{'endpoint':<40} {'bare':>10} {'metrics':>10} {'overhead':>18}")
+    for result in results:
+        print(
+            f"{result['path']:<40} {result['bare_us']:>8.1f}us {result['instrumented_us']:>8.1f}us "
+            f"{result['overhead_us']:>6.1f}us {result['overhead_pct']:>6.2f}%"
+        )
+
+    worst = max(result["overhead_pct"] for result in results)
+    if worst > args.max_overhead:
+        print(f"\n✗ Overhead {worst:.2f}% exceeds {args.max_overhead}%")
+        sys.exit(1)
+    print(f"\n✓ Overhead within {args.max_overhead}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compare list response serialization: FastAPI response-model validation vs DocumentCodec
+
+The "current" path is what FastAPI does for a route returning dicts with
+``response_model=list[GigResponse]``: serialize_response() validates and dumps every item,
+then JSONResponse encodes the result with json.dumps. The "codec" path is what the list
+routes do now. Both start from the raw documents a Motor cursor yields.
+
+    cd backend
+    python -m benchmarks.serialization --gigs 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from core.codec import DocumentCodec
+from core.fixtures import AREAS, TECHNOLOGIES, VOCABULARY
+from schemas.gig import GigResponse
+
+
+def make_gigs(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    professors = [str(ObjectId()) for _ in range(max(count // 20, 1))]
+    start = datetime(2025, 1, 1)
+    gigs = []
+    for i in range(count):
+        gigs.append({
+            "_id": ObjectId(),
+            "professor_id": rng.choice(professors),
+            "title": f"{rng.choice(AREAS)} research assistant #{i}",
+            "description": " ".join(rng.choice(VOCABULARY) for _ in range(60)),
+            "area_of_study": rng.choice(AREAS),
+            "technologies": ", ".join(rng.sample(TECHNOLOGIES, 3)),
+            "target_type": "Conference",
+            "paper_type": "Research",
+            "timeline": "6 months",
+            "year_requirement": "3rd year+",
+            "cgpa_requirement": "8.0",
+            "funded": rng.random() < 0.3,
+            "candidate_count": rng.randint(1, 5),
+            "status": rng.choice(["open", "open", "closed", "on-hold"]),
+            "publication_link": None,
+            "publication_venue": None,
+            "paused_reason": None,
+            "created_at": start + timedelta(minutes=i),
+        })
+    return gigs
+
+
+def current_path(docs: list, field) -> bytes:
+    """What the list routes did before: mutate ids in place and let FastAPI validate"""
+    for doc in docs:
+        doc["id"] = str(doc["_id"])
+    content = asyncio.run(serialize_response(field=field, response_content=docs))
+    return JSONResponse(content).body
+
+
+def codec_path(docs: list, codec: DocumentCodec) -> bytes:
+    return codec.response(codec.to_list(docs)).body
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--gigs", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    field = create_model_field(name="Response_list_all_gigs", type_=list[GigResponse], mode="serialization")
+    codec = DocumentCodec(GigResponse)
+
+    # Both paths must produce the same JSON before their speed is worth comparing
+    sample = make_gigs(200)
+    expected = json.loads(current_path([dict(doc) for doc in sample], field))
+    actual = json.loads(codec_path([dict(doc) for doc in sample], codec))
+    assert expected == actual, "DocumentCodec output differs from response_model serialization"
+
+    docs = make_gigs(args.gigs)
+    current = best_of(args.repeat, lambda: current_path([dict(doc) for doc in docs], field))
+    fast = best_of(args.repeat, lambda: codec_path([dict(doc) for doc in docs], codec))
+    copy_cost = best_of(args.repeat, lambda: [dict(doc) for doc in docs])
+    current -= copy_cost
+    fast -= copy_cost
+
+    size = len(codec_path(docs, codec))
+    print(f"{args.gigs} gigs, {size / 1024:.0f} KiB of JSON")
+    print(f"  response_model validation: {current * 1000:8.1f} ms")
+    print(f"  DocumentCodec + orjson:    {fast * 1000:8.1f} ms")
+    print(f"  speedup:                   {current / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Hot-path micro-benchmarks run by ``python -m benchmarks``
+
+Each benchmark calls a router function or helper directly, without HTTP, against a fresh
+in-memory database (core/memory.py), so the time measured is the code path itself plus
+the stand-in's command cost. A benchmark's ``run`` performs one operation; the harness
+times ``number`` operations per sample and keeps the best of ``repeat`` samples.
+"""
+import asyncio
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+
+from api.routers import gigs, notifications, student
+from core import database
+from core.auth import get_password_hash, verify_password
+from core.config import settings
+from core.fixtures import VOCABULARY
+from benchmarks.serialization import make_gigs
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # Builds state in the fresh database and returns the zero-argument operation to time
+    setup: Callable[[], Awaitable[Callable[[], Awaitable[None]]]]
+    number: int = 10
+    description: str = ""
+
+
+async def fresh_database():
+    """Reconnect to an empty in-memory database with the production indexes"""
+    settings.mongodb_url = "memory://"
+    settings.mongodb_min_pool_size = 1
+    database.close()
+    await database.connect()
+    return database.get_database_handle()
+
+
+def list_all_gigs(count: int) -> Benchmark:
+    async def setup():
+        db = await fresh_database()
+        await db["gigs"].insert_many(make_gigs(count))
+
+        async def run():
+            await gigs.list_all_gigs(status="open")
+        return run
+
+    return Benchmark(
+        f"list_all_gigs[{count}]", setup, number=max(1, 10_000 // count),
+        description=f"GET /gigs?status=open over {count} gigs",
+    )
+
+
+def get_student_applications(count: int) -> Benchmark:
+    async def setup():
+        db = await fresh_database()
+        rng = random.Random(count)
+        gig_docs = make_gigs(max(count, 1))
+        await db["gigs"].insert_many(gig_docs)
+        student_id = (await db["students"].insert_one({
+            "name": "Bench Student", "email": "bench@student.edu", "reg_no": "B0001",
+            "department": "Computer Science", "year": 3, "password": "x",
+        })).inserted_id
+        # Noise from other students, so lookups have to be selective
+        applications = []
+        for i in range(count * 5):
+            gig = gig_docs[i % len(gig_docs)]
+            mine = i % 5 == 0
+            applications.append({
+                "gig_id": str(gig["_id"]),
+                "student_id": str(student_id) if mine else str(ObjectId()),
+                "student_name": "Bench Student" if mine else f"Student {i}",
+                "student_email": "bench@student.edu" if mine else f"s{i}@student.edu",
+                "student_year": "3",
+                "student_cgpa": "8.5",
+                "resume_link": "https://example.com/resume.pdf",
+                "cover_letter": " ".join(rng.choice(VOCABULARY) for _ in range(80)),
+                "status": "pending",
+                "applied_at": datetime(2025, 1, 1) + timedelta(minutes=i),
+            })
+        await db["applications"].insert_many(applications)
+
+        async def run():
+            await student.get_student_applications(str(student_id))
+        return run
+
+    return Benchmark(
+        f"get_student_applications[{count}]", setup, number=max(1, 1000 // count),
+        description=f"student with {count} applications among {count * 5}",
+    )
+
+
+def notification_contention(concurrency: int) -> Benchmark:
+    async def setup():
+        await fresh_database()
+        professor_id, gig_id = str(ObjectId()), str(ObjectId())
+
+        async def run():
+            # A burst of applications to one gig, as happens right after it is announced
+            await asyncio.gather(*(
+                notifications.create_or_update_application_notification(professor_id, gig_id, "Bench gig")
+                for _ in range(concurrency)
+            ))
+        return run
+
+    return Benchmark(
+        f"application_notification[x{concurrency}]", setup, number=10,
+        description=f"{concurrency} concurrent create_or_update_application_notification calls",
+    )
+
+
+def student_doc_to_response() -> Benchmark:
+    async def setup():
+        doc = {
+            "_id": ObjectId(), "name": "Bench Student", "email": "bench@student.edu", "reg_no": "B0001",
+            "department": "Computer Science", "year": 3, "college_name": "Bench University",
+            "skills": ["Python", "MongoDB"], "password": "x", "created_at": datetime(2025, 1, 1),
+        }
+
+        async def run():
+            for _ in range(1000):
+                student.student_doc_to_response(doc)
+        return run
+
+    return Benchmark("student_doc_to_response[x1000]", setup, number=10, description="1000 conversions")
+
+
+def password_hash() -> Benchmark:
+    async def setup():
+        async def run():
+            get_password_hash("correct horse battery staple")
+        return run
+
+    return Benchmark("get_password_hash", setup, number=3, description="core.auth password hash")
+
+
+def password_verify() -> Benchmark:
+    async def setup():
+        hashed = get_password_hash("correct horse battery staple")
+
+        async def run():
+            verify_password("correct horse battery staple", hashed)
+        return run
+
+    return Benchmark("verify_password", setup, number=3, description="core.auth password check")
+
+
+BENCHMARKS: List[Benchmark] = [
+    list_all_gigs(1_000),
+    list_all_gigs(10_000),
+    list_all_gigs(100_000),
+    get_student_applications(10),
+    get_student_applications(100),
+    notification_contention(50),
+    student_doc_to_response(),
+    password_hash(),
+    password_verify(),
+]
+
+
+async def measure(benchmark: Benchmark, repeat: int) -> Dict[str, float]:
+    """Best and median seconds per operation over ``repeat`` samples"""
+    run = await benchmark.setup()
+    await run()  # warm caches and lazily built state
+    samples = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(benchmark.number):
+            await run()
+        samples.append((perf_counter() - start) / benchmark.number)
+    samples.sort()
+    return {"best_s": samples[0], "median_s": samples[len(samples) // 2]}
+
+
+def select(pattern: Optional[str]) -> List[Benchmark]:
+    if not pattern:
+        return BENCHMARKS
+    return [benchmark for benchmark in BENCHMARKS if pattern in benchmark.name]
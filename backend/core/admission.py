@@ -0,0 +1,206 @@
+"""
+Admission control: per-route concurrency limits, per-client rate limits and load shedding
+
+Requests are admitted in three steps, cheapest first:
+
+1. Rate limit. Routes in RATE_LIMITS (the login and apply endpoints) get one token bucket
+   per client address; an empty bucket answers 429 with the seconds until the next token.
+2. Pool saturation. While the MongoDB connection pool is saturated (checked-out share at
+   ``admission_pool_saturation`` with requests already waiting for a connection) new
+   requests are shed with 503 rather than joining the wait queue, where they would only
+   time out later and hold their client's connection meanwhile.
+3. Concurrency. Every route may run at most ROUTE_CONCURRENCY (or the default) requests at
+   once. Others wait for a slot for at most the queue-time budget, then get 503.
+
+Rejections carry Retry-After and are counted in ``profhub_admission_rejected_total``.
+Routes are identified by endpoint name, e.g. ``login_student``. Health, readiness and
+metrics endpoints and activity streams are never limited.
+"""
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import orjson
+from starlette.routing import Match
+
+from . import database
+from .config import settings
+from .metrics import REGISTRY
+
+# Routes rate limited per client: (tokens per second, burst)
+RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "login": (1.0, 10),
+    "login_student": (1.0, 10),
+    "create_application": (0.5, 10),
+}
+
+# Routes whose handlers are expensive enough to need a tighter limit than the default
+ROUTE_CONCURRENCY: Dict[str, int] = {
+    "list_all_gigs": 64,
+    "list_professors": 64,
+    "get_student_applications": 64,
+    "get_gig_applications": 64,
+    "import_students": 4,
+    "upload_resume": 16,
+    "download_gig_resumes": 8,
+}
+
+EXEMPT_ROUTES = frozenset({
+    "root", "health_check", "readiness_check", "metrics",
+    # Long-lived activity streams sit idle between events; a slot each would starve the route
+    "stream_user_activity", "stream_gig_activity",
+})
+
+# Buckets kept; past this the least recently used one is dropped (its client starts over
+# with a full bucket)
+MAX_BUCKETS = 100_000
+
+# Route names cached by method and path template, so the route table is scanned once per
+# template rather than on every request
+MAX_CACHED_ROUTES = 1024
+_OBJECT_ID_SEGMENT = re.compile(r"(?<=/)[0-9a-fA-F]{24}(?=/|$)")
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: int, now: float):
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, rate: float, burst: int, now: float) -> float:
+        """Take a token; returns 0 on success, else seconds until one is available"""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+
+def route_name(scope) -> Optional[str]:
+    """Endpoint name of the route the router will pick for this request"""
+    app = scope.get("app")
+    if app is None:
+        return None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.name
+    return None
+
+
+def route_key(scope) -> Tuple[str, str]:
+    """Method and path with ids replaced, so every /api/gigs/{gig_id} request shares a key"""
+    return scope["method"], _OBJECT_ID_SEGMENT.sub("{id}", scope["path"])
+
+
+def client_address(scope) -> str:
+    if settings.admission_trust_forwarded_for:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "-"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying rate limits, pool-saturation shedding and concurrency limits"""
+
+    def __init__(self, app):
+        self.app = app
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._route_names: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+        self.rejected = REGISTRY.counter(
+            "profhub_admission_rejected_total", "Requests rejected by admission control", ("route", "reason")
+        )
+        self.queue_time = REGISTRY.histogram(
+            "profhub_admission_queue_seconds", "Time requests waited for a concurrency slot", ("route",)
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+        name = self._route_name(scope)
+        if name is None or name in EXEMPT_ROUTES:
+            await self.app(scope, receive, send)
+            return
+
+        limit = RATE_LIMITS.get(name)
+        if limit is not None:
+            wait = self._take_token(name, client_address(scope), *limit)
+            if wait:
+                await self._reject(send, name, "rate_limited", 429, "Too many requests", wait)
+                return
+
+        if pool_saturated():
+            await self._reject(send, name, "pool_saturated", 503, "Server is busy, retry shortly", 1)
+            return
+
+        slots = self._slots.get(name)
+        if slots is None:
+            slots = self._slots[name] = asyncio.Semaphore(
+                ROUTE_CONCURRENCY.get(name, settings.admission_default_concurrency)
+            )
+        if slots.locked():
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(slots.acquire(), settings.admission_queue_timeout_ms / 1000)
+            except asyncio.TimeoutError:
+                self.queue_time.observe((name,), time.perf_counter() - start)
+                await self._reject(send, name, "queue_timeout", 503, "Server is busy, retry shortly", 1)
+                return
+            self.queue_time.observe((name,), time.perf_counter() - start)
+        else:
+            await slots.acquire()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slots.release()
+
+    def _route_name(self, scope) -> Optional[str]:
+        key = route_key(scope)
+        if key in self._route_names:
+            self._route_names.move_to_end(key)
+            return self._route_names[key]
+        if len(self._route_names) >= MAX_CACHED_ROUTES:
+            self._route_names.popitem(last=False)
+        name = self._route_names[key] = route_name(scope)
+        return name
+
+    def _take_token(self, name: str, client: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        key = (name, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = TokenBucket(burst, now)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(rate, burst, now)
+
+    async def _reject(self, send, name: str, reason: str, status_code: int, detail: str, retry_after: float):
+        self.rejected.inc((name, reason))
+        body = orjson.dumps({"detail": detail})
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def pool_saturated() -> bool:
+    """Whether the connection pool is at its saturation threshold with requests queueing"""
+    pool = database.pool_status()
+    return pool["waiting"] > 0 and pool["saturation"] >= settings.admission_pool_saturation
@@ -0,0 +1,45 @@
+"""
+Short-lived in-process caching of encoded responses
+
+Each worker process holds its own entries, so after a write other workers can serve the
+previous value until it expires; keep ``ttl`` to what is acceptable to show stale.
+Writes in this process call ``invalidate`` so the writer sees its own change at once.
+A value read before an invalidation is not stored after it: callers take ``generation``
+before reading and pass it to ``set``, which skips the store if a write happened since.
+"""
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Values that expire ``ttl`` seconds after being stored; ttl <= 0 stores nothing"""
+
+    def __init__(self, ttl: float, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        # Bumped by invalidate
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        if self.ttl <= 0 or (generation is not None and generation != self.generation):
+            return
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Evict the entry closest to expiry
+            self._entries.pop(min(self._entries, key=lambda k: self._entries[k][0]))
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self):
+        self.generation += 1
+        self._entries.clear()
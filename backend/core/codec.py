@@ -0,0 +1,85 @@
+"""
+Direct MongoDB document to JSON encoding for list endpoints
+
+Returning plain dicts from a route makes FastAPI walk every value, validate it against the
+response model and dump it again before ``json.dumps``. For documents that already come
+from our own collections that work is redundant, so ``DocumentCodec`` copies the response
+model's fields out of each document once and encodes the result with orjson, which handles
+datetimes natively and ObjectIds through ``_encode_default``.
+"""
+from typing import Any, Iterable, List, Type
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def _encode_default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON with native datetime and ObjectId support"""
+    return orjson.dumps(content, default=_encode_default)
+
+
+class DocumentResponse(Response):
+    """JSON response rendered with orjson; accepts pre-encoded bytes as well"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+class DocumentCodec:
+    """Shape MongoDB documents like a response model without running its validation
+
+    Routes keep ``response_model`` for the OpenAPI schema and return ``codec.response(...)``,
+    which FastAPI passes through untouched. Only the model's fields are copied, so stored
+    fields that are not part of the response (e.g. ``hashed_password``) are never sent.
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._fields = []
+        for name, field in model.model_fields.items():
+            if name == "id":
+                continue
+            if field.default_factory is not None:
+                self._fields.append((name, None, field.default_factory))
+            else:
+                default = None if field.is_required() else field.default
+                self._fields.append((name, default, None))
+        # Limits what the server sends back to what the response uses
+        self.projection = {name: 1 for name, _, _ in self._fields}
+
+    def to_dict(self, doc: dict) -> dict:
+        """Convert one stored document to its response shape, with _id exposed as id"""
+        result = {"id": str(doc["_id"])}
+        for name, default, factory in self._fields:
+            value = doc.get(name, default)
+            if value is None and factory is not None and name not in doc:
+                value = factory()
+            result[name] = value
+        return result
+
+    def to_list(self, docs: Iterable[dict]) -> List[dict]:
+        to_dict = self.to_dict
+        return [to_dict(doc) for doc in docs]
+
+    def batch(self, ids: List[str], docs: List[Any]) -> dict:
+        """Batch lookup result: found documents in the order of ``ids``, plus the ids not found"""
+        return {
+            "items": [self.to_dict(doc) for doc in docs if doc is not None],
+            "missing": [id for id, doc in zip(ids, docs) if doc is None],
+        }
+
+    def response(self, content: Any, status_code: int = 200) -> DocumentResponse:
+        """Response for already converted content (see to_dict / to_list)"""
+        return DocumentResponse(dumps(content), status_code=status_code)
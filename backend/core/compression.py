@@ -0,0 +1,234 @@
+"""
+Negotiated zstd / brotli / gzip response compression
+
+brotli and zstandard are optional; encodings whose module is not installed are simply not
+offered. Compression levels depend on the response size: small bodies can afford a higher
+level because they are cheap to compress, large list payloads use a low level so CPU time
+stays bounded. The tables below come from ``python -m benchmarks.compression``.
+"""
+import gzip
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# (body size up to, level) per encoding, checked in order
+LEVELS: Dict[str, Tuple[Tuple[float, int], ...]] = {
+    "zstd": ((64 * 1024, 6), (1024 * 1024, 3), (float("inf"), 1)),
+    "br": ((64 * 1024, 5), (1024 * 1024, 3), (float("inf"), 1)),
+    "gzip": ((64 * 1024, 6), (1024 * 1024, 4), (float("inf"), 1)),
+}
+
+# Streamed responses have no known size; these levels keep per-chunk latency low
+STREAMING_LEVELS = {"zstd": 3, "br": 3, "gzip": 4}
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+AVAILABLE_ENCODINGS = tuple(
+    encoding for encoding, module in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if module is not None
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each encoding in an Accept-Encoding header to its q-value"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def negotiate(header: str, preference: List[str]) -> Optional[str]:
+    """Pick the encoding with the highest q-value, ties going to the server preference order"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in preference:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def level_for(encoding: str, size: int) -> int:
+    for limit, level in LEVELS[encoding]:
+        if size <= limit:
+            return level
+    return LEVELS[encoding][-1][1]
+
+
+def compress(encoding: str, body: bytes, level: int) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk so clients can decode as data arrives"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.compress(chunk) + self._compressor.flush()
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.finish()
+        return self._compressor.compress(chunk) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing compressible responses of at least ``minimum_size`` bytes
+
+    Complete bodies are compressed in one go at a level chosen by their size. Streamed bodies
+    (``more_body``) are compressed chunk by chunk regardless of size, since the total is not
+    known when the headers go out.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None, encodings: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = settings.compression_minimum_size if minimum_size is None else minimum_size
+        if encodings is None:
+            encodings = [e.strip() for e in settings.compression_encodings.split(",") if e.strip()]
+        self.encodings = [encoding for encoding in encodings if encoding in AVAILABLE_ENCODINGS]
+        self.bytes = REGISTRY.counter(
+            "profhub_http_compression_bytes_total", "Response bytes before and after compression",
+            ("encoding", "stage")
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate(value.decode("latin-1"), self.encodings)
+                break
+        # Without an acceptable encoding nothing is compressed, but compressible responses
+        # still get Vary so caches do not hand them to clients that asked for compression
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size, self.bytes))
+
+
+def _vary_accept_encoding(headers: list) -> list:
+    """Headers with Accept-Encoding added to Vary, merging any Vary already present"""
+    vary = [value for name, value in headers if name == b"vary"]
+    if any(b"accept-encoding" in value.lower() or value.strip() == b"*" for value in vary):
+        return headers
+    return [(name, value) for name, value in headers if name != b"vary"] + [
+        (b"vary", b", ".join(vary + [b"Accept-Encoding"]))
+    ]
+
+
+class _CompressingSend:
+    """Send callable that holds back the response start until it knows whether to compress"""
+
+    def __init__(self, send, encoding: Optional[str], minimum_size: int, byte_counter):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.byte_counter = byte_counter
+        self.start_message = None
+        self.stream: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            self._count(len(body), 0)
+            compressed = self.stream.compress(body) if more_body else self.stream.finish(body)
+            self._count(0, len(compressed))
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        # First body message: decide now
+        start = self.start_message
+        compressible = self._should_compress(start)
+        if not compressible or self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            self.passthrough = True
+            if compressible:
+                start = {**start, "headers": _vary_accept_encoding(list(start.get("headers", [])))}
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers = _vary_accept_encoding([
+            (name, value) for name, value in start.get("headers", []) if name != b"content-length"
+        ])
+        headers.append((b"content-encoding", self.encoding.encode()))
+
+        if more_body:
+            self.stream = StreamCompressor(self.encoding, STREAMING_LEVELS[self.encoding])
+            compressed = self.stream.compress(body)
+        else:
+            compressed = compress(self.encoding, body, level_for(self.encoding, len(body)))
+            headers.append((b"content-length", str(len(compressed)).encode()))
+        self._count(len(body), len(compressed))
+
+        await self.send({**start, "headers": headers})
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _should_compress(self, start) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        content_type = b""
+        for name, value in start.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+    def _count(self, original: int, compressed: int):
+        if original:
+            self.byte_counter.inc((self.encoding, "in"), original)
+        if compressed:
+            self.byte_counter.inc((self.encoding, "out"), compressed)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,6 +8,89 @@ class Settings(BaseSettings):
     mongodb_url: str = "mongodb://localhost:27017"
     database_name: str = "profhub"
     cors_origins: list = ["http://localhost:5173", "http://localhost:3000"]
+
+    # MongoDB connection pool
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 10  # Also the number of connections opened at startup
+    mongodb_max_idle_time_ms: int = 300_000
+    mongodb_wait_queue_timeout_ms: int = 2_000  # Fail instead of queueing forever for a connection
+
+    # MongoDB timeouts
+    mongodb_connect_timeout_ms: int = 5_000
+    mongodb_server_selection_timeout_ms: int = 5_000
+    mongodb_socket_timeout_ms: Optional[int] = 30_000
+
+    # Wire compression, e.g. "zstd,zlib" for a remote cluster; empty disables it
+    mongodb_compressors: str = ""
+    mongodb_zlib_compression_level: int = 1
+
+    # Create missing indexes when the app starts
+    mongodb_ensure_indexes: bool = True
+
+    # Query instrumentation
+    slow_query_ms: float = 100  # Log database commands slower than this
+    query_budget: int = 10  # Warn when one request issues more database commands
+    query_stats_headers: bool = False  # Return Server-Timing and budget headers to clients
+
+    # Response compression, encodings in server preference order
+    compression_minimum_size: int = 1024
+    compression_encodings: str = "zstd,br,gzip"
+
+    # Query a student's applications by student_id alone; enable once backfill_student_ids.py
+    # reports that no application lacks one
+    applications_by_student_id: bool = False
+
+    # Admission control (core/admission.py)
+    admission_enabled: bool = True
+    admission_default_concurrency: int = 256  # Concurrent requests per route
+    admission_queue_timeout_ms: float = 500  # Longest wait for a concurrency slot before 503
+    admission_pool_saturation: float = 0.9  # Shed load past this pool usage while requests queue
+    admission_trust_forwarded_for: bool = False  # Rate limit by X-Forwarded-For (behind a proxy)
+
+    # Resume files: "gridfs", "local" or "auto" (GridFS, or local disk with memory://)
+    resume_storage: str = "auto"
+    resume_storage_dir: str = "uploads/resumes"
+    resume_max_bytes: int = 10 * 1024 * 1024
+
+    # Professor directory: page size limits and how long the default page is cached
+    directory_page_size: int = 20
+    directory_max_page_size: int = 100
+    directory_cache_seconds: float = 30  # 0 disables the cache
+
+    # Saved searches: how many a student may keep, and notifications inserted per batch
+    # when a new gig matches them
+    saved_searches_per_student: int = 20
+    saved_search_alert_batch_size: int = 500
+
+    # Similar gigs (core/similarity.py): results per request and LSH candidates examined
+    similar_gigs_limit: int = 5
+    similar_gigs_max_limit: int = 20
+    similar_gigs_max_candidates: int = 200
+
+    # Professor applicant inbox page size
+    inbox_page_size: int = 50
+    inbox_max_page_size: int = 200
+
+    # Request profiling (core/profiling.py); needs pyinstrument
+    profiling_enabled: bool = False
+    profiling_token: str = ""  # Requests sending X-Profile: <token> are profiled; also guards downloads
+    profiling_sample_rate: float = 0.0  # Share of all other requests profiled, e.g. 0.001
+    profiling_interval_ms: float = 1
+    profiling_dir: str = "profiles"
+    profiling_max_files: int = 200
+
+    # Logging (core/log.py)
+    log_level: str = "INFO"
+    log_format: str = "json"  # "json" or "text"
+    log_debug_sample_rate: float = 1.0  # Share of DEBUG records kept, e.g. 0.01
+    log_queue_size: int = 10_000  # Records waiting for the writer thread; more are dropped
+
+    # Activity feeds and streams (core/event_hub.py)
+    activity_page_size: int = 20
+    activity_max_page_size: int = 100
+    activity_stream_heartbeat_seconds: float = 15
+    activity_stream_queue_size: int = 100  # Events a slow stream may fall behind before it is dropped
+    activity_change_stream: bool = False  # Follow events from every worker; requires a replica set
     
     class Config:
         env_file = ".env"
@@ -1,15 +1,178 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
 from .config import settings
+from .indexes import ensure_indexes
+from .memory import MemoryClient, is_memory_url
+from .query_stats import query_stats_listener
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Track connection pool usage per server from driver pool events
+
+    PyMongo has no public API for the number of checked out connections, so the counters
+    are maintained from CMAP events. Events fire on driver threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = {}
+
+    def _server(self, address) -> dict:
+        server = self._servers.get(address)
+        if server is None:
+            server = self._servers[address] = {"open": 0, "checked_out": 0, "waiting": 0}
+        return server
+
+    def _add(self, address, key: str, delta: int):
+        with self._lock:
+            self._server(address)[key] += delta
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._add(event.address, "open", 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(event.address, "open", -1)
+
+    def connection_check_out_started(self, event):
+        self._add(event.address, "waiting", 1)
+
+    def connection_check_out_failed(self, event):
+        self._add(event.address, "waiting", -1)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["waiting"] -= 1
+            server["checked_out"] += 1
 
-client = AsyncIOMotorClient(settings.mongodb_url)
-database = client[settings.database_name]
+    def connection_checked_in(self, event):
+        self._add(event.address, "checked_out", -1)
 
-# Collections
-professors_collection = database.get_collection("professors")
-gigs_collection = database.get_collection("gigs")
-applications_collection = database.get_collection("applications")
-notifications_collection = database.get_collection("notifications")
+    def snapshot(self) -> dict:
+        """Pool usage of the busiest server, saturation being checked out / max pool size"""
+        with self._lock:
+            servers = [dict(server) for server in self._servers.values()]
+        busiest = max(servers, key=lambda s: s["checked_out"], default={"open": 0, "checked_out": 0, "waiting": 0})
+        max_size = settings.mongodb_max_pool_size
+        busiest["max_size"] = max_size
+        busiest["saturation"] = round(busiest["checked_out"] / max_size, 3) if max_size else 0.0
+        return busiest
+
+
+pool_stats = PoolStats()
+client: Optional[AsyncIOMotorClient] = None
+_database = None
+
+
+def create_client() -> AsyncIOMotorClient:
+    """Build the Motor client from the pool, timeout and compression settings"""
+    if is_memory_url(settings.mongodb_url):
+        return MemoryClient(settings.mongodb_url)
+    options = {
+        "appname": settings.app_name,
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "maxIdleTimeMS": settings.mongodb_max_idle_time_ms,
+        "connectTimeoutMS": settings.mongodb_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+        "socketTimeoutMS": settings.mongodb_socket_timeout_ms,
+        "waitQueueTimeoutMS": settings.mongodb_wait_queue_timeout_ms,
+        "event_listeners": [pool_stats, query_stats_listener],
+    }
+    if settings.mongodb_compressors:
+        options["compressors"] = settings.mongodb_compressors
+        options["zlibCompressionLevel"] = settings.mongodb_zlib_compression_level
+    return AsyncIOMotorClient(settings.mongodb_url, **options)
+
+
+async def connect():
+    """Open the client, warm the connection pool and make sure indexes exist"""
+    global client, _database
+    client = create_client()
+    _database = client[settings.database_name]
+
+    try:
+        # Concurrent pings force the pool to open that many connections up front
+        await asyncio.gather(*(
+            client.admin.command("ping") for _ in range(max(settings.mongodb_min_pool_size, 1))
+        ))
+    except PyMongoError as e:
+        logger.error("MongoDB is not reachable at startup: %s", e)
+        return
+
+    if settings.mongodb_ensure_indexes:
+        created = await ensure_indexes(_database)
+        logger.info("Ensured indexes: %s", {name: len(indexes) for name, indexes in created.items()})
+
+
+def close():
+    """Close the client opened by connect()"""
+    global client, _database
+    if client is not None:
+        client.close()
+    client = None
+    _database = None
+
+
+def get_database_handle():
+    """Return the connected database, failing loudly if the lifespan has not run"""
+    if _database is None:
+        raise RuntimeError("Database is not connected; core.database.connect() runs in the app lifespan")
+    return _database
 
 
 async def get_database():
-    return database
+    return get_database_handle()
+
+
+async def ping() -> float:
+    """Round trip a ping to the server and return the latency in milliseconds"""
+    start = time.perf_counter()
+    await get_database_handle().command("ping")
+    return (time.perf_counter() - start) * 1000
+
+
+def pool_status() -> dict:
+    """Current connection pool usage, see PoolStats.snapshot()"""
+    return pool_stats.snapshot()
+
+
+def duplicate_key_field(details: Optional[dict]) -> Optional[str]:
+    """Return the field whose unique index rejected a write, if it can be determined
+
+    Accepts ``DuplicateKeyError.details`` or a single entry of a bulk write's ``writeErrors``.
+    """
+    details = details or {}
+    key_pattern = details.get("keyPattern") or details.get("keyValue")
+    if key_pattern:
+        return next(iter(key_pattern))
+    # Older servers only report the index name in the message, e.g. "index: reg_no_1"
+    match = re.search(r"index: (\w+?)_-?1", details.get("errmsg", ""))
+    return match.group(1) if match else None
@@ -0,0 +1,100 @@
+"""
+In-process fan-out of new activity events to live streams
+
+Each open activity stream subscribes to a topic, ``u:<user_id>`` or ``g:<gig_id>``, and
+gets newly recorded events pushed onto a bounded queue, so streams never poll the
+database. A subscriber that falls ``activity_stream_queue_size`` events behind is dropped:
+its stream ends and the client reconnects with Last-Event-ID, catching up from the
+events collection instead of holding an unbounded backlog here.
+
+By default the hub only sees events recorded by this process. With several workers, set
+``ACTIVITY_CHANGE_STREAM=true`` (requires a replica set): every worker then follows
+inserts into ``events`` through a change stream and publishes those instead.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def event_topics(event: dict) -> List[str]:
+    return [f"u:{user_id}" for user_id in event.get("u", ())] + [f"g:{event['g']}"]
+
+
+class Subscription:
+    """Queue of events for one stream; ``get`` returns None once the subscriber was dropped"""
+
+    def __init__(self, hub: "EventHub", topics: List[str]):
+        self.hub = hub
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.activity_stream_queue_size)
+
+    async def get(self) -> Optional[dict]:
+        return await self.queue.get()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(self, list(topics))
+        for topic in subscription.topics:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def publish(self, event: dict):
+        delivered = set()
+        for topic in event_topics(event):
+            for subscription in list(self._subscribers.get(topic, ())):
+                if subscription in delivered:
+                    continue
+                delivered.add(subscription)
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._drop(subscription)
+
+    def _drop(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    @property
+    def subscribers(self) -> int:
+        return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+    async def follow(self, collection):
+        """Publish every document inserted into ``collection``, from any process, until cancelled"""
+        while True:
+            try:
+                async with collection.watch([{"$match": {"operationType": "insert"}}]) as stream:
+                    async for change in stream:
+                        self.publish(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Activity change stream failed, retrying: %s", e)
+                await asyncio.sleep(1)
+
+
+event_hub = EventHub()
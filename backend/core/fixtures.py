@@ -0,0 +1,16 @@
+"""
+Vocabulary for synthetic data
+
+Shared by seed_data.py, the load test population and the benchmarks, so generated
+gigs and professors read alike whichever tool made them.
+"""
+
+AREAS = ["Machine Learning", "Databases", "Computer Vision", "Networks", "Robotics", "NLP"]
+TECHNOLOGIES = ["Python", "PyTorch", "MongoDB", "React", "C++", "ROS", "TensorFlow", "Rust"]
+VOCABULARY = (
+    "we study scalable robust efficient learning models for large datasets graphs sensors images text "
+    "students will design implement evaluate benchmark prototype systems algorithms pipelines experiments "
+    "with focus on latency accuracy privacy fairness energy memory throughput reproducibility and analysis "
+    "of real world deployments across hospitals campuses factories farms cities networks satellites "
+    "project includes literature review data collection annotation training ablation writing a paper"
+).split()
@@ -0,0 +1,194 @@
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Indexes every collection needs; applied at startup and by init_mongodb.py.
+# Each one exists for a query shape in QUERY_SHAPES below (verify_indexes.py checks that).
+# Compound keys follow equality, sort, range order, so one index serves a filter and its sort.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "professors": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        # Directory pages ordered by name (_id breaks ties), unfiltered or by department / college
+        IndexModel([("name", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("department", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("college_name", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)]),
+        # Multikey: prefix search over name and research area tokens, matched in the index
+        # while it is walked in name order, without and with a department
+        IndexModel([("name", ASCENDING), ("_id", ASCENDING), ("search_terms", ASCENDING)]),
+        IndexModel([("department", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING), ("search_terms", ASCENDING)]),
+    ],
+    "gigs": [
+        IndexModel([("status", ASCENDING)]),
+        # professor_id alone (dashboard) and professor_id + status (filtered listing)
+        IndexModel([("professor_id", ASCENDING), ("status", ASCENDING)]),
+        # Multikey: LSH band keys of open and on-hold gigs, for similar gigs
+        IndexModel([("lsh_bands", ASCENDING), ("status", ASCENDING)]),
+    ],
+    "students": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("reg_no", ASCENDING)], unique=True),
+    ],
+    "applications": [
+        # gig_id alone (applicant list) and gig_id + student_id (has this student applied)
+        IndexModel([("gig_id", ASCENDING), ("student_id", ASCENDING)]),
+        # Professor inbox: one gig's applications, newest first, paged by _id; with and
+        # without a status filter
+        IndexModel([("gig_id", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("gig_id", ASCENDING), ("status", ASCENDING), ("_id", DESCENDING)]),
+        # The two branches of the $or in get_student_applications; student_email can go
+        # once applications_by_student_id is enabled (see backfill_student_ids.py)
+        IndexModel([("student_id", ASCENDING)]),
+        IndexModel([("student_email", ASCENDING)]),
+    ],
+    "notifications": [
+        # Notification panel: a user's notifications, newest first, without an in-memory sort
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+        # Unread count / mark all read (user_id + read) and the pending "new applications"
+        # notice looked up per gig by create_or_update_application_notification
+        IndexModel([("user_id", ASCENDING), ("read", ASCENDING), ("metadata.gig_id", ASCENDING)]),
+    ],
+    "events": [
+        # Activity feeds of a user and of a gig, newest first, paged by _id
+        IndexModel([("u", ASCENDING), ("_id", DESCENDING)]),
+        IndexModel([("g", ASCENDING), ("_id", DESCENDING)]),
+    ],
+    "saved_searches": [
+        # Multikey: the percolator's inverted index from query terms to searches
+        IndexModel([("terms", ASCENDING)]),
+        # A student's searches, oldest first
+        IndexModel([("student_id", ASCENDING), ("created_at", ASCENDING)]),
+    ],
+}
+
+# Indexes earlier versions created that an index above now covers (as a prefix or
+# replacement). Dropped by init_mongodb.py, never at app startup.
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    "professors": ["search_terms_1"],
+    "gigs": ["professor_id_1"],
+    "applications": ["gig_id_1", "status_1"],
+    "notifications": ["user_id_1", "read_1", "user_id_1_read_1", "created_at_1"],
+}
+
+
+class QueryShape(NamedTuple):
+    """A query the routers issue, with placeholder values; see repositories/"""
+
+    name: str
+    collection: str
+    filter: dict
+    sort: Optional[List[Tuple[str, int]]] = None
+    # Deliberately unfiltered listings scan the whole collection
+    full_scan: bool = False
+    # Index the repository forces with hint(); verify_indexes.py checks the plan uses it
+    hint: Optional[str] = None
+
+
+_ID = "000000000000000000000000"
+
+# Every filter the repositories send, kept next to the indexes that serve them
+QUERY_SHAPES: List[QueryShape] = [
+    QueryShape("professor by email (login)", "professors", {"email": "x@example.edu"}),
+    QueryShape("professor directory", "professors", {}, sort=[("name", 1), ("_id", 1)]),
+    QueryShape("directory by department", "professors", {"department": "Physics"}, sort=[("name", 1), ("_id", 1)]),
+    QueryShape(
+        "directory by department and college", "professors",
+        {"department": "Physics", "college_name": "X"}, sort=[("name", 1), ("_id", 1)],
+    ),
+    QueryShape("directory by college", "professors", {"college_name": "X"}, sort=[("name", 1), ("_id", 1)]),
+    QueryShape(
+        "directory search", "professors",
+        {"$and": [{"search_terms": {"$regex": "^mach"}}, {"search_terms": {"$regex": "^lear"}}]},
+        sort=[("name", 1), ("_id", 1)], hint="name_1__id_1_search_terms_1",
+    ),
+    QueryShape(
+        "directory search by department", "professors",
+        {"department": "Physics", "$and": [{"search_terms": {"$regex": "^mach"}}]},
+        sort=[("name", 1), ("_id", 1)], hint="department_1_name_1__id_1_search_terms_1",
+    ),
+    QueryShape("student by email (login)", "students", {"email": "x@example.edu"}),
+    QueryShape("list gigs", "gigs", {}, full_scan=True),
+    QueryShape("list gigs by status", "gigs", {"status": "open"}),
+    QueryShape("list gigs by professor and status", "gigs", {"status": "open", "professor_id": _ID}),
+    QueryShape("gigs of a professor", "gigs", {"professor_id": _ID}),
+    QueryShape("similar gigs", "gigs", {"lsh_bands": {"$in": ["0a1b2c3d4e5f6", "1a1b2c3d4e5f6"]}, "status": "open"}),
+    QueryShape("applications for a gig", "applications", {"gig_id": _ID}),
+    QueryShape(
+        "professor inbox, one gig by status", "applications",
+        {"gig_id": _ID, "status": "pending", "_id": {"$lt": ObjectId(_ID)}}, sort=[("_id", -1)],
+    ),
+    QueryShape(
+        "professor inbox, one gig", "applications",
+        {"gig_id": _ID, "_id": {"$lt": ObjectId(_ID)}}, sort=[("_id", -1)],
+    ),
+    QueryShape("existing application check", "applications", {"gig_id": _ID, "student_id": _ID}),
+    QueryShape(
+        "applications of a student", "applications",
+        {"$or": [{"student_id": _ID}, {"student_email": "x@example.edu"}]},
+    ),
+    QueryShape("applications of a student (after backfill)", "applications", {"student_id": _ID}),
+    QueryShape("notifications of a user", "notifications", {"user_id": _ID}, sort=[("created_at", -1)]),
+    QueryShape("unread notification count", "notifications", {"user_id": _ID, "read": False}),
+    QueryShape(
+        "pending new-applications notice", "notifications",
+        {
+            "user_id": _ID,
+            "user_type": "professor",
+            "metadata.gig_id": _ID,
+            "metadata.notification_type": "new_applications",
+            "read": False,
+        },
+    ),
+    QueryShape("activity of a user", "events", {"u": _ID, "_id": {"$lt": ObjectId(_ID)}}, sort=[("_id", -1)]),
+    QueryShape("activity of a gig", "events", {"g": _ID, "_id": {"$lt": ObjectId(_ID)}}, sort=[("_id", -1)]),
+    QueryShape("saved searches of a student", "saved_searches", {"student_id": _ID}, sort=[("created_at", 1)]),
+    QueryShape(
+        "saved searches a new gig may match", "saved_searches",
+        {"terms": {"$in": ["area:machine learning", "area:machine learning&tech:python", "tech:python"]}},
+    ),
+]
+
+
+def describe_index(index: IndexModel) -> str:
+    """Human readable description of an index, e.g. "unique index on 'email'" """
+    spec = index.document
+    fields = " and ".join(f"'{field}'" for field in spec["key"])
+    kind = "compound index" if len(spec["key"]) > 1 else "index"
+    if spec.get("unique"):
+        kind = f"unique {kind}"
+    return f"{kind} on {fields}"
+
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    """Create any missing indexes from INDEXES
+
+    ``create_indexes`` is a no-op for indexes that already exist with the same spec, so
+    this is safe to run on every startup. Conflicting definitions are logged and skipped
+    rather than aborting the remaining collections.
+    """
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        try:
+            created[collection_name] = await database[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error("Could not ensure indexes on '%s': %s", collection_name, e)
+            created[collection_name] = []
+    return created
+
+
+async def prune_indexes(database) -> Dict[str, List[str]]:
+    """Drop the OBSOLETE_INDEXES that exist; returns what was dropped per collection"""
+    dropped = {}
+    for collection_name, names in OBSOLETE_INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        dropped[collection_name] = []
+        for name in names:
+            if name in existing:
+                await collection.drop_index(name)
+                dropped[collection_name].append(name)
+    return dropped
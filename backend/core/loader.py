@@ -0,0 +1,139 @@
+"""
+Request-scoped batching and deduplication of lookups by _id
+
+``await gig_repository.load(id)`` does not query straight away: ids requested in the same
+event loop tick are collected and fetched with one ``{"_id": {"$in": [...]}}`` query per
+collection, and every id is fetched at most once per request (callers share the returned
+document, so treat it as read-only). Code that resolves related documents for a list can
+therefore await them concurrently (``load_many`` or ``asyncio.gather``) and issue one
+query instead of one per item.
+
+``LoaderMiddleware`` gives each HTTP request its own ``RequestLoaders`` through a context
+variable, so cached documents never outlive the request. Outside a request (scripts,
+benchmarks) each call gets fresh loaders: ``load_many`` still batches, nothing is cached.
+"""
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+
+# Upper bound on the ids sent in one $in query
+MAX_BATCH_SIZE = 1000
+
+
+class Loader:
+    """Batches ``load`` calls for one collection into ``$in`` queries"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._futures: Dict[ObjectId, asyncio.Future] = {}
+        self._queue: List[ObjectId] = []
+        self.batches = 0
+
+    def load(self, oid: ObjectId) -> asyncio.Future:
+        """Future resolving to the document with this _id, or None if there is none"""
+        future = self._futures.get(oid)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[oid] = loop.create_future()
+            if not self._queue:
+                # Runs after the other tasks already scheduled for this tick have queued their ids
+                loop.call_soon(self._dispatch)
+            self._queue.append(oid)
+        return future
+
+    def clear(self, oid: ObjectId):
+        """Forget a document so the next load fetches it again, e.g. after updating it"""
+        future = self._futures.get(oid)
+        if future is not None and future.done():
+            del self._futures[oid]
+
+    def _dispatch(self):
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), MAX_BATCH_SIZE):
+            asyncio.ensure_future(self._fetch(queue[start:start + MAX_BATCH_SIZE]))
+
+    async def _fetch(self, ids: List[ObjectId]):
+        self.batches += 1
+        try:
+            documents = {doc["_id"]: doc async for doc in self.collection.find({"_id": {"$in": ids}})}
+        except Exception as e:
+            for oid in ids:
+                future = self._futures.pop(oid)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for oid in ids:
+            future = self._futures[oid]
+            if not future.done():
+                future.set_result(documents.get(oid))
+
+
+class RequestLoaders:
+    """One Loader per collection, created on first use"""
+
+    def __init__(self):
+        self._loaders: Dict[str, Loader] = {}
+
+    def for_collection(self, collection) -> Loader:
+        loader = self._loaders.get(collection.name)
+        if loader is None:
+            loader = self._loaders[collection.name] = Loader(collection)
+        return loader
+
+    @property
+    def batches(self) -> int:
+        """$in queries issued so far in this request"""
+        return sum(loader.batches for loader in self._loaders.values())
+
+
+current_loaders: ContextVar[Optional[RequestLoaders]] = ContextVar("current_loaders", default=None)
+
+
+def get_loaders() -> RequestLoaders:
+    """The current request's loaders, or fresh ones outside a request"""
+    loaders = current_loaders.get()
+    return loaders if loaders is not None else RequestLoaders()
+
+
+async def load(collection, oid: Optional[ObjectId]) -> Optional[dict]:
+    if oid is None:
+        return None
+    return await get_loaders().for_collection(collection).load(oid)
+
+
+async def load_many(collection, oids: Iterable[Optional[ObjectId]]) -> List[Optional[dict]]:
+    """Documents for ``oids`` in the same order, None for invalid or missing ids"""
+    loader = get_loaders().for_collection(collection)
+    return list(await asyncio.gather(*(
+        loader.load(oid) if oid is not None else _none() for oid in oids
+    )))
+
+
+async def _none():
+    return None
+
+
+def forget(collection, oid: Optional[ObjectId]):
+    """Drop a cached document from the current request's loader after a write"""
+    loaders = current_loaders.get()
+    if loaders is not None and oid is not None:
+        loaders.for_collection(collection).clear(oid)
+
+
+class LoaderMiddleware:
+    """ASGI middleware giving each HTTP request its own RequestLoaders"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_loaders.set(RequestLoaders())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_loaders.reset(token)
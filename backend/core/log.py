@@ -0,0 +1,233 @@
+"""
+Structured logging through a background writer thread
+
+``configure_logging()`` routes the root logger through a ``QueueHandler``: a request
+only puts the record on a bounded queue and a ``QueueListener`` thread formats and
+writes it, so a slow stdout or log collector never blocks the event loop. When the
+queue is full the record is dropped and counted in ``profhub_log_records_dropped``.
+
+Everything that has to see the request happens before the record is queued:
+- ``request_id`` is taken from the context variable set by ``RequestIdMiddleware``. The
+  middleware reads ``X-Request-ID`` from the request, or generates one, and echoes it in
+  the response.
+- DEBUG records are kept at random with ``LOG_DEBUG_SAMPLE_RATE``. Below ``LOG_LEVEL``
+  they cost a level check only.
+- Values passed in ``extra`` are copied, and ``REDACTED_FIELDS`` are masked at any depth,
+  so documents can be logged as they are.
+
+``LOG_FORMAT=json`` writes one orjson object per line, ``text`` a line for reading.
+"""
+import atexit
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, List, Optional
+
+import orjson
+
+from .config import settings
+from .metrics import REGISTRY
+
+REDACTED_FIELDS = frozenset({"cover_letter", "password", "hashed_password", "access_token", "token"})
+REDACTED = "[redacted]"
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Client-supplied ids are echoed and logged, so only short plain tokens are accepted
+_VALID_REQUEST_ID = re.compile(r"[\w.:-]{1,128}")
+
+current_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_RECORD_FIELDS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "request_id"}
+
+_dropped = [0]
+REGISTRY.gauge(
+    "profhub_log_records_dropped", "Log records dropped because the log queue was full",
+    callback=lambda: {(): _dropped[0]},
+)
+
+# Libraries that log every request at INFO, e.g. httpx for each outgoing request
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+_listener: Optional["DrainingQueueListener"] = None
+# Root handlers configure_logging took over, put back by stop_logging
+_replaced: List[logging.Handler] = []
+
+
+def redact(value: Any) -> Any:
+    """Copy of ``value`` with ``REDACTED_FIELDS`` masked in nested dicts and lists"""
+    if isinstance(value, dict):
+        return {key: REDACTED if key in REDACTED_FIELDS else redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return value
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in record.__dict__.items() if key not in _RECORD_FIELDS}
+
+
+class ContextFilter(logging.Filter):
+    """Samples DEBUG records, then stamps the request id and snapshots redacted extras"""
+
+    def filter(self, record):
+        if record.levelno == logging.DEBUG and random.random() >= settings.log_debug_sample_rate:
+            return False
+        record.request_id = current_request_id.get()
+        for key, value in _extra_fields(record).items():
+            setattr(record, key, REDACTED if key in REDACTED_FIELDS else redact(value))
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never waits: records that do not fit in the queue are dropped"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped[0] += 1
+
+    def prepare(self, record):
+        # Like QueueHandler.prepare, but keeps the traceback apart from the message so the
+        # JSON formatter can put it in its own field
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener whose stop waits for room in a full queue instead of failing"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, request id and extras"""
+
+    converter = time.gmtime  # UTC, like the datetimes the app stores
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.request_id:
+            entry["request_id"] = record.request_id
+        entry.update(_extra_fields(record))
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        # str() for anything orjson cannot encode natively, e.g. ObjectId
+        return orjson.dumps(entry, default=str).decode()
+
+    def formatTime(self, record, datefmt=None):
+        return super().formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z"
+
+
+class TextFormatter(logging.Formatter):
+    """``time LEVEL logger [request id] message key=value ...``"""
+
+    converter = time.gmtime
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record):
+        record.request_id = record.request_id or "-"
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def configure_logging():
+    """Send the root logger through the queue to a writer thread; does nothing if already done
+
+    Handlers a caller installed first (e.g. ``basicConfig`` in a script) are replaced, so
+    records are not also written synchronously, and the caller's level is kept. Otherwise
+    the root level is ``LOG_LEVEL``.
+    """
+    global _listener, _replaced
+    if _listener is not None:
+        return
+    root = logging.getLogger()
+    _replaced = root.handlers[:]
+    for existing in _replaced:
+        root.removeHandler(existing)
+    if not _replaced:
+        root.setLevel(settings.log_level.upper())
+    for name in QUIET_LOGGERS:
+        if logging.getLogger(name).level == logging.NOTSET:
+            logging.getLogger(name).setLevel(logging.WARNING)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+    handler = DroppingQueueHandler(queue.Queue(settings.log_queue_size))
+    handler.addFilter(ContextFilter())
+    root.addHandler(handler)
+    _listener = DrainingQueueListener(handler.queue, output)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Detach the queue from the root logger, write out what it holds and stop the writer thread"""
+    global _listener, _replaced
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    for handler in _replaced:
+        root.addHandler(handler)
+    _replaced = []
+    _listener.stop()
+    _listener = None
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestIdMiddleware:
+    """ASGI middleware giving each request a correlation id for its log records and response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = _header(scope, REQUEST_ID_HEADER)
+        if request_id is None or not _VALID_REQUEST_ID.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        encoded = request_id.encode()
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (REQUEST_ID_HEADER, encoded)]}
+            await send(message)
+
+        token = current_request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            current_request_id.reset(token)
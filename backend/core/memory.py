@@ -0,0 +1,999 @@
+"""
+In-process MongoDB stand-in with a Motor compatible API
+
+Selected with ``MONGODB_URL=memory://``. It implements the subset of Motor the app uses:
+CRUD, cursors with sort/skip/limit, projections, the common query and update operators,
+the aggregation stages the repositories use, and indexes. Indexes are real: every index
+keeps a hash table on its first field, so equality and ``$in`` lookups on indexed fields
+do not scan the collection, and unique indexes raise the same DuplicateKeyError /
+BulkWriteError as the server.
+
+It exists for load tests and benchmarks that must run without a MongoDB server; data lives
+only as long as the process. Commands are reported to the current request's query stats
+like real commands are, so query budgets work the same.
+"""
+import asyncio
+import itertools
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+from .query_stats import current_query_stats
+
+MISSING = object()
+
+
+def _copy(value):
+    """Copy a document deeply enough that callers cannot mutate stored state"""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+async def _round_trip():
+    # Yield to the event loop once per command, as awaiting a real server does, so
+    # concurrent requests interleave between commands the same way they would in production
+    await asyncio.sleep(0)
+
+
+def _record(command_name: str, start: float, documents: int):
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(command_name, (time.perf_counter() - start) * 1000, documents)
+
+
+# ---------------------------------------------------------------------------
+# Field access and comparison
+
+
+def _values_at(doc, path: str) -> List[Any]:
+    """All values found at a dotted path, descending into arrays, or [MISSING]"""
+    current = [doc]
+    for part in path.split("."):
+        found = []
+        for value in current:
+            if isinstance(value, dict):
+                if part in value:
+                    found.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit() and int(part) < len(value):
+                    found.append(value[int(part)])
+                else:
+                    found.extend(item[part] for item in value if isinstance(item, dict) and part in item)
+        if not found:
+            return [MISSING]
+        current = found
+    return current
+
+
+def _expand(values: List[Any]) -> List[Any]:
+    """Candidate values for matching: each value plus the elements of array values"""
+    expanded = []
+    for value in values:
+        expanded.append(value)
+        if isinstance(value, list):
+            expanded.extend(value)
+    return expanded
+
+
+def _type_rank(value) -> int:
+    # Mongo's BSON comparison order for the types the app stores
+    if value is None or value is MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def _sort_key(value):
+    rank = _type_rank(value)
+    if rank == 1:
+        return (rank, 0)
+    if rank in (4, 5):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def _comparable(a, b) -> bool:
+    return a is not MISSING and b is not MISSING and _type_rank(a) == _type_rank(b) and _type_rank(a) not in (1, 4, 5)
+
+
+def _equals(candidate, value) -> bool:
+    if value is None:
+        return candidate is None or candidate is MISSING
+    if candidate is MISSING:
+        return False
+    if isinstance(value, bool) or isinstance(candidate, bool):
+        return type(value) is type(candidate) and value == candidate
+    return candidate == value
+
+
+def _hashable(value):
+    if isinstance(value, dict):
+        return ("__dict__", tuple((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return ("__list__", tuple(_hashable(item) for item in value))
+    if isinstance(value, bool):
+        return ("__bool__", value)
+    if value is MISSING:
+        return None
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Query matching
+
+
+def _match_operator(values: List[Any], operator: str, argument) -> bool:
+    candidates = _expand(values)
+    if operator == "$eq":
+        return any(_equals(candidate, argument) for candidate in candidates)
+    if operator == "$ne":
+        return not any(_equals(candidate, argument) for candidate in candidates)
+    if operator == "$in":
+        return any(_match_value(values, item) for item in argument)
+    if operator == "$nin":
+        return not any(_match_value(values, item) for item in argument)
+    if operator in ("$gt", "$gte", "$lt", "$lte"):
+        for candidate in candidates:
+            if not _comparable(candidate, argument):
+                continue
+            if operator == "$gt" and candidate > argument:
+                return True
+            if operator == "$gte" and candidate >= argument:
+                return True
+            if operator == "$lt" and candidate < argument:
+                return True
+            if operator == "$lte" and candidate <= argument:
+                return True
+        return False
+    if operator == "$exists":
+        exists = values != [MISSING]
+        return exists if argument else not exists
+    if operator == "$regex":
+        pattern = argument if hasattr(argument, "search") else re.compile(argument)
+        return any(isinstance(candidate, str) and pattern.search(candidate) for candidate in candidates)
+    if operator == "$all":
+        return all(_match_value(values, item) for item in argument)
+    if operator == "$size":
+        return any(isinstance(value, list) and len(value) == argument for value in values)
+    if operator == "$elemMatch":
+        return any(
+            isinstance(value, list) and any(isinstance(item, dict) and matches(item, argument) for item in value)
+            for value in values
+        )
+    if operator == "$not":
+        return not _match_condition(values, argument)
+    raise OperationFailure(f"Unsupported query operator in memory engine: {operator}")
+
+
+def _match_value(values: List[Any], value) -> bool:
+    if hasattr(value, "search") and hasattr(value, "pattern"):
+        return _match_operator(values, "$regex", value)
+    return any(_equals(candidate, value) for candidate in _expand(values))
+
+
+def _is_operator_dict(value) -> bool:
+    return isinstance(value, dict) and bool(value) and all(key.startswith("$") for key in value)
+
+
+def _match_condition(values: List[Any], condition) -> bool:
+    if _is_operator_dict(condition):
+        if "$regex" in condition:
+            flags = 0
+            for flag in condition.get("$options", ""):
+                flags |= {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}.get(flag, 0)
+            pattern = condition["$regex"]
+            compiled = re.compile(pattern if isinstance(pattern, str) else pattern.pattern, flags)
+            if not _match_operator(values, "$regex", compiled):
+                return False
+        return all(
+            _match_operator(values, operator, argument)
+            for operator, argument in condition.items()
+            if operator not in ("$regex", "$options")
+        )
+    return _match_value(values, condition)
+
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    """Whether ``doc`` satisfies a MongoDB query document"""
+    if not query:
+        return True
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, clause) for clause in condition):
+                return False
+        elif key.startswith("$"):
+            raise OperationFailure(f"Unsupported top-level operator in memory engine: {key}")
+        elif not _match_condition(_values_at(doc, key), condition):
+            return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Projection and updates
+
+
+def _project(doc: dict, projection) -> dict:
+    if not projection:
+        return _copy(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = projection.get("_id", 1)
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(fields.values()):
+        result = {}
+        for field in fields:
+            top = field.split(".", 1)[0]
+            if top in doc:
+                result[top] = _copy(doc[top])
+        if include_id and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    result = {key: _copy(value) for key, value in doc.items() if key not in fields}
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def _set_path(doc: dict, path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _get_path(doc: dict, path: str, default=None):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return default
+        doc = doc[part]
+    return doc
+
+
+def _unset_path(doc: dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def _apply_update(doc: dict, update: dict, inserting: bool = False) -> dict:
+    if not any(key.startswith("$") for key in update):
+        replacement = _copy(update)
+        replacement["_id"] = doc["_id"]
+        return replacement
+    doc = _copy(doc)
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            if operator == "$set":
+                _set_path(doc, path, _copy(value))
+            elif operator == "$setOnInsert":
+                if inserting:
+                    _set_path(doc, path, _copy(value))
+            elif operator == "$unset":
+                _unset_path(doc, path)
+            elif operator == "$inc":
+                _set_path(doc, path, _get_path(doc, path, 0) + value)
+            elif operator in ("$push", "$addToSet"):
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                array = list(_get_path(doc, path, []))
+                for item in items:
+                    if operator == "$push" or item not in array:
+                        array.append(_copy(item))
+                _set_path(doc, path, array)
+            elif operator == "$pull":
+                array = _get_path(doc, path, [])
+                _set_path(doc, path, [item for item in array if not _match_value([item], value)])
+            elif operator == "$currentDate":
+                _set_path(doc, path, datetime.utcnow())
+            else:
+                raise OperationFailure(f"Unsupported update operator in memory engine: {operator}")
+    return doc
+
+
+def _upsert_seed(query: dict) -> dict:
+    """Fields a query pins by equality, used as the base of an upserted document"""
+    seed = {}
+    for key, value in (query or {}).items():
+        if not key.startswith("$") and not _is_operator_dict(value):
+            _set_path(seed, key, _copy(value))
+        elif _is_operator_dict(value) and "$eq" in value:
+            _set_path(seed, key, _copy(value["$eq"]))
+    return seed
+
+
+# ---------------------------------------------------------------------------
+# Indexes
+
+
+class MemoryIndex:
+    """Hash index on the first key field; unique indexes also check the full key"""
+
+    def __init__(self, name: str, keys: List[Tuple[str, Any]], unique: bool = False,
+                 sparse: bool = False, partial_filter: Optional[dict] = None):
+        self.name = name
+        self.keys = keys
+        self.fields = [field for field, _ in keys]
+        self.unique = unique
+        self.sparse = sparse
+        self.partial_filter = partial_filter
+        self.hashed = all(direction in (1, -1, "hashed") for _, direction in keys)
+        self.buckets: Dict[Any, set] = defaultdict(set)
+        self.unique_keys: Dict[Tuple, Any] = {}
+
+    def spec(self) -> dict:
+        spec = {"v": 2, "key": dict(self.keys), "name": self.name}
+        if self.unique:
+            spec["unique"] = True
+        if self.sparse:
+            spec["sparse"] = True
+        if self.partial_filter:
+            spec["partialFilterExpression"] = self.partial_filter
+        return spec
+
+    def applies_to(self, doc: dict) -> bool:
+        if self.sparse and all(_values_at(doc, field) == [MISSING] for field in self.fields):
+            return False
+        return self.partial_filter is None or matches(doc, self.partial_filter)
+
+    def _first_field_keys(self, doc: dict) -> set:
+        return {_hashable(value) for value in _expand(_values_at(doc, self.fields[0]))}
+
+    def unique_key(self, doc: dict) -> Tuple:
+        return tuple(_hashable(_values_at(doc, field)[0]) for field in self.fields)
+
+    def add(self, doc: dict):
+        if not self.applies_to(doc):
+            return
+        for key in self._first_field_keys(doc):
+            self.buckets[key].add(doc["_id"])
+        if self.unique:
+            self.unique_keys[self.unique_key(doc)] = doc["_id"]
+
+    def remove(self, doc: dict):
+        if not self.applies_to(doc):
+            return
+        for key in self._first_field_keys(doc):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(doc["_id"])
+                if not bucket:
+                    del self.buckets[key]
+        if self.unique:
+            self.unique_keys.pop(self.unique_key(doc), None)
+
+    def conflict(self, doc: dict) -> bool:
+        """Whether storing ``doc`` would violate this unique index"""
+        if not self.unique or not self.applies_to(doc):
+            return False
+        owner = self.unique_keys.get(self.unique_key(doc))
+        return owner is not None and owner != doc["_id"]
+
+    def lookup(self, condition) -> Optional[set]:
+        """Ids possibly matching ``condition`` on the first field, or None if the index can't help"""
+        if _is_operator_dict(condition):
+            if set(condition) == {"$eq"}:
+                values = [condition["$eq"]]
+            elif set(condition) == {"$in"} and all(not isinstance(v, dict) for v in condition["$in"]):
+                values = list(condition["$in"])
+            else:
+                return None
+        elif isinstance(condition, dict) or hasattr(condition, "pattern"):
+            return None
+        else:
+            values = [condition]
+        if any(value is None for value in values) or self.sparse or self.partial_filter:
+            return None
+        ids = set()
+        for value in values:
+            ids |= self.buckets.get(_hashable(value), set())
+        return ids
+
+
+def _index_name(keys: List[Tuple[str, Any]]) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+# ---------------------------------------------------------------------------
+# Aggregation expressions
+
+
+def _evaluate(expression, doc: dict, variables: Dict[str, Any]):
+    """Value of an aggregation expression for ``doc``; "$field" and "$$variable" paths"""
+    if isinstance(expression, str) and expression.startswith("$$"):
+        name, _, path = expression[2:].partition(".")
+        value = variables.get(name, MISSING) if name != "ROOT" else doc
+        return _get_path(value, path, MISSING) if path else value
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _get_path(doc, expression[1:], MISSING)
+    if isinstance(expression, list):
+        return [_evaluate(item, doc, variables) for item in expression]
+    if isinstance(expression, dict):
+        if _is_operator_dict(expression) and len(expression) == 1:
+            operator, argument = next(iter(expression.items()))
+            return _evaluate_operator(operator, argument, doc, variables)
+        return {key: _evaluate(value, doc, variables) for key, value in expression.items()}
+    return expression
+
+
+def _evaluate_operator(operator: str, argument, doc: dict, variables: Dict[str, Any]):
+    if operator == "$literal":
+        return argument
+    args = argument if isinstance(argument, list) else [argument]
+    values = [_evaluate(arg, doc, variables) for arg in args]
+    if operator == "$eq":
+        return _equals(values[0], values[1]) or (values[0] is MISSING and values[1] is MISSING)
+    if operator == "$ne":
+        return not _evaluate_operator("$eq", argument, doc, variables)
+    if operator == "$and":
+        return all(value not in (False, None, 0, MISSING) for value in values)
+    if operator == "$toString":
+        value = values[0]
+        return None if value is None or value is MISSING else str(value)
+    if operator == "$ifNull":
+        return next((value for value in values if value is not None and value is not MISSING), None)
+    if operator == "$mergeObjects":
+        merged = {}
+        for value in values:
+            if isinstance(value, dict):
+                merged.update(value)
+        return merged
+    raise OperationFailure(f"Unsupported expression operator in memory engine: {operator}")
+
+
+def _expr_equalities(expression, variables: Dict[str, Any]) -> dict:
+    """Field equalities an $expr pins, e.g. {"$eq": ["$gig_id", "$$gig_id"]} -> {"gig_id": "..."}
+
+    Lets a $lookup sub-pipeline use indexes for its correlated match, as the server does.
+    """
+    clauses = expression.get("$and", [expression]) if isinstance(expression, dict) else []
+    equalities = {}
+    for clause in clauses:
+        pair = clause.get("$eq") if isinstance(clause, dict) else None
+        if not isinstance(pair, list) or len(pair) != 2:
+            continue
+        field, value = pair
+        if isinstance(value, str) and value.startswith("$") and not value.startswith("$$"):
+            field, value = value, field
+        if isinstance(field, str) and field.startswith("$") and not field.startswith("$$"):
+            value = _evaluate(value, {}, variables)
+            if value is not MISSING and not isinstance(value, (dict, list)):
+                equalities[field[1:]] = value
+    return equalities
+
+
+# ---------------------------------------------------------------------------
+# Collections and cursors
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query: Optional[dict], projection=None):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[List[dict]] = None
+        self._position = 0
+
+    def sort(self, key_or_list, direction: int = 1) -> "MemoryCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = list(key_or_list.items()) if isinstance(key_or_list, dict) else list(key_or_list)
+        return self
+
+    def skip(self, skip: int) -> "MemoryCursor":
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "MemoryCursor":
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int) -> "MemoryCursor":
+        return self
+
+    def hint(self, index) -> "MemoryCursor":
+        return self  # No indexes to choose between
+
+    def _execute(self) -> List[dict]:
+        start = time.perf_counter()
+        docs = self._collection._select(self._query)
+        for field, direction in reversed(self._sort):
+            docs.sort(key=lambda doc: _sort_key(_values_at(doc, field)[0]), reverse=direction == -1)
+        if self._skip:
+            docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        results = [_project(doc, self._projection) for doc in docs]
+        _record("find", start, len(results))
+        return results
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        if self._results is None:
+            await _round_trip()
+            self._results = self._execute()
+        if self._position >= len(self._results):
+            raise StopAsyncIteration
+        doc = self._results[self._position]
+        self._position += 1
+        return doc
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        if self._results is None:
+            await _round_trip()
+            self._results = self._execute()
+        end = len(self._results) if length is None else self._position + length
+        docs = self._results[self._position:end]
+        self._position += len(docs)
+        return docs
+
+
+class MemoryAggregationCursor(MemoryCursor):
+    def __init__(self, collection: "MemoryCollection", pipeline: List[dict]):
+        super().__init__(collection, None)
+        self._pipeline = pipeline
+
+    def _execute(self) -> List[dict]:
+        start = time.perf_counter()
+        results = self._collection._aggregate(self._pipeline, {})
+        _record("aggregate", start, len(results))
+        return results
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._docs: Dict[Any, dict] = {}
+        self._indexes: Dict[str, MemoryIndex] = {}
+        # Insertion sequence per _id, so index lookups return documents in natural order
+        self._order: Dict[Any, int] = {}
+        self._sequence = itertools.count()
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.database.name}.{self.name}"
+
+    # -- indexes --------------------------------------------------------
+
+    async def create_index(self, keys, unique: bool = False, name: Optional[str] = None, **kwargs) -> str:
+        return (await self.create_indexes([IndexModel(keys, unique=unique, name=name, **kwargs)]))[0]
+
+    async def create_indexes(self, indexes: Iterable[IndexModel]) -> List[str]:
+        names = []
+        for model in indexes:
+            spec = model.document
+            keys = list(spec["key"].items())
+            name = spec.get("name") or _index_name(keys)
+            if name not in self._indexes:
+                index = MemoryIndex(
+                    name, keys, unique=spec.get("unique", False), sparse=spec.get("sparse", False),
+                    partial_filter=spec.get("partialFilterExpression"),
+                )
+                for doc in self._docs.values():
+                    if index.conflict(doc):
+                        raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} index: {name}")
+                    index.add(doc)
+                self._indexes[name] = index
+            names.append(name)
+        return names
+
+    async def index_information(self) -> dict:
+        info = {"_id_": {"v": 2, "key": [("_id", 1)]}}
+        for name, index in self._indexes.items():
+            spec = index.spec()
+            spec["key"] = list(spec["key"].items())
+            info[name] = spec
+        return info
+
+    async def drop_index(self, name: str):
+        self._indexes.pop(name, None)
+
+    # -- internals ------------------------------------------------------
+
+    def _candidate_ids(self, query: dict) -> Optional[set]:
+        """Ids that may match, from _id, the most selective usable index or a union over $or"""
+        if "_id" in query:
+            condition = query["_id"]
+            if _is_operator_dict(condition) and set(condition) == {"$in"}:
+                return {i for i in condition["$in"] if i in self._docs}
+            if not isinstance(condition, dict):
+                return {condition} if condition in self._docs else set()
+        best = None
+        for index in self._indexes.values():
+            field = index.fields[0]
+            if field in query:
+                ids = index.lookup(query[field])
+                if ids is not None and (best is None or len(ids) < len(best)):
+                    best = ids
+        if best is None and "$or" in query:
+            # Like the server's OR plan: usable only if every clause can use an index
+            best = set()
+            for clause in query["$or"]:
+                ids = self._candidate_ids(clause)
+                if ids is None:
+                    return None
+                best |= ids
+        return best
+
+    def _candidates(self, query: dict) -> Iterable[dict]:
+        ids = self._candidate_ids(query)
+        if ids is None:
+            return list(self._docs.values())
+        return [self._docs[i] for i in sorted(ids, key=self._order.__getitem__)]
+
+    def _select(self, query: Optional[dict]) -> List[dict]:
+        query = query or {}
+        return [doc for doc in self._candidates(query) if matches(doc, query)]
+
+    def _check_unique(self, doc: dict):
+        for index in self._indexes.values():
+            if index.conflict(doc):
+                key_pattern = dict(index.keys)
+                key_value = {field: _values_at(doc, field)[0] for field in index.fields}
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {self.full_name} index: {index.name} dup key: {key_value}",
+                    11000,
+                    {"code": 11000, "keyPattern": key_pattern, "keyValue": key_value,
+                     "errmsg": f"E11000 duplicate key error collection: {self.full_name} index: {index.name}"},
+                )
+
+    def _store(self, doc: dict):
+        self._check_unique(doc)
+        self._docs[doc["_id"]] = doc
+        self._order[doc["_id"]] = next(self._sequence)
+        for index in self._indexes.values():
+            index.add(doc)
+
+    def _replace(self, old: dict, new: dict):
+        for index in self._indexes.values():
+            index.remove(old)
+        try:
+            self._check_unique(new)
+        except DuplicateKeyError:
+            for index in self._indexes.values():
+                index.add(old)
+            raise
+        self._docs[new["_id"]] = new
+        for index in self._indexes.values():
+            index.add(new)
+
+    def _delete(self, doc: dict):
+        for index in self._indexes.values():
+            index.remove(doc)
+        del self._docs[doc["_id"]]
+        del self._order[doc["_id"]]
+
+    def _insert(self, document: dict) -> Any:
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        if document["_id"] in self._docs:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.full_name} index: _id_", 11000,
+                {"code": 11000, "keyPattern": {"_id": 1}, "keyValue": {"_id": document["_id"]}},
+            )
+        self._store(_copy(document))
+        return document["_id"]
+
+    # -- CRUD -----------------------------------------------------------
+
+    async def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        await _round_trip()
+        start = time.perf_counter()
+        inserted_id = self._insert(document)
+        _record("insert", start, 1)
+        return InsertOneResult(inserted_id, True)
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True, **kwargs) -> InsertManyResult:
+        await _round_trip()
+        start = time.perf_counter()
+        documents = list(documents)
+        inserted_ids, write_errors = [], []
+        for position, document in enumerate(documents):
+            try:
+                inserted_ids.append(self._insert(document))
+            except DuplicateKeyError as e:
+                write_errors.append({"index": position, "code": 11000, "errmsg": str(e), **(e.details or {})})
+                if ordered:
+                    break
+        _record("insert", start, len(inserted_ids))
+        if write_errors:
+            raise BulkWriteError({
+                "writeErrors": write_errors, "writeConcernErrors": [], "nInserted": len(inserted_ids),
+                "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": [],
+            })
+        return InsertManyResult(inserted_ids, True)
+
+    async def find_one(self, filter: Optional[dict] = None, projection=None, *args, sort=None, **kwargs) -> Optional[dict]:
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        cursor = MemoryCursor(self, filter, projection).limit(1)
+        if sort:
+            cursor.sort(sort)
+        docs = await cursor.to_list(1)
+        return docs[0] if docs else None
+
+    def find(self, filter: Optional[dict] = None, projection=None, *args, sort=None, skip: int = 0,
+             limit: int = 0, **kwargs) -> MemoryCursor:
+        cursor = MemoryCursor(self, filter, projection).skip(skip).limit(limit)
+        if sort:
+            cursor.sort(sort)
+        return cursor
+
+    def aggregate(self, pipeline: List[dict], **kwargs) -> MemoryAggregationCursor:
+        """Pipelines of $match, $project, $lookup, $unwind, $replaceWith, $sort, $skip and $limit"""
+        return MemoryAggregationCursor(self, pipeline)
+
+    def _aggregate(self, pipeline: List[dict], variables: Dict[str, Any]) -> List[dict]:
+        stages = list(pipeline)
+        first = stages[0].get("$match") if stages else None
+        if first is not None:
+            # A leading $match selects through the indexes, like the server's first stage
+            query = {key: value for key, value in first.items() if key != "$expr"}
+            if "$expr" in first:
+                query.update(_expr_equalities(first["$expr"], variables))
+            docs = [_copy(doc) for doc in self._select(query)]
+        else:
+            docs = [_copy(doc) for doc in self._candidates({})]
+        for stage in stages:
+            (name, argument), = stage.items()
+            if name == "$match":
+                query = {key: value for key, value in argument.items() if key != "$expr"}
+                expr = argument.get("$expr")
+                docs = [
+                    doc for doc in docs
+                    if matches(doc, query) and (expr is None or _evaluate(expr, doc, variables) is True)
+                ]
+            elif name == "$project":
+                computed = {key: value for key, value in argument.items() if not isinstance(value, (int, bool))}
+                flags = {key: value for key, value in argument.items() if key not in computed}
+                projected = []
+                for doc in docs:
+                    if computed and not any(value for key, value in flags.items() if key != "_id"):
+                        # Only computed fields: an inclusion projection of nothing else
+                        result = {"_id": doc["_id"]} if flags.get("_id", 1) and "_id" in doc else {}
+                    else:
+                        result = _project(doc, flags)
+                    for key, expression in computed.items():
+                        result[key] = _evaluate(expression, doc, variables)
+                    projected.append(result)
+                docs = projected
+            elif name == "$lookup":
+                foreign = self.database.get_collection(argument["from"])
+                for doc in docs:
+                    if "pipeline" in argument:
+                        scope = {**variables, **{
+                            key: _evaluate(expression, doc, variables)
+                            for key, expression in argument.get("let", {}).items()
+                        }}
+                        joined = foreign._aggregate(argument["pipeline"], scope)
+                    else:
+                        local = _get_path(doc, argument["localField"])
+                        joined = foreign._aggregate([{"$match": {argument["foreignField"]: local}}], variables)
+                    _set_path(doc, argument["as"], joined)
+            elif name == "$unwind":
+                path = (argument if isinstance(argument, str) else argument["path"])[1:]
+                unwound = []
+                for doc in docs:
+                    for item in _get_path(doc, path) or []:
+                        copy = dict(doc)
+                        _set_path(copy, path, item)
+                        unwound.append(copy)
+                docs = unwound
+            elif name in ("$replaceWith", "$replaceRoot"):
+                expression = argument if name == "$replaceWith" else argument["newRoot"]
+                docs = [_evaluate(expression, doc, variables) for doc in docs]
+            elif name == "$sort":
+                for field, direction in reversed(list(argument.items())):
+                    docs.sort(key=lambda doc: _sort_key(_values_at(doc, field)[0]), reverse=direction == -1)
+            elif name == "$skip":
+                docs = docs[argument:]
+            elif name == "$limit":
+                docs = docs[:argument]
+            else:
+                raise OperationFailure(f"Unsupported aggregation stage in memory engine: {name}")
+        return docs
+
+    async def count_documents(self, filter: dict, **kwargs) -> int:
+        await _round_trip()
+        start = time.perf_counter()
+        count = len(self._select(filter))
+        _record("count", start, 1)
+        return count
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return len(self._docs)
+
+    async def distinct(self, key: str, filter: Optional[dict] = None, **kwargs) -> list:
+        await _round_trip()
+        start = time.perf_counter()
+        seen, values = set(), []
+        for doc in self._select(filter):
+            for value in _expand(_values_at(doc, key)):
+                if value is MISSING or isinstance(value, list):
+                    continue
+                marker = _hashable(value)
+                if marker not in seen:
+                    seen.add(marker)
+                    values.append(value)
+        _record("distinct", start, len(values))
+        return values
+
+    def _update(self, filter: dict, update: dict, multi: bool, upsert: bool) -> Tuple[int, int, Any, Optional[dict], Optional[dict]]:
+        """Apply an update; returns (matched, modified, upserted_id, before, after) for the last document"""
+        targets = self._select(filter)
+        if not multi:
+            targets = targets[:1]
+        before = after = None
+        modified = 0
+        for doc in targets:
+            new = _apply_update(doc, update)
+            if new != doc:
+                self._replace(doc, new)
+                modified += 1
+            before, after = doc, new
+        if not targets and upsert:
+            seed = _upsert_seed(filter)
+            seed.setdefault("_id", ObjectId())
+            new = _apply_update(seed, update, inserting=True)
+            self._store(new)
+            return 0, 0, new["_id"], None, new
+        return len(targets), modified, None, before, after
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        await _round_trip()
+        start = time.perf_counter()
+        matched, modified, upserted_id, _, _ = self._update(filter, update, multi=False, upsert=upsert)
+        _record("update", start, matched)
+        raw = {"n": matched or int(upserted_id is not None), "nModified": modified, "ok": 1.0}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        await _round_trip()
+        start = time.perf_counter()
+        matched, modified, upserted_id, _, _ = self._update(filter, update, multi=True, upsert=upsert)
+        _record("update", start, matched)
+        raw = {"n": matched or int(upserted_id is not None), "nModified": modified, "ok": 1.0}
+        if upserted_id is not None:
+            raw["upserted"] = upserted_id
+        return UpdateResult(raw, True)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return await self.update_one(filter, replacement, upsert=upsert)
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection=None, sort=None, upsert: bool = False,
+                                  return_document=ReturnDocument.BEFORE, **kwargs) -> Optional[dict]:
+        await _round_trip()
+        start = time.perf_counter()
+        if sort:
+            first = await self.find_one(filter, sort=sort)
+            filter = {"_id": first["_id"]} if first else filter
+        _, _, _, before, after = self._update(filter, update, multi=False, upsert=upsert)
+        _record("findAndModify", start, 1 if (before or after) else 0)
+        doc = after if return_document else before
+        return _project(doc, projection) if doc is not None else None
+
+    async def delete_one(self, filter: dict, **kwargs) -> DeleteResult:
+        await _round_trip()
+        start = time.perf_counter()
+        targets = self._select(filter)[:1]
+        for doc in targets:
+            self._delete(doc)
+        _record("delete", start, len(targets))
+        return DeleteResult({"n": len(targets), "ok": 1.0}, True)
+
+    async def delete_many(self, filter: dict, **kwargs) -> DeleteResult:
+        await _round_trip()
+        start = time.perf_counter()
+        targets = self._select(filter)
+        for doc in targets:
+            self._delete(doc)
+        _record("delete", start, len(targets))
+        return DeleteResult({"n": len(targets), "ok": 1.0}, True)
+
+    async def drop(self):
+        self._docs.clear()
+        self._order.clear()
+        self._indexes.clear()
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def get_collection(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(self, name)
+        return collection
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        return self.get_collection(name)
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.get_collection(name)
+
+    async def list_collection_names(self) -> List[str]:
+        return [name for name, collection in self._collections.items() if collection._docs]
+
+    async def command(self, command, *args, **kwargs) -> dict:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"Unsupported command in memory engine: {name}")
+
+    async def drop_collection(self, name: str):
+        self._collections.pop(name, None)
+
+
+class MemoryClient:
+    """Drop-in for AsyncIOMotorClient backed by process memory"""
+
+    def __init__(self, url: str = "memory://", **options):
+        self.url = url
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def get_database(self, name: str) -> MemoryDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = MemoryDatabase(self, name)
+        return database
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        return self.get_database(name)
+
+    @property
+    def admin(self) -> MemoryDatabase:
+        return self.get_database("admin")
+
+    async def drop_database(self, name: str):
+        self._databases.pop(name, None)
+
+    def close(self):
+        pass
+
+
+def is_memory_url(url: str) -> bool:
+    return url.startswith("memory://")
@@ -0,0 +1,227 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition
+
+Metrics are updated from the event loop only, so they need no locking. Label values are
+passed as tuples in the order of ``labelnames``.
+"""
+from bisect import bisect_left
+from collections import Counter as _Tally
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Prometheus client defaults, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+SIZE_BUCKETS = (256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+_STATUS_LABELS = {code: str(code) for code in range(100, 600)}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback: Optional[Callable[[], Dict[Tuple, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._callback = callback
+
+    def set(self, labels: Tuple, value: float):
+        self._values[labels] = value
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Tuple = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+    def samples(self):
+        values = self._callback() if self._callback else self._values
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one non-cumulative count per bucket plus +Inf, then the sum
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, labels: Tuple, value: float):
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 2)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, labels: Tuple = ()) -> int:
+        state = self._values.get(labels)
+        return int(sum(state[:-1])) if state else 0
+
+    def samples(self):
+        lines = []
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_str} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics.values())
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def route_template(scope) -> str:
+    """Templated path of the route that handled the request, e.g. /api/gigs/{gig_id}"""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request counts, latency, response size and in-flight requests
+
+    The route label is the matched route template, read from the scope after the router
+    has run, so the label set stays bounded no matter which ids appear in URLs. In-flight
+    requests are only counted at scrape time from the set of active scopes, which keeps
+    the per-request cost to a dict insert and delete.
+    """
+
+    def __init__(self, app, registry: Registry = REGISTRY):
+        self.app = app
+        self._active: Dict[int, dict] = {}
+        self.requests = registry.counter(
+            "profhub_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+        )
+        self.latency = registry.histogram(
+            "profhub_http_request_duration_seconds", "HTTP request latency", ("method", "route")
+        )
+        self.response_size = registry.histogram(
+            "profhub_http_response_size_bytes", "HTTP response body size", ("method", "route"), SIZE_BUCKETS
+        )
+        registry.gauge(
+            "profhub_http_requests_in_flight", "HTTP requests currently being handled",
+            ("method", "route"), callback=self._in_flight
+        )
+
+    def _in_flight(self) -> Dict[Tuple, float]:
+        return dict(_Tally((scope["method"], route_template(scope)) for scope in self._active.values()))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        key = id(scope)
+        self._active[key] = scope
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            del self._active[key]
+            labels = (scope["method"], route_template(scope))
+            self.requests.inc(labels + (_STATUS_LABELS.get(status) or str(status),))
+            self.latency.observe(labels, elapsed)
+            self.response_size.observe(labels, size)
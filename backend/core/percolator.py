@@ -0,0 +1,115 @@
+"""
+Matching new gigs against students' saved searches
+
+A saved search is a conjunction of clauses, each a set of alternative terms: its area of
+study, any one of its technologies, the student's year, funded or not. A gig is reduced
+to the set of terms it satisfies, and a search matches when every clause shares a term
+with that set.
+
+Searches are not scanned to find the ones a gig matches. Each one is indexed in the
+multikey ``terms`` field of ``saved_searches`` under ``anchor_terms``: the pairs of terms
+that satisfy its two most selective clauses (or the terms of its only clause). The gig's
+terms and term pairs (``probe_terms``) select the candidates with one indexed $in query
+and ``matches`` checks any further clauses, so the cost follows the number of matching
+searches rather than the number of saved searches.
+"""
+import re
+from itertools import combinations
+from typing import Iterable, List, Optional, Set
+
+# Students are in years 1..MAX_YEAR; gigs without a readable requirement are open to all
+MAX_YEAR = 5
+
+_ORDINALS = {"first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5}
+# Years, as "3", "3rd" or "third"; other numbers (e.g. a CGPA) make the requirement unreadable
+_YEAR = re.compile(r"\b(\d+)(?:st|nd|rd|th)?\b|\b(" + "|".join(_ORDINALS) + r")\b")
+# "3rd year+", "3rd year and above", "2nd year onwards", "at least 2nd year"; "above 2nd
+# year" reads as 2nd year and above too, erring towards an extra alert
+_AT_LEAST = re.compile(r"\+|\b(?:above|higher|later|up|over|beyond|onwards?|plus|more|least|min|minimum)\b")
+# "up to 3rd year", "2nd year or below"
+_AT_MOST = re.compile(r"\b(?:below|lower|under|earlier|most|max|maximum)\b|\bup to\b")
+# "2nd-4th year", "2 to 4", "2nd through 4th"
+_THROUGH = re.compile(r"^\s*(?:-|–|to|through|till|until)\s*$")
+
+
+def normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def split_technologies(technologies: Optional[str]) -> List[str]:
+    """Technologies of a gig, entered as free text such as "Python, PyTorch" """
+    if not technologies:
+        return []
+    return [normalize(t) for t in re.split(r"[,;/]", technologies) if t.strip()]
+
+
+def eligible_years(year_requirement: Optional[str]) -> List[int]:
+    """Student years a requirement such as "3rd year and above", "2nd-4th year" or "3rd or 4th year" admits
+
+    Anything the parser is unsure of admits every year: a missed alert costs more than an
+    extra one.
+    """
+    every_year = list(range(1, MAX_YEAR + 1))
+    text = normalize(year_requirement or "")
+    matches = list(_YEAR.finditer(text))
+    years = [int(match.group(1)) if match.group(1) else _ORDINALS[match.group(2)] for match in matches]
+    if not years or any(year < 1 or year > MAX_YEAR for year in years):
+        return every_year
+    at_most = bool(_AT_MOST.search(text))
+    at_least = bool(_AT_LEAST.search(_AT_MOST.sub(" ", text)))
+    if at_least and at_most:
+        return every_year
+    if at_least:
+        return list(range(min(years), MAX_YEAR + 1))
+    if at_most:
+        return list(range(1, max(years) + 1))
+    eligible = set(years)
+    for index in range(len(matches) - 1):
+        if _THROUGH.match(text[matches[index].end():matches[index + 1].start()]):
+            low, high = sorted(years[index:index + 2])
+            eligible.update(range(low, high + 1))
+    return sorted(eligible)
+
+
+def gig_terms(gig: dict) -> Set[str]:
+    """Every term a gig satisfies"""
+    terms = {f"funded:{str(bool(gig.get('funded'))).lower()}"}
+    if gig.get("area_of_study"):
+        terms.add(f"area:{normalize(gig['area_of_study'])}")
+    terms.update(f"tech:{technology}" for technology in split_technologies(gig.get("technologies")))
+    terms.update(f"year:{year}" for year in eligible_years(gig.get("year_requirement")))
+    return terms
+
+
+def search_clauses(search: dict) -> List[List[str]]:
+    """Clauses of a saved search, most selective first"""
+    clauses = []
+    if search.get("area_of_study"):
+        clauses.append([f"area:{normalize(search['area_of_study'])}"])
+    if search.get("technologies"):
+        clauses.append(sorted({f"tech:{normalize(t)}" for t in search["technologies"]}))
+    if search.get("year") is not None:
+        clauses.append([f"year:{search['year']}"])
+    if search.get("funded") is not None:
+        clauses.append([f"funded:{str(search['funded']).lower()}"])
+    return clauses
+
+
+def _pair(a: str, b: str) -> str:
+    return f"{a}&{b}" if a < b else f"{b}&{a}"
+
+
+def anchor_terms(clauses: List[List[str]]) -> List[str]:
+    """Terms a search is indexed under; a gig reaches it only if it satisfies the first two clauses"""
+    if len(clauses) < 2:
+        return clauses[0] if clauses else []
+    return sorted({_pair(a, b) for a in clauses[0] for b in clauses[1]})
+
+
+def probe_terms(terms: Set[str]) -> List[str]:
+    """Index terms of every search whose first two clauses a gig with ``terms`` satisfies"""
+    return sorted(terms) + [_pair(a, b) for a, b in combinations(sorted(terms), 2)]
+
+
+def matches(clauses: Iterable[Iterable[str]], terms: Set[str]) -> bool:
+    return all(not terms.isdisjoint(clause) for clause in clauses)
@@ -0,0 +1,138 @@
+"""
+Opt-in statistical profiling of single requests
+
+With ``PROFILING_ENABLED=true`` (and pyinstrument installed) a request is profiled when
+it carries ``X-Profile: <PROFILING_TOKEN>``, or at random with ``PROFILING_SAMPLE_RATE``.
+pyinstrument samples the stack every ``PROFILING_INTERVAL_MS`` in async mode, so time a
+handler spends awaiting MongoDB is attributed to the await that waited rather than lost
+in the event loop, and other requests running meanwhile do not show up.
+
+The profile is written to ``PROFILING_DIR`` in speedscope format. Token-triggered
+requests get its location in an ``X-Profile-URL`` response header; open it at
+https://www.speedscope.app or download it with the same ``X-Profile`` header (or
+``?token=``). The file is written after the response is sent. Only the newest
+``PROFILING_MAX_FILES`` profiles are kept.
+
+When profiling is disabled the middleware is not installed at all, so it costs nothing.
+"""
+import asyncio
+import hmac
+import logging
+import random
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+from .config import settings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pragma: no cover - optional dependency
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILES_PATH = "/profiles/"
+_PROFILE_NAME = re.compile(r"[\w.-]+\.speedscope\.json$")
+_UNSAFE = re.compile(r"[^\w-]+")
+
+
+def profiling_available() -> bool:
+    if settings.profiling_enabled and Profiler is None:
+        logger.warning("PROFILING_ENABLED is set but pyinstrument is not installed; profiling is off")
+    return settings.profiling_enabled and Profiler is not None
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _authorized(scope) -> bool:
+    token = settings.profiling_token
+    if not token:
+        return False
+    supplied = _header(scope, b"x-profile")
+    if supplied is None:
+        # Decoded like any query parameter, so a token with reserved characters can be escaped
+        supplied = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("token", [None])[0]
+    return supplied is not None and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests on demand and serving the stored profiles"""
+
+    def __init__(self, app):
+        self.app = app
+        self.directory = Path(settings.profiling_dir)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"].startswith(PROFILES_PATH):
+            await self._serve(scope, send)
+            return
+
+        requested = _authorized(scope)
+        if not requested and not (settings.profiling_sample_rate and random.random() < settings.profiling_sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        name = "{}-{}-{}-{}.speedscope.json".format(
+            time.strftime("%Y%m%dT%H%M%S"), scope["method"],
+            _UNSAFE.sub("_", scope["path"]).strip("_")[:80] or "root", secrets.token_hex(4),
+        )
+
+        async def send_with_link(message):
+            if message["type"] == "http.response.start" and requested:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-url", f"{PROFILES_PATH}{name}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=settings.profiling_interval_ms / 1000, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_link if requested else send)
+        finally:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            await asyncio.to_thread(self._write, profiler, name)
+            logger.info("Profiled %s %s in %.1fms: %s%s", scope["method"], scope["path"], elapsed_ms,
+                        PROFILES_PATH, name)
+
+    def _write(self, profiler, name: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / name).write_text(profiler.output(SpeedscopeRenderer()))
+        profiles = sorted(self.directory.glob("*.speedscope.json"), key=lambda path: path.stat().st_mtime)
+        for old in profiles[:-settings.profiling_max_files]:
+            old.unlink(missing_ok=True)
+
+    async def _serve(self, scope, send):
+        name = scope["path"][len(PROFILES_PATH):]
+        path = self.directory / name
+        if not _authorized(scope):
+            status, body = 403, b'{"detail":"Profiling token required"}'
+        elif not _PROFILE_NAME.match(name) or not path.is_file():
+            status, body = 404, b'{"detail":"Profile not found"}'
+        else:
+            status, body = 200, await asyncio.to_thread(path.read_bytes)
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"private, no-store"),
+                (b"access-control-allow-origin", b"https://www.speedscope.app"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
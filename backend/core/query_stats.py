@@ -0,0 +1,215 @@
+"""
+Per-request MongoDB command instrumentation
+
+A PyMongo command listener attributes every command to the request that issued it through
+a context variable. Motor runs PyMongo calls on executor threads with a copy of the caller's
+context, so the listener sees the same RequestQueryStats object as the request handler.
+"""
+import json
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+from pymongo import monitoring
+
+from .config import settings
+from .metrics import REGISTRY, route_template
+
+logger = logging.getLogger(__name__)
+
+# Commands the driver issues for itself that say nothing about the query patterns of a route
+IGNORED_COMMANDS = frozenset({"endSessions", "hello", "isMaster", "ismaster", "saslStart", "saslContinue"})
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class RequestQueryStats:
+    """Database commands issued while handling one request"""
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.failures = 0
+        self.duration_ms = 0.0
+        self.documents = 0
+        self.commands = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, command_name: str, duration_ms: float, documents: int, failed: bool = False):
+        with self._lock:
+            self.count += 1
+            self.duration_ms += duration_ms
+            self.documents += documents
+            self.commands[command_name] += 1
+            if failed:
+                self.failures += 1
+
+    @property
+    def route(self) -> str:
+        # Read lazily: the router fills in scope["route"] after the middleware has started
+        return route_template(self.scope) if self.scope is not None else "-"
+
+    def breakdown(self) -> str:
+        """Commands by frequency, e.g. "find x12, insert x1" """
+        return ", ".join(f"{name} x{count}" for name, count in self.commands.most_common())
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def filter_shape(value):
+    """Replace the values in a query with "?" keeping field names and operators
+
+    {"$or": [{"student_id": "abc"}, {"student_email": "x@y"}]} becomes
+    {"$or": [{"student_id": "?"}, {"student_email": "?"}]}
+    """
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Operator arrays ($or, $and) keep one shape per clause, value arrays ($in) collapse
+        if value and all(isinstance(item, dict) for item in value):
+            return [filter_shape(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def command_filter(command_name: str, command: dict):
+    """Extract the query filter of a command, where the command has one"""
+    if command_name == "find":
+        return command.get("filter")
+    if command_name in ("count", "distinct", "findAndModify"):
+        return command.get("query")
+    if command_name == "update":
+        updates = command.get("updates") or [{}]
+        return updates[0].get("q")
+    if command_name == "delete":
+        deletes = command.get("deletes") or [{}]
+        return deletes[0].get("q")
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        return pipeline[0].get("$match") if pipeline else None
+    return None
+
+
+def returned_documents(command_name: str, reply: dict) -> int:
+    """Number of documents a command returned or affected"""
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """Attribute commands to the current request and log slow ones with their filter shape"""
+
+    def __init__(self):
+        # Started events keyed by connection and request id, so the command document is
+        # still available when the matching succeeded or failed event arrives
+        self._pending = {}
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        self._pending[(event.connection_id, event.request_id)] = (
+            event.command_name, event.database_name, event.command
+        )
+
+    def succeeded(self, event):
+        self._finish(event, event.reply, failed=False)
+
+    def failed(self, event):
+        self._finish(event, {}, failed=True)
+
+    def _finish(self, event, reply: dict, failed: bool):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        command_name, database_name, command = pending
+        duration_ms = event.duration_micros / 1000
+        documents = returned_documents(command_name, reply)
+
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(command_name, duration_ms, documents, failed)
+
+        if duration_ms >= settings.slow_query_ms:
+            collection = command.get("collection" if command_name == "getMore" else command_name)
+            query = command_filter(command_name, command)
+            sort = command.get("sort")
+            logger.warning(
+                "Slow %s on %s.%s took %.1fms returning %d documents; filter=%s sort=%s route=%s",
+                command_name, database_name, collection, duration_ms, documents,
+                json.dumps(filter_shape(query) if query is not None else None),
+                json.dumps(sort, default=str),
+                stats.route if stats is not None else "-",
+            )
+
+
+query_stats_listener = QueryStatsListener()
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware giving each request its own RequestQueryStats
+
+    Records queries per request and database time per route, and warns when a request
+    issues more commands than ``settings.query_budget``. With ``settings.query_stats_headers``
+    the counts are also returned in ``Server-Timing`` and ``X-Query-Budget-Exceeded`` headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.queries = REGISTRY.histogram(
+            "profhub_db_queries_per_request", "Database commands issued per request",
+            ("method", "route"), QUERY_COUNT_BUCKETS
+        )
+        self.db_time = REGISTRY.histogram(
+            "profhub_db_time_seconds", "Time spent in database commands per request", ("method", "route")
+        )
+        self.over_budget = REGISTRY.counter(
+            "profhub_db_query_budget_exceeded_total", "Requests that issued more commands than the query budget",
+            ("method", "route")
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = current_query_stats.set(stats)
+        budget = settings.query_budget
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.query_stats_headers:
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"'.encode(),
+                ))
+                if stats.count > budget:
+                    headers.append((b"x-query-budget-exceeded", f"{stats.count}/{budget}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            method = scope["method"]
+            route = stats.route
+            self.queries.observe((method, route), stats.count)
+            self.db_time.observe((method, route), stats.duration_ms / 1000)
+            if stats.count > budget:
+                self.over_budget.inc((method, route))
+                logger.warning(
+                    "%s %s issued %d database commands (budget %d) taking %.1fms of %.1fms: %s",
+                    method, route, stats.count, budget, stats.duration_ms,
+                    (perf_counter() - start) * 1000, stats.breakdown(),
+                )
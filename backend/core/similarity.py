@@ -0,0 +1,89 @@
+"""
+MinHash signatures and LSH band keys for "similar gigs"
+
+A gig is reduced to a set of features: word 2-shingles of its description, plus its
+area of study and technologies. The structured features are added as several copies
+(FEATURE_WEIGHTS) so a shared area or technology counts like that many description
+shingles. The Jaccard similarity of two feature sets is estimated by MinHash: with
+NUM_PERMUTATIONS hash functions, the chance that two sets have the same minimum under
+one of them equals their Jaccard similarity.
+
+The signature is cut into BANDS bands of ROWS values, and each band is hashed to a key.
+Gigs store their keys in the multikey-indexed ``lsh_bands`` field, so gigs sharing a key
+are found with an indexed $in lookup instead of comparing against every gig. Two gigs
+with similarity s share at least one key with probability 1 - (1 - s^ROWS)^BANDS: about
+0.64 at s = 0.5 and 0.998 at s = 0.75 with 16 bands of 4 rows. Candidates are ranked by
+the number of keys they share, which grows with s.
+
+Every gig stores exactly BANDS short keys, so the index grows linearly with the number
+of indexed gigs and no more. Closed gigs are dropped from it (see GigRepository).
+Changing any constant here changes the keys: unset ``lsh_bands`` on every gig and rerun
+``init_mongodb.py`` to recompute them.
+"""
+import hashlib
+import random
+import re
+import struct
+from typing import Iterable, List, Optional, Set
+
+from .percolator import normalize, split_technologies
+
+# Fields whose changes require new band keys
+SIMILARITY_FIELDS = ("description", "technologies", "area_of_study")
+
+BANDS = 16
+ROWS = 4
+NUM_PERMUTATIONS = BANDS * ROWS
+
+# Copies of each structured feature in the feature set
+FEATURE_WEIGHTS = {"area": 6, "tech": 3}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN = re.compile(r"[^\W_]+")
+
+# Fixed seed: keys stored in the database must be reproducible by every process
+_rng = random.Random(20240901)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def _hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), "little")
+
+
+def features(gig: dict) -> Set[str]:
+    """The feature set a gig is compared on"""
+    words = _TOKEN.findall((gig.get("description") or "").lower())
+    result = {f"{a} {b}" for a, b in zip(words, words[1:])} if len(words) > 1 else set(words)
+    structured = []
+    if gig.get("area_of_study"):
+        structured.append(("area", normalize(gig["area_of_study"])))
+    structured.extend(("tech", technology) for technology in split_technologies(gig.get("technologies")))
+    for kind, value in structured:
+        result.update(f"{kind}:{value}#{copy}" for copy in range(FEATURE_WEIGHTS[kind]))
+    return result
+
+
+def signature(feature_set: Iterable[str]) -> Optional[List[int]]:
+    """MinHash signature of a feature set; None when it is empty"""
+    hashes = [_hash(feature) for feature in feature_set]
+    if not hashes:
+        return None
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_keys(gig: dict) -> List[str]:
+    """LSH keys a gig is indexed under: one per band, prefixed with the band number"""
+    values = signature(features(gig))
+    if values is None:
+        return []
+    keys = []
+    for band in range(BANDS):
+        rows = struct.pack(f"<{ROWS}I", *values[band * ROWS:(band + 1) * ROWS])
+        keys.append(f"{band:x}{hashlib.blake2b(rows, digest_size=6).hexdigest()}")
+    return keys
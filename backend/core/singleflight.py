@@ -0,0 +1,50 @@
+"""
+Single-flight coalescing of identical concurrent reads
+
+When many clients ask for the same thing at the same moment (a new batch of gigs, one
+popular gig), only the first request runs the query and encodes the response; requests
+with the same key that arrive while it is in flight wait for it and reuse its bytes.
+Nothing is kept once the call completes, so results are never staler than the query.
+
+The call runs as its own task: a caller that disconnects does not cancel it for the others.
+Errors, HTTPException included, are shared the same way as results.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from .metrics import REGISTRY
+
+T = TypeVar("T")
+
+coalesced_requests = REGISTRY.counter(
+    "profhub_singleflight_requests_total",
+    "Reads served through single-flight, by whether they ran the query or shared another's",
+    ("route", "role"),
+)
+
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent callers with the same key"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finished(key, done))
+            coalesced_requests.inc((self.name, "leader"))
+        else:
+            coalesced_requests.inc((self.name, "coalesced"))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
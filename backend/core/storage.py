@@ -0,0 +1,201 @@
+"""
+Resume file storage: GridFS against MongoDB, a local directory in development
+
+Both backends take uploads as an async iterator of chunks and serve downloads as one, so a
+file is never held in memory whole. The SHA-256 of the content is computed while it is
+written and kept as the file's ETag.
+
+``RESUME_STORAGE=auto`` (the default) uses GridFS, or the local directory when
+``MONGODB_URL=memory://`` since the in-memory engine has no GridFS.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, NamedTuple, Optional
+
+from bson import ObjectId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from .config import settings
+from .database import get_database_handle
+from .memory import is_memory_url
+
+CHUNK_SIZE = 255 * 1024  # GridFS default chunk size, also used to read local files
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+class StoredFile(NamedTuple):
+    id: str
+    filename: str
+    content_type: str
+    length: int
+    etag: str
+    uploaded_at: datetime
+
+
+class GridFSStorage:
+    """Files in the ``resumes`` GridFS bucket of the app database"""
+
+    bucket_name = "resumes"
+
+    @property
+    def bucket(self) -> AsyncIOMotorGridFSBucket:
+        return AsyncIOMotorGridFSBucket(get_database_handle(), bucket_name=self.bucket_name,
+                                        chunk_size_bytes=CHUNK_SIZE)
+
+    @property
+    def files(self):
+        return get_database_handle()[f"{self.bucket_name}.files"]
+
+    async def save(self, chunks: AsyncIterator[bytes], filename: str, content_type: str,
+                   max_bytes: int) -> StoredFile:
+        stream = self.bucket.open_upload_stream(filename, metadata={"content_type": content_type})
+        digest, length = hashlib.sha256(), 0
+        try:
+            async for chunk in chunks:
+                length += len(chunk)
+                if length > max_bytes:
+                    raise FileTooLarge()
+                digest.update(chunk)
+                await stream.write(chunk)
+        except BaseException:
+            await stream.abort()  # removes the chunks written so far
+            raise
+        await stream.close()
+        etag = digest.hexdigest()
+        await self.files.update_one({"_id": stream._id}, {"$set": {"metadata.etag": etag}})
+        return StoredFile(str(stream._id), filename, content_type, length, etag, stream.upload_date)
+
+    @staticmethod
+    def _stored(doc: dict) -> StoredFile:
+        metadata = doc.get("metadata") or {}
+        return StoredFile(str(doc["_id"]), doc["filename"], metadata.get("content_type", "application/octet-stream"),
+                          doc["length"], metadata.get("etag", str(doc["_id"])), doc["uploadDate"])
+
+    async def info(self, file_id: str) -> Optional[StoredFile]:
+        if not ObjectId.is_valid(file_id):
+            return None
+        doc = await self.files.find_one({"_id": ObjectId(file_id)})
+        return self._stored(doc) if doc is not None else None
+
+    async def info_many(self, file_ids: Iterable[str]) -> Dict[str, StoredFile]:
+        """Stored files by id, read with one ``$in`` query; unknown ids are left out"""
+        ids = list({ObjectId(file_id) for file_id in file_ids if ObjectId.is_valid(file_id)})
+        if not ids:
+            return {}
+        return {str(doc["_id"]): self._stored(doc) async for doc in self.files.find({"_id": {"$in": ids}})}
+
+    async def read(self, file_id: str, start: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        grid_out = await self.bucket.open_download_stream(ObjectId(file_id))
+        grid_out.seek(start)
+        remaining = grid_out.length - start if length is None else length
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete(self, file_id: str):
+        if ObjectId.is_valid(file_id):
+            try:
+                await self.bucket.delete(ObjectId(file_id))
+            except NoFile:
+                pass
+
+
+class LocalStorage:
+    """Files in a directory, with a JSON sidecar holding what GridFS keeps in ``files``"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _paths(self, file_id: str):
+        return self.directory / file_id, self.directory / f"{file_id}.json"
+
+    async def save(self, chunks: AsyncIterator[bytes], filename: str, content_type: str,
+                   max_bytes: int) -> StoredFile:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file_id = str(ObjectId())
+        path, meta_path = self._paths(file_id)
+        partial = path.with_name(f"{file_id}.part")
+        digest, length = hashlib.sha256(), 0
+        out = await asyncio.to_thread(open, partial, "wb")
+        try:
+            async for chunk in chunks:
+                length += len(chunk)
+                if length > max_bytes:
+                    raise FileTooLarge()
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        except BaseException:
+            out.close()
+            partial.unlink(missing_ok=True)
+            raise
+        out.close()
+        stored = StoredFile(file_id, filename, content_type, length, digest.hexdigest(), datetime.utcnow())
+        meta_path.write_text(json.dumps({**stored._asdict(), "uploaded_at": stored.uploaded_at.isoformat()}))
+        os.replace(partial, path)
+        return stored
+
+    def _info(self, file_id: str) -> Optional[StoredFile]:
+        if not ObjectId.is_valid(file_id):
+            return None
+        path, meta_path = self._paths(file_id)
+        if not path.exists() or not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        meta["uploaded_at"] = datetime.fromisoformat(meta["uploaded_at"])
+        return StoredFile(**meta)
+
+    async def info(self, file_id: str) -> Optional[StoredFile]:
+        return self._info(file_id)
+
+    async def info_many(self, file_ids: Iterable[str]) -> Dict[str, StoredFile]:
+        """Stored files by id, their sidecars read in one worker thread; unknown ids are left out"""
+        def read_all():
+            found = {file_id: self._info(file_id) for file_id in set(file_ids)}
+            return {file_id: stored for file_id, stored in found.items() if stored is not None}
+
+        return await asyncio.to_thread(read_all)
+
+    async def read(self, file_id: str, start: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+        path, _ = self._paths(file_id)
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            f.seek(start)
+            remaining = path.stat().st_size - start if length is None else length
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def delete(self, file_id: str):
+        if ObjectId.is_valid(file_id):
+            for path in self._paths(file_id):
+                path.unlink(missing_ok=True)
+
+
+_storage = None
+
+
+def get_storage():
+    """The configured resume storage backend"""
+    global _storage
+    if _storage is None:
+        backend = settings.resume_storage
+        if backend == "auto":
+            backend = "local" if is_memory_url(settings.mongodb_url) else "gridfs"
+        _storage = LocalStorage(settings.resume_storage_dir) if backend == "local" else GridFSStorage()
+    return _storage
@@ -0,0 +1,296 @@
+"""
+Stream collections to and from NDJSON or BSON files
+
+    cd backend
+    python data_transfer.py export backups/ --compress zstd
+    python data_transfer.py export backups/ -c applications --filter '{"status": "pending"}' --resume
+    python data_transfer.py import backups/ -c gigs applications --resume
+
+Memory use is bounded by --batch-size regardless of collection size: exports page through
+the collection in _id order and write each batch as it arrives, imports decode and insert
+one batch at a time. Collections are processed by up to --workers concurrent workers.
+
+NDJSON uses relaxed extended JSON (ObjectIds and dates round-trip); BSON files are plain
+concatenated documents, as mongodump writes them. With --compress each batch is written as
+its own gzip member / zstd frame, so a file can be truncated to any checkpoint and still
+decompresses as a whole.
+
+Uploaded resumes are exported from their GridFS bucket (``resumes.files`` and
+``resumes.chunks``). With ``RESUME_STORAGE=local`` they are files in ``RESUME_STORAGE_DIR``
+instead, which this tool does not touch; copy that directory alongside the export.
+
+Checkpoints (``<file>.export-checkpoint`` / ``.import-checkpoint``) are written after every batch. ``export --resume``
+truncates the file to the last checkpoint and continues after the last exported _id.
+``import --resume`` skips the documents already imported; duplicate _ids are counted as
+already present rather than failing, so re-running an import is safe either way.
+"""
+import argparse
+import asyncio
+import gzip
+import io
+import json
+import os
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import bson
+from bson import json_util
+from pymongo.errors import BulkWriteError
+
+from core.config import settings
+from core.database import create_client
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# resumes.files / resumes.chunks are the GridFS bucket holding uploaded resumes
+COLLECTIONS = [
+    "professors", "students", "gigs", "applications", "notifications", "events", "saved_searches",
+    "resumes.files", "resumes.chunks",
+]
+# GridFS chunks are up to 255 KiB each, so they are transferred in smaller batches
+MAX_BATCH_SIZES = {"resumes.chunks": 32}
+EXTENSIONS = {"ndjson": ".ndjson", "bson": ".bson"}
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS
+
+
+def data_file(directory: Path, collection: str, fmt: str, compress: str) -> Path:
+    return directory / f"{collection}{EXTENSIONS[fmt]}{COMPRESSION_SUFFIXES[compress]}"
+
+
+def detect(path: Path):
+    """(format, compression) of an export file from its name"""
+    compress = next((name for name, suffix in COMPRESSION_SUFFIXES.items() if suffix and path.name.endswith(suffix)),
+                    "none")
+    stem = path.name[: len(path.name) - len(COMPRESSION_SUFFIXES[compress])]
+    fmt = next((name for name, extension in EXTENSIONS.items() if stem.endswith(extension)), None)
+    return fmt, compress
+
+
+def collection_of(path: Path) -> str:
+    """Collection an export file holds, e.g. resumes.chunks for resumes.chunks.bson.gz"""
+    fmt, compress = detect(path)
+    return path.name[: len(path.name) - len(COMPRESSION_SUFFIXES[compress]) - len(EXTENSIONS[fmt])]
+
+
+def batch_size(collection: str, args) -> int:
+    return min(args.batch_size, MAX_BATCH_SIZES.get(collection, args.batch_size))
+
+
+def encode(documents: List[dict], fmt: str) -> bytes:
+    if fmt == "bson":
+        return b"".join(bson.encode(document) for document in documents)
+    return "".join(json_util.dumps(document, json_options=JSON_OPTIONS) + "\n" for document in documents).encode()
+
+
+def compress_block(block: bytes, compress: str) -> bytes:
+    """Compress one batch as a self-contained gzip member or zstd frame"""
+    if compress == "gzip":
+        return gzip.compress(block, compresslevel=6, mtime=0)
+    if compress == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(block)
+    return block
+
+
+def open_reader(path: Path, compress: str):
+    raw = open(path, "rb")
+    if compress == "gzip":
+        return gzip.GzipFile(fileobj=raw)  # reads all members
+    if compress == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+    return raw
+
+
+def iter_documents(reader, fmt: str) -> Iterator[dict]:
+    if fmt == "bson":
+        yield from bson.decode_file_iter(reader)
+        return
+    buffered = reader if hasattr(reader, "peek") else io.BufferedReader(reader)
+    for line in io.TextIOWrapper(buffered, encoding="utf-8"):
+        if line.strip():
+            yield json_util.loads(line, json_options=JSON_OPTIONS)
+
+
+class Checkpoint:
+    """Progress of one collection transfer, stored next to its data file"""
+
+    def __init__(self, data_path: Path, command: str):
+        self.path = data_path.with_name(f"{data_path.name}.{command}-checkpoint")
+
+    def load(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        return json_util.loads(self.path.read_text(), json_options=JSON_OPTIONS)
+
+    def save(self, state: dict):
+        # Write then rename so a crash never leaves a torn checkpoint
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json_util.dumps(state, json_options=JSON_OPTIONS))
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+def report(verb: str, collection: str, count: int, started: float, size: int, extra: str = ""):
+    elapsed = time.perf_counter() - started
+    print(f"✓ {verb} {collection}: {count:,} documents, {size / 1024 / 1024:.1f} MiB in {elapsed:.1f}s "
+          f"({count / elapsed if elapsed else 0:,.0f} docs/s){extra}", flush=True)
+
+
+async def export_collection(db, collection: str, args):
+    path = data_file(args.directory, collection, args.format, args.compress)
+    checkpoint = Checkpoint(path, "export")
+    state = checkpoint.load() if args.resume else None
+    if state and (not path.exists() or path.stat().st_size < state["offset"]):
+        # The data file was deleted or cut short after the checkpoint, so it cannot be continued
+        print(f"  {collection}: {path} does not match its checkpoint, exporting from the start", flush=True)
+        checkpoint.clear()
+        state = None
+    query = dict(args.filter)
+    mode = "wb"
+    if state:
+        # Discard anything written after the last checkpoint, then continue after its _id
+        with open(path, "r+b") as f:
+            f.truncate(state["offset"])
+        query = {"$and": [query, {"_id": {"$gt": state["last_id"]}}]} if query else {"_id": {"$gt": state["last_id"]}}
+        print(f"  {collection}: resuming after {state['count']:,} documents", flush=True)
+        mode = "ab"
+    else:
+        state = {"count": 0, "offset": 0, "last_id": None}
+
+    projection = dict(args.projection) if args.projection else None
+    if projection and not projection.get("_id", 1):
+        raise SystemExit("--projection must keep _id; exports page and checkpoint by _id")
+
+    started = time.perf_counter()
+    size = batch_size(collection, args)
+    cursor = db[collection].find(query, projection).sort("_id", 1).batch_size(size)
+    with open(path, mode) as out:
+        batch = []
+
+        async def write_batch():
+            block = await asyncio.to_thread(lambda: compress_block(encode(batch, args.format), args.compress))
+            await asyncio.to_thread(out.write, block)
+            out.flush()
+            state["count"] += len(batch)
+            state["offset"] = out.tell()
+            state["last_id"] = batch[-1]["_id"]
+            checkpoint.save(state)
+            batch.clear()
+
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) >= size:
+                await write_batch()
+        if batch:
+            await write_batch()
+    checkpoint.clear()
+    report("Exported", collection, state["count"], started, state["offset"], f" -> {path}")
+
+
+async def import_collection(db, path: Path, args):
+    fmt, compress = detect(path)
+    collection = collection_of(path)
+    size = batch_size(collection, args)
+    checkpoint = Checkpoint(path, "import")
+    state = (checkpoint.load() if args.resume else None) or {"count": 0, "duplicates": 0}
+    if args.drop and not state["count"]:
+        await db.drop_collection(collection)
+
+    started = time.perf_counter()
+    reader = open_reader(path, compress)
+    try:
+        documents = iter_documents(reader, fmt)
+        if state["count"]:
+            print(f"  {collection}: skipping {state['count']:,} documents imported earlier", flush=True)
+            await asyncio.to_thread(lambda: sum(1 for _ in islice(documents, state["count"])))
+        failed = 0
+        while True:
+            batch = await asyncio.to_thread(lambda: list(islice(documents, size)))
+            if not batch:
+                break
+            try:
+                await db[collection].insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                duplicates = sum(1 for error in errors if error.get("code") == 11000)
+                state["duplicates"] += duplicates
+                failed += len(errors) - duplicates
+            state["count"] += len(batch)
+            checkpoint.save(state)
+    finally:
+        reader.close()
+    checkpoint.clear()
+    extra = f", {state['duplicates']:,} already present" if state["duplicates"] else ""
+    if failed:
+        extra += f", {failed:,} failed"
+    report("Imported", collection, state["count"], started, path.stat().st_size, extra)
+
+
+async def run(args):
+    if args.mongodb_url:
+        settings.mongodb_url = args.mongodb_url
+    if args.database:
+        settings.database_name = args.database
+    client = create_client()
+    db = client[settings.database_name]
+    args.directory.mkdir(parents=True, exist_ok=True)
+    workers = asyncio.Semaphore(args.workers)
+
+    async def bounded(coroutine):
+        async with workers:
+            await coroutine
+
+    if args.command == "export":
+        if args.compress == "zstd" and zstandard is None:
+            raise SystemExit("zstd compression needs the zstandard package")
+        jobs = [export_collection(db, name, args) for name in args.collections or COLLECTIONS]
+    else:
+        paths = sorted(
+            path for path in args.directory.iterdir()
+            if detect(path)[0] and (not args.collections or collection_of(path) in args.collections)
+        )
+        if not paths:
+            raise SystemExit(f"No export files found in {args.directory}")
+        jobs = [import_collection(db, path, args) for path in paths]
+
+    print(f"{args.command.capitalize()}ing {len(jobs)} collection(s) with {args.workers} worker(s)...", flush=True)
+    await asyncio.gather(*(bounded(job) for job in jobs))
+    client.close()
+
+
+def json_argument(value: str) -> dict:
+    try:
+        return json_util.loads(value, json_options=JSON_OPTIONS)
+    except (ValueError, json.JSONDecodeError) as e:
+        raise argparse.ArgumentTypeError(f"invalid JSON: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream collections to and from NDJSON/BSON files")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("directory", type=Path, help="directory holding one file per collection")
+    parser.add_argument("-c", "--collections", nargs="+", help=f"default: all ({', '.join(COLLECTIONS)})")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=2, help="collections processed concurrently")
+    parser.add_argument("--resume", action="store_true", help="continue from existing checkpoints")
+    parser.add_argument("--mongodb-url", help=f"default: {settings.mongodb_url}")
+    parser.add_argument("--database", help=f"default: {settings.database_name}")
+    export = parser.add_argument_group("export")
+    export.add_argument("--format", choices=list(EXTENSIONS), default="ndjson")
+    export.add_argument("--compress", choices=list(COMPRESSION_SUFFIXES), default="gzip")
+    export.add_argument("--filter", type=json_argument, default={}, help="extended JSON query")
+    export.add_argument("--projection", type=json_argument, help="extended JSON projection")
+    restore = parser.add_argument_group("import")
+    restore.add_argument("--drop", action="store_true", help="drop each collection before importing it")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
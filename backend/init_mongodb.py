@@ -4,9 +4,13 @@ Initialize MongoDB database and create indexes for ProfHub
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from core.config import settings
+from core.indexes import INDEXES, describe_index, prune_indexes
+from repositories import GigRepository, ProfessorRepository, SavedSearchRepository, StudentRepository
+
 # MongoDB connection
-MONGODB_URL = "mongodb://localhost:27017"
-DATABASE_NAME = "profhub"
+MONGODB_URL = settings.mongodb_url
+DATABASE_NAME = settings.database_name
 
 
 async def init_db():
@@ -26,47 +30,40 @@ async def init_db():
     
     print(f"\nInitializing database: {DATABASE_NAME}")
     
-    # Create collections and indexes
-    print("\n1. Setting up 'professors' collection...")
-    professors = db.get_collection("professors")
-    await professors.create_index("email", unique=True)
-    print("   ✓ Created unique index on 'email'")
+    # Create collections and indexes from the shared manifest (also applied at app startup)
+    for number, (collection_name, indexes) in enumerate(INDEXES.items(), start=1):
+        print(f"\n{number}. Setting up '{collection_name}' collection...")
+        await db.get_collection(collection_name).create_indexes(indexes)
+        for index in indexes:
+            print(f"   ✓ Created {describe_index(index)}")
     
-    print("\n2. Setting up 'gigs' collection...")
-    gigs = db.get_collection("gigs")
-    await gigs.create_index("professor_id")
-    await gigs.create_index("status")
-    print("   ✓ Created index on 'professor_id'")
-    print("   ✓ Created index on 'status'")
+    # Drop indexes the manifest has replaced (e.g. single-field prefixes of a compound index)
+    dropped = await prune_indexes(db)
+    for collection_name, names in dropped.items():
+        for name in names:
+            print(f"   ✓ Dropped obsolete index {collection_name}.{name}")
     
-    print("\n3. Setting up 'students' collection...")
-    students = db.get_collection("students")
-    await students.create_index("email", unique=True)
-    await students.create_index("reg_no", unique=True)
-    print("   ✓ Created unique index on 'email'")
-    print("   ✓ Created unique index on 'reg_no'")
+    # Professors stored before directory search existed have no search_terms yet
+    backfilled = await ProfessorRepository(db).backfill_search_terms()
+    if backfilled:
+        print(f"   ✓ Added search terms to {backfilled} professors")
     
-    print("\n4. Setting up 'applications' collection...")
-    applications = db.get_collection("applications")
-    await applications.create_index("gig_id")
-    await applications.create_index("student_email")
-    await applications.create_index("student_id")
-    await applications.create_index("status")
-    print("   ✓ Created index on 'gig_id'")
-    print("   ✓ Created index on 'student_email'")
-    print("   ✓ Created index on 'student_id'")
-    print("   ✓ Created index on 'status'")
+    # Gigs stored before similar gigs existed have no LSH band keys yet
+    backfilled = await GigRepository(db).backfill_lsh_bands()
+    if backfilled:
+        print(f"   ✓ Added similarity keys to {backfilled} gigs")
     
-    print("\n5. Setting up 'notifications' collection...")
+    # Students whose saved searches were stored before the limit was counted on the student
+    counts = await SavedSearchRepository(db).counts_by_student()
+    backfilled = await StudentRepository(db).backfill_saved_search_counts(counts)
+    if backfilled:
+        print(f"   ✓ Counted saved searches of {backfilled} students")
+    
+    professors = db.get_collection("professors")
+    gigs = db.get_collection("gigs")
+    students = db.get_collection("students")
+    applications = db.get_collection("applications")
     notifications = db.get_collection("notifications")
-    await notifications.create_index("user_id")
-    await notifications.create_index("read")
-    await notifications.create_index([("user_id", 1), ("read", 1)])
-    await notifications.create_index("created_at")
-    print("   ✓ Created index on 'user_id'")
-    print("   ✓ Created index on 'read'")
-    print("   ✓ Created compound index on 'user_id' and 'read'")
-    print("   ✓ Created index on 'created_at'")
     
     # Show database stats
     print("\n" + "="*50)
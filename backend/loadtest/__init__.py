@@ -0,0 +1,7 @@
+"""
+Load generation for the ProfHub API
+
+Replays weighted scenarios modelled on what the frontend actually requests (BrowseGigs,
+GigDetail, NotificationPanel polling, ViewGigApplications, the login pages) and reports
+throughput and latency percentiles per route. See ``python -m loadtest --help``.
+"""
@@ -0,0 +1,132 @@
+"""
+Run the ProfHub load test
+
+In-process against the in-memory stand-in (no MongoDB needed, numbers comparable run to run
+on the same machine):
+
+    cd backend
+    python -m loadtest --users 50 --duration 30 --json results/baseline.json
+
+In-process against a local MongoDB, using a throwaway database:
+
+    python -m loadtest --mongodb-url mongodb://localhost:27017 --database profhub_loadtest
+
+Against a running server (seeds through its API into whatever database it uses; start it
+with ADMISSION_ENABLED=false, as all virtual users share one client address):
+
+    python -m loadtest --base-url http://localhost:8000
+
+Compare with a saved run; exits 1 if any route's p95 or throughput regressed by more than
+the tolerance:
+
+    python -m loadtest --compare results/baseline.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+from .population import seed
+from .runner import compare, format_report, run
+
+
+@asynccontextmanager
+async def open_client(args):
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.users * 4, max_keepalive_connections=args.users * 4)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+            yield client
+        return
+
+    # Settings must point at the target before the app module builds anything from them
+    from core.config import settings
+    settings.mongodb_url = args.mongodb_url
+    settings.database_name = args.database
+    from main import app
+    from core import admission
+    # Every virtual user shares one client address, so per-client rate limits would throttle
+    # the whole population as if it were a single client; concurrency limits stay in force
+    admission.RATE_LIMITS.clear()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            yield client
+
+
+async def main_async(args) -> int:
+    async with open_client(args) as client:
+        started = time.perf_counter()
+        population = await seed(
+            client, professors=args.professors, gigs_per_professor=args.gigs_per_professor,
+            students=args.students, applications=args.applications, seed=args.seed,
+        )
+        print(f"Seeded {population.summary()} in {time.perf_counter() - started:.1f}s")
+        print(f"Running {args.users} users for {args.duration:g}s after {args.warmup:g}s warmup...")
+        report = await run(
+            client, population, users=args.users, duration=args.duration, warmup=args.warmup,
+            think_ms=args.think_ms, seed=args.seed,
+        )
+
+    report["config"] = {
+        key: value for key, value in vars(args).items() if key not in ("json", "compare", "tolerance")
+    }
+    print()
+    print(format_report(report))
+
+    if args.json:
+        path = Path(args.json)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        table, regressions = compare(report, baseline, args.tolerance)
+        print(f"\nCompared with {args.compare}:")
+        print(table)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 1 if report["total"]["errors"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay weighted ProfHub traffic and report per-route latency")
+    target = parser.add_argument_group("target")
+    target.add_argument("--base-url", help="test a running server instead of the app in-process")
+    target.add_argument("--mongodb-url", default="memory://", help="in-process only (default: memory://)")
+    target.add_argument("--database", default="profhub_loadtest", help="in-process only")
+    load = parser.add_argument_group("load")
+    load.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    load.add_argument("--duration", type=float, default=30, help="measured seconds")
+    load.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before measuring")
+    load.add_argument("--think-ms", type=float, default=0, help="mean pause between journeys (0: flat out)")
+    load.add_argument("--seed", type=int, default=1)
+    load.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    data = parser.add_argument_group("seed data")
+    data.add_argument("--professors", type=int, default=40)
+    data.add_argument("--gigs-per-professor", type=int, default=5)
+    data.add_argument("--students", type=int, default=1000)
+    data.add_argument("--applications", type=int, default=2000)
+    output = parser.add_argument_group("output")
+    output.add_argument("--json", help="write the report to this file")
+    output.add_argument("--compare", help="compare with a report written by --json")
+    output.add_argument("--tolerance", type=float, default=0.15, help="allowed p95/throughput regression")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
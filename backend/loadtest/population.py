@@ -0,0 +1,175 @@
+"""
+Seed the professors, students, gigs and applications the scenarios act on
+
+Everything is created through the public API, so seeding also works against a deployed
+server. Content is derived from the seed; only the e-mail tag differs between runs so
+repeated runs against a persistent database do not trip the unique indexes.
+"""
+import asyncio
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Dict, Iterable, List
+
+import httpx
+
+from core.fixtures import AREAS, TECHNOLOGIES, VOCABULARY
+
+PASSWORD = "loadtest-password"
+DEPARTMENTS = ["Computer Science", "Electrical", "Mechanical", "Mathematics", "Physics"]
+IMPORT_BATCH = 1000
+
+
+@dataclass
+class Population:
+    professors: List[dict] = field(default_factory=list)
+    students: List[dict] = field(default_factory=list)
+    gigs: List[dict] = field(default_factory=list)
+    gigs_by_professor: Dict[str, List[dict]] = field(default_factory=dict)
+
+    @property
+    def open_gigs(self) -> List[dict]:
+        return [gig for gig in self.gigs if gig["status"] == "open"]
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.professors)} professors, {len(self.students)} students, "
+            f"{len(self.gigs)} gigs ({len(self.open_gigs)} open)"
+        )
+
+
+async def _bounded(concurrency: int, coroutines: Iterable[Awaitable]) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines))
+
+
+def _check(response: httpx.Response, expected: int = 200) -> dict:
+    if response.status_code != expected:
+        raise RuntimeError(
+            f"Seeding failed: {response.request.method} {response.request.url.path} "
+            f"returned {response.status_code}: {response.text[:200]}"
+        )
+    return response.json()
+
+
+async def seed(client: httpx.AsyncClient, professors: int, gigs_per_professor: int, students: int,
+               applications: int, seed: int = 1, concurrency: int = 16) -> Population:
+    """Create the population through the API and return the ids the scenarios need"""
+    rng = random.Random(seed)
+    tag = uuid.uuid4().hex[:8]
+    population = Population()
+
+    # Every random value is drawn here, before the requests run concurrently, so the
+    # population does not depend on the order in which responses arrive
+    professor_bodies = [{
+        "name": f"Professor {i}",
+        "email": f"prof{i}.{tag}@loadtest.edu",
+        "password": PASSWORD,
+        "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+        "college_name": "Load Test University",
+        "qualification": "PhD",
+        "research_areas": ", ".join(rng.sample(AREAS, 2)),
+        "experience_years": rng.randint(1, 30),
+    } for i in range(professors)]
+
+    async def register_professor(body: dict) -> dict:
+        data = _check(await client.post("/api/auth/register", json=body), 201)
+        return {"id": data["id"], "email": body["email"]}
+
+    population.professors = await _bounded(concurrency, (register_professor(body) for body in professor_bodies))
+
+    rows = [{
+        "name": f"Student {i}",
+        "email": f"student{i}.{tag}@loadtest.edu",
+        "reg_no": f"LT{tag}{i:06d}",
+        "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+        "year": rng.randint(1, 4),
+        "college_name": "Load Test University",
+        "password": PASSWORD,
+    } for i in range(students)]
+    for start in range(0, len(rows), IMPORT_BATCH):
+        batch = rows[start:start + IMPORT_BATCH]
+        result = _check(await client.post("/api/students/import", json=batch))
+        if result["errors"]:
+            raise RuntimeError(f"Seeding failed: student import reported {result['errors'][:3]}")
+        for row, student_id in zip(batch, result["inserted_ids"]):
+            population.students.append({
+                "id": student_id, "email": row["email"], "name": row["name"], "year": row["year"],
+            })
+
+    def gig_body(professor: dict, i: int) -> dict:
+        area = rng.choice(AREAS)
+        return {
+            "professor_id": professor["id"],
+            "title": f"{area} research assistant #{i}",
+            "description": " ".join(rng.choice(VOCABULARY) for _ in range(60)),
+            "area_of_study": area,
+            "technologies": ", ".join(rng.sample(TECHNOLOGIES, 3)),
+            "target_type": "Conference",
+            "paper_type": "Research",
+            "timeline": "6 months",
+            "year_requirement": "3rd year+",
+            "cgpa_requirement": "8.0",
+            "funded": rng.random() < 0.3,
+            "candidate_count": rng.randint(1, 5),
+        }
+
+    # Roughly the mix of a live semester: most gigs open, some closed or paused
+    gig_specs = [
+        (gig_body(professor, i), rng.random())
+        for professor in population.professors
+        for i in range(gigs_per_professor)
+    ]
+
+    async def create_gig(body: dict, roll: float) -> dict:
+        data = _check(await client.post("/api/gigs", json=body), 201)
+        gig = {"id": data["id"], "professor_id": body["professor_id"], "title": data["title"], "status": "open"}
+        if roll < 0.15:
+            _check(await client.put(f"/api/gigs/{gig['id']}/close", json={}))
+            gig["status"] = "closed"
+        elif roll < 0.25:
+            _check(await client.put(f"/api/gigs/{gig['id']}/hold", json={"paused_reason": "Funding review"}))
+            gig["status"] = "on-hold"
+        return gig
+
+    population.gigs = await _bounded(concurrency, (create_gig(body, roll) for body, roll in gig_specs))
+    for gig in population.gigs:
+        population.gigs_by_professor.setdefault(gig["professor_id"], []).append(gig)
+
+    open_gigs = population.open_gigs
+    pairs = set()
+    if open_gigs and population.students:
+        attempts = 0
+        while len(pairs) < applications and attempts < applications * 10:
+            attempts += 1
+            pairs.add((rng.randrange(len(population.students)), rng.randrange(len(open_gigs))))
+
+    bodies = [
+        application_body(population.students[student_index], open_gigs[gig_index]["id"], rng)
+        for student_index, gig_index in sorted(pairs)
+    ]
+
+    async def apply(body: dict):
+        _check(await client.post("/api/applications", json=body), 201)
+
+    await _bounded(concurrency, (apply(body) for body in bodies))
+    return population
+
+
+def application_body(student: dict, gig_id: str, rng: random.Random) -> dict:
+    """What GigDetail submits: the student's profile plus a resume link and cover letter"""
+    return {
+        "gig_id": gig_id,
+        "student_id": student["id"],
+        "student_name": student["name"],
+        "student_email": student["email"],
+        "student_year": str(student["year"]),
+        "student_cgpa": f"{rng.uniform(6.5, 9.8):.2f}",
+        "resume_link": f"https://drive.example.com/{student['id']}/resume.pdf",
+        "cover_letter": " ".join(rng.choice(VOCABULARY) for _ in range(80)),
+    }
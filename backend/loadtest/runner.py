@@ -0,0 +1,164 @@
+"""
+Closed-loop virtual users, per-route latency recording and reporting
+"""
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .population import Population
+from .scenarios import SCENARIOS, Session
+
+# Routes with fewer samples than this in either run are shown but never flagged
+MIN_COMPARE_SAMPLES = 50
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    # The epsilon absorbs float error, e.g. 0.95 * 100 == 95.00000000000001
+    rank = math.ceil(fraction * len(sorted_values) - 1e-9)
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Collects latencies per route; nothing is kept until ``start()`` ends the warmup"""
+
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.recording = False
+        self.started = self.stopped = 0.0
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.scenarios: Counter = Counter()
+
+    def start(self):
+        self.recording = True
+        self.started = self.clock()
+
+    def stop(self):
+        self.recording = False
+        self.stopped = self.clock()
+
+    def record(self, route: str, seconds: float, status: Optional[int], error: Optional[str] = None):
+        if not self.recording:
+            return
+        self.latencies.setdefault(route, []).append(seconds)
+        self.statuses.setdefault(route, Counter())[str(status) if error is None else error] += 1
+
+    def report(self) -> dict:
+        elapsed = self.stopped - self.started
+        routes = {}
+        all_latencies = []
+        for route in sorted(self.latencies):
+            latencies = sorted(self.latencies[route])
+            all_latencies.extend(latencies)
+            routes[route] = _summarize(latencies, self.statuses[route], elapsed)
+        total_statuses = sum(self.statuses.values(), Counter())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "total": _summarize(sorted(all_latencies), total_statuses, elapsed),
+            "routes": routes,
+            "scenarios": dict(self.scenarios),
+        }
+
+
+def _summarize(latencies: List[float], statuses: Counter, elapsed: float) -> dict:
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 500)
+    return {
+        "count": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "errors": errors,
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+async def run(client: httpx.AsyncClient, population: Population, users: int, duration: float,
+              warmup: float = 0.0, think_ms: float = 0.0, seed: int = 1) -> dict:
+    """Drive ``users`` concurrent users for ``warmup + duration`` seconds and report the measured part
+
+    Every user runs scenarios back to back, pausing an exponentially distributed think time
+    with mean ``think_ms`` in between (0 runs flat out). Each user has its own seeded RNG,
+    so the same seed replays the same sequence of journeys.
+    """
+    recorder = Recorder()
+    names = [name for name, _, _ in SCENARIOS]
+    weights = [weight for _, weight, _ in SCENARIOS]
+    journeys = {name: journey for name, _, journey in SCENARIOS}
+    deadline = time.perf_counter() + warmup + duration
+
+    async def user(index: int):
+        rng = random.Random(seed * 100_003 + index)
+        session = Session(client, recorder, population, rng)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            try:
+                await journeys[name](session)
+            except httpx.HTTPError:
+                pass  # already recorded against the route; keep the user going
+            if recorder.recording:
+                recorder.scenarios[name] += 1
+            if think_ms:
+                await asyncio.sleep(rng.expovariate(1000 / think_ms))
+
+    tasks = [asyncio.create_task(user(i)) for i in range(users)]
+    await asyncio.sleep(warmup)
+    recorder.start()
+    await asyncio.sleep(duration)
+    await asyncio.gather(*tasks)
+    recorder.stop()
+    return recorder.report()
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{'route':<58} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}",
+    ]
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for route, stats in rows:
+        lines.append(
+            f"{route:<58} {stats['count']:>7} {stats['rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>6}"
+        )
+    scenarios = ", ".join(f"{name} {count}" for name, count in sorted(report["scenarios"].items()))
+    lines.append(f"scenarios completed: {scenarios}")
+    return "\n".join(lines)
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> Tuple[str, List[str]]:
+    """Per-route p95 and throughput against a saved run; returns (table, regressions)
+
+    A route regresses when its p95 grows, or its throughput drops, by more than ``tolerance``
+    (a fraction, 0.15 = 15%).
+    """
+    lines = [f"{'route':<58} {'p95 ms':>17} {'change':>8} {'rps':>15} {'change':>8}"]
+    regressions = []
+    rows = [(route, stats, baseline["routes"].get(route)) for route, stats in report["routes"].items()]
+    rows.append(("TOTAL", report["total"], baseline["total"]))
+    for route, stats, before in rows:
+        if not before or not before["count"]:
+            lines.append(f"{route:<58} {'(new)':>17}")
+            continue
+        p95_change = stats["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        rps_change = stats["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+        lines.append(
+            f"{route:<58} {before['p95_ms']:>7.2f} -> {stats['p95_ms']:>6.2f} {p95_change:>+8.1%} "
+            f"{before['rps']:>6.1f} -> {stats['rps']:>6.1f} {rps_change:>+8.1%}"
+        )
+        if min(stats["count"], before["count"]) < MIN_COMPARE_SAMPLES:
+            continue
+        if p95_change > tolerance:
+            regressions.append(f"{route}: p95 {before['p95_ms']:.2f} ms -> {stats['p95_ms']:.2f} ms")
+        if rps_change < -tolerance:
+            regressions.append(f"{route}: throughput {before['rps']:.1f} -> {stats['rps']:.1f} req/s")
+    return "\n".join(lines), regressions
@@ -0,0 +1,151 @@
+"""
+Weighted user journeys, each mirroring the requests one frontend page makes
+
+Weights approximate semester rush: mostly students browsing and polling notifications,
+a steady trickle of applications, professors working through their applicant lists.
+"""
+import asyncio
+import random
+from typing import Awaitable, Callable, List, Tuple
+
+import httpx
+
+from .population import PASSWORD, Population, application_body
+
+
+class Session:
+    """One virtual user: issues requests and records each under its route template"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder, population: Population, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.population = population
+        self.rng = rng
+
+    async def request(self, method: str, route: str, path: str, **kwargs) -> httpx.Response:
+        """Send ``method path`` and record it as ``route`` (e.g. "GET /api/gigs/{gig_id}")"""
+        start = self.recorder.clock()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(f"{method} {route}", self.recorder.clock() - start, None, type(e).__name__)
+            raise
+        self.recorder.record(f"{method} {route}", self.recorder.clock() - start, response.status_code)
+        return response
+
+    def student(self) -> dict:
+        return self.rng.choice(self.population.students)
+
+    def professor(self) -> dict:
+        return self.rng.choice(self.population.professors)
+
+    def open_gig(self) -> dict:
+        return self.rng.choice(self.population.open_gigs)
+
+
+async def browse_gigs(session: Session):
+    """BrowseGigs: open gigs, then every distinct professor on the page in parallel"""
+    response = await session.request("GET", "/api/gigs", "/api/gigs", params={"status": "open"})
+    if response.status_code != 200:
+        return
+    professor_ids = dict.fromkeys(gig["professor_id"] for gig in response.json())
+    await asyncio.gather(*(
+        session.request("GET", "/api/professors/{professor_id}", f"/api/professors/{professor_id}")
+        for professor_id in professor_ids
+    ))
+
+
+async def view_gig(session: Session):
+    """GigDetail: gig, student profile and application check together, then the professor"""
+    gig, student = session.open_gig(), session.student()
+    gig_response, _, _ = await asyncio.gather(
+        session.request("GET", "/api/gigs/{gig_id}", f"/api/gigs/{gig['id']}"),
+        session.request("GET", "/api/students/{student_id}", f"/api/students/{student['id']}"),
+        session.request(
+            "GET", "/api/applications/check/{gig_id}/{student_id}",
+            f"/api/applications/check/{gig['id']}/{student['id']}",
+        ),
+    )
+    if gig_response.status_code == 200:
+        professor_id = gig_response.json()["professor_id"]
+        await session.request("GET", "/api/professors/{professor_id}", f"/api/professors/{professor_id}")
+
+
+async def apply(session: Session):
+    """GigDetail submit: check for an earlier application, then create_application"""
+    gig, student = session.open_gig(), session.student()
+    check = await session.request(
+        "GET", "/api/applications/check/{gig_id}/{student_id}",
+        f"/api/applications/check/{gig['id']}/{student['id']}",
+    )
+    if check.status_code == 200 and not check.json()["has_applied"]:
+        await session.request(
+            "POST", "/api/applications", "/api/applications",
+            json=application_body(student, gig["id"], session.rng),
+        )
+
+
+async def poll_notifications(session: Session):
+    """NotificationPanel: the 30 s poll, occasionally followed by a click that marks one read"""
+    if session.rng.random() < 0.7:
+        user_id = session.student()["id"]
+    else:
+        user_id = session.professor()["id"]
+    response = await session.request("GET", "/api/notifications/{user_id}", f"/api/notifications/{user_id}")
+    if response.status_code != 200 or session.rng.random() >= 0.1:
+        return
+    unread = [notification for notification in response.json() if not notification["read"]]
+    if unread:
+        notification_id = unread[0]["id"]
+        await session.request(
+            "PUT", "/api/notifications/{notification_id}/read", f"/api/notifications/{notification_id}/read"
+        )
+
+
+async def review_applications(session: Session):
+    """ViewGigApplications: a professor lists applicants and accepts or rejects a pending one"""
+    professor = session.professor()
+    gigs = session.population.gigs_by_professor.get(professor["id"])
+    if not gigs:
+        return
+    gig = session.rng.choice(gigs)
+    response = await session.request("GET", "/api/applications/gig/{gig_id}", f"/api/applications/gig/{gig['id']}")
+    if response.status_code != 200:
+        return
+    pending = [application for application in response.json() if application["status"] == "pending"]
+    if pending:
+        application = session.rng.choice(pending)
+        decision = "accepted" if session.rng.random() < 0.4 else "rejected"
+        await session.request(
+            "PUT", "/api/applications/{application_id}/status",
+            f"/api/applications/{application['id']}/status", params={"status": decision},
+        )
+
+
+async def login(session: Session):
+    """StudentLogin and Login pages"""
+    if session.rng.random() < 0.75:
+        student = session.student()
+        await session.request(
+            "POST", "/api/students/login", "/api/students/login",
+            json={"email": student["email"], "password": PASSWORD},
+        )
+    else:
+        professor = session.professor()
+        await session.request(
+            "POST", "/api/auth/login", "/api/auth/login",
+            json={"email": professor["email"], "password": PASSWORD},
+        )
+
+
+Scenario = Callable[[Session], Awaitable[None]]
+
+# (name, weight, journey)
+SCENARIOS: List[Tuple[str, int, Scenario]] = [
+    ("browse_gigs", 25, browse_gigs),
+    ("view_gig", 20, view_gig),
+    ("apply", 10, apply),
+    ("poll_notifications", 30, poll_notifications),
+    ("review_applications", 10, review_applications),
+    ("login", 5, login),
+]
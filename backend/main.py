@@ -1,9 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from pymongo.errors import PyMongoError
+
+from core import database
+from core.admission import AdmissionMiddleware, pool_saturated
+from core.compression import CompressionMiddleware
 from core.config import settings
-from api.routers import professor, gigs, auth, applications, student, notifications
+from core.event_hub import event_hub
+from core.loader import LoaderMiddleware
+from core.log import RequestIdMiddleware, configure_logging, stop_logging
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from core.profiling import ProfilingMiddleware, profiling_available
+from core.query_stats import QueryStatsMiddleware
+from api.routers import (
+    professor, gigs, auth, applications, student, notifications, resumes, saved_searches, activity
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    await database.connect()
+    follower = None
+    if settings.activity_change_stream:
+        follower = asyncio.create_task(event_hub.follow(database.get_database_handle()["events"]))
+    yield
+    if follower is not None:
+        follower.cancel()
+    database.close()
+    stop_logging()
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+
+# Innermost, so CORS headers are added to its 429/503 responses as well
+app.add_middleware(AdmissionMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -14,6 +49,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(LoaderMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+# Only installed when enabled, so unprofiled deployments pay nothing for it
+if profiling_available():
+    app.add_middleware(ProfilingMiddleware)
+# Outside everything that logs, so their records carry the request id
+app.add_middleware(RequestIdMiddleware)
+# Added last so it is the outermost middleware and times the whole stack
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(professor.router, prefix="/api", tags=["professors"])
@@ -21,6 +67,9 @@ app.include_router(student.router, prefix="/api", tags=["students"])
 app.include_router(gigs.router, prefix="/api", tags=["gigs"])
 app.include_router(applications.router, prefix="/api", tags=["applications"])
 app.include_router(notifications.router, prefix="/api", tags=["notifications"])
+app.include_router(resumes.router, prefix="/api", tags=["resumes"])
+app.include_router(saved_searches.router, prefix="/api", tags=["saved searches"])
+app.include_router(activity.router, prefix="/api", tags=["activity"])
 
 
 @app.get("/")
@@ -31,3 +80,34 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Report whether the database answers, with round-trip latency and pool usage"""
+    try:
+        latency_ms = await database.ping()
+    except PyMongoError as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "database": {"error": str(e)}}
+        )
+    
+    body = {
+        "status": "ready",
+        "database": {
+            "latency_ms": round(latency_ms, 2),
+            "pool": database.pool_status(),
+        },
+    }
+    if pool_saturated():
+        # Requests are being shed; take this instance out of rotation until the pool drains
+        body["status"] = "saturated"
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "1"})
+    return body
@@ -0,0 +1,28 @@
+# Import all repositories here for easy access
+from .base import Repository, to_object_id
+from .professor import ProfessorRepository, professor_repository
+from .student import StudentRepository, student_repository
+from .gig import GigRepository, gig_repository
+from .application import ApplicationRepository, application_repository
+from .notification import NotificationRepository, notification_repository
+from .saved_search import SavedSearchRepository, saved_search_repository
+from .event import EventRepository, event_repository
+
+__all__ = [
+    "Repository",
+    "to_object_id",
+    "ProfessorRepository",
+    "StudentRepository",
+    "GigRepository",
+    "ApplicationRepository",
+    "NotificationRepository",
+    "SavedSearchRepository",
+    "EventRepository",
+    "professor_repository",
+    "student_repository",
+    "gig_repository",
+    "application_repository",
+    "notification_repository",
+    "saved_search_repository",
+    "event_repository",
+]
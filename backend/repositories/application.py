@@ -0,0 +1,29 @@
+from typing import Optional
+
+from core.config import settings
+
+from .base import Repository
+
+
+class ApplicationRepository(Repository):
+    collection_name = "applications"
+
+    def for_gig(self, gig_id: str, projection=None):
+        return self.find({"gig_id": gig_id}, projection)
+
+    def for_student(self, student_id: str, email: str, projection=None):
+        """A student's applications, matched by id or, for older ones without it, by e-mail
+
+        After backfill_student_ids.py has run, ``applications_by_student_id`` drops the
+        e-mail branch so the query is a single student_id index lookup.
+        """
+        if settings.applications_by_student_id:
+            return self.find({"student_id": student_id}, projection)
+        return self.find({"$or": [{"student_id": student_id}, {"student_email": email}]}, projection)
+
+    async def find_existing(self, gig_id: str, student_id: str) -> Optional[dict]:
+        """The student's application to a gig, if there is one"""
+        return await self.find_one({"gig_id": gig_id, "student_id": student_id})
+
+
+application_repository = ApplicationRepository()
@@ -0,0 +1,117 @@
+"""
+Base class for collection repositories
+
+Routers talk to repositories instead of collections, so caching, batching and query
+instrumentation have one place to live. ``load``/``load_many`` batch lookups by _id
+through the request's loaders (core/loader.py). A repository resolves its collection on
+every call, from the database passed to it or, by default, the one opened in the app
+lifespan. The storage backend is whatever that database is: Motor against MongoDB, or the
+in-memory engine (core/memory.py) when ``MONGODB_URL=memory://``. Both expose the same
+collection API, so repositories need no per-backend code.
+"""
+from typing import Any, Iterable, List, Optional, Union
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from core.database import get_database_handle
+from core.loader import forget, load, load_many
+
+
+def to_object_id(value: Union[str, ObjectId, None]) -> Optional[ObjectId]:
+    """Parse an id from a path or document, or None if it is not a valid ObjectId"""
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return None
+
+
+class Repository:
+    """Data access for one collection; subclasses add the queries their routers need"""
+
+    collection_name: str = ""
+
+    def __init__(self, database=None):
+        self._database = database
+
+    @property
+    def collection(self):
+        database = self._database if self._database is not None else get_database_handle()
+        return database[self.collection_name]
+
+    async def get(self, id: Union[str, ObjectId], projection=None) -> Optional[dict]:
+        """Document by _id; None when missing or when ``id`` is not a valid ObjectId"""
+        oid = to_object_id(id)
+        if oid is None:
+            return None
+        return await self.collection.find_one({"_id": oid}, projection)
+
+    async def load(self, id: Union[str, ObjectId, None]) -> Optional[dict]:
+        """Like ``get``, but batched with the other loads of this tick and cached per request"""
+        return await load(self.collection, to_object_id(id))
+
+    async def load_many(self, ids: Iterable[Union[str, ObjectId, None]]) -> List[Optional[dict]]:
+        """Documents for ``ids`` in order, None where missing, fetched with one $in query"""
+        return await load_many(self.collection, [to_object_id(id) for id in ids])
+
+    async def get_many(self, ids: Iterable[Union[str, ObjectId]], projection=None) -> List[Optional[dict]]:
+        """Documents for ``ids`` in the same order with one $in query; None where missing or invalid"""
+        oids = [to_object_id(id) for id in ids]
+        wanted = list({oid for oid in oids if oid is not None})
+        found = {}
+        if wanted:
+            async for document in self.collection.find({"_id": {"$in": wanted}}, projection):
+                found[document["_id"]] = document
+        return [found.get(oid) if oid is not None else None for oid in oids]
+
+    async def find_one(self, query: dict, projection=None) -> Optional[dict]:
+        return await self.collection.find_one(query, projection)
+
+    def find(self, query: dict, projection=None, sort=None, skip: int = 0, limit: int = 0, hint=None):
+        """Cursor over matching documents, for ``async for``"""
+        cursor = self.collection.find(query, projection)
+        if hint:
+            cursor = cursor.hint(hint)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def count(self, query: dict) -> int:
+        return await self.collection.count_documents(query)
+
+    async def insert(self, document: dict) -> ObjectId:
+        """Insert one document; DuplicateKeyError propagates for the caller to map"""
+        result = await self.collection.insert_one(document)
+        return result.inserted_id
+
+    async def insert_many(self, documents: Iterable[dict], ordered: bool = True) -> List[Any]:
+        """Insert many documents; BulkWriteError propagates with the per-row errors"""
+        result = await self.collection.insert_many(documents, ordered=ordered)
+        return result.inserted_ids
+
+    async def update(self, id: Union[str, ObjectId], fields: dict) -> bool:
+        """``$set`` fields on one document; False if no document has that id"""
+        oid = to_object_id(id)
+        result = await self.collection.update_one({"_id": oid}, {"$set": fields})
+        forget(self.collection, oid)
+        return result.matched_count > 0
+
+    async def update_and_get(self, id: Union[str, ObjectId], fields: dict) -> Optional[dict]:
+        """``$set`` fields and return the updated document, or None if it does not exist"""
+        oid = to_object_id(id)
+        document = await self.collection.find_one_and_update(
+            {"_id": oid}, {"$set": fields}, return_document=ReturnDocument.AFTER
+        )
+        forget(self.collection, oid)
+        return document
+
+    async def delete(self, id: Union[str, ObjectId]) -> bool:
+        oid = to_object_id(id)
+        result = await self.collection.delete_one({"_id": oid})
+        forget(self.collection, oid)
+        return result.deleted_count > 0
@@ -0,0 +1,53 @@
+from typing import Iterable, Optional
+
+from bson import ObjectId
+
+from core.config import settings
+from core.event_hub import event_hub
+
+from .base import Repository
+
+# Stored field names are kept to one letter: events are never updated and only ever
+# accumulate. _id orders events and carries their time.
+#   k  kind, e.g. "gig_closed" or "application_accepted"
+#   g  gig id
+#   u  ids of the users whose feeds show the event
+#   a  application id, for application events
+#   s  status after the transition
+#   r  reason given, e.g. for putting a gig on hold
+FEED_FIELDS = {"user": "u", "gig": "g"}
+
+
+class EventRepository(Repository):
+    """Append-only activity log; events are inserted and read, never changed"""
+
+    collection_name = "events"
+
+    async def record(self, kind: str, gig_id: str, user_ids: Iterable[Optional[str]],
+                     status: Optional[str] = None, application_id: Optional[str] = None,
+                     reason: Optional[str] = None) -> dict:
+        event = {"k": kind, "g": gig_id, "u": sorted({user_id for user_id in user_ids if user_id})}
+        if application_id:
+            event["a"] = application_id
+        if status:
+            event["s"] = status
+        if reason:
+            event["r"] = reason
+        event["_id"] = await self.insert(event)
+        if not settings.activity_change_stream:
+            event_hub.publish(event)
+        return event
+
+    def feed(self, feed: str, key: str, before: Optional[ObjectId] = None, limit: int = 20):
+        """Events of a user or gig feed, newest first, older than the ``before`` cursor"""
+        query = {FEED_FIELDS[feed]: key}
+        if before is not None:
+            query["_id"] = {"$lt": before}
+        return self.find(query, sort=[("_id", -1)], limit=limit)
+
+    def since(self, feed: str, key: str, after: ObjectId, limit: int):
+        """Events of a feed newer than ``after``, oldest first, for a reconnecting stream"""
+        return self.find({FEED_FIELDS[feed]: key, "_id": {"$gt": after}}, sort=[("_id", 1)], limit=limit)
+
+
+event_repository = EventRepository()
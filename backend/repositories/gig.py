@@ -0,0 +1,120 @@
+from datetime import datetime
+from typing import List, Optional, Union
+
+from bson import ObjectId
+
+from core.config import settings
+from core.loader import forget
+from core.similarity import SIMILARITY_FIELDS, band_keys
+
+from .base import Repository, to_object_id
+
+
+class GigRepository(Repository):
+    collection_name = "gigs"
+
+    def list(self, status: Optional[str] = None, professor_id: Optional[str] = None, projection=None):
+        """Gigs with the optional filters of the public listing"""
+        query = {}
+        if status:
+            query["status"] = status
+        if professor_id:
+            query["professor_id"] = professor_id
+        return self.find(query, projection)
+
+    def by_professor(self, professor_id: str, projection=None):
+        return self.find({"professor_id": professor_id}, projection)
+
+    async def claim_alerts(self, id: Union[str, ObjectId]) -> bool:
+        """Mark a gig's saved-search alerts sent; False if they already were, so they go out once
+
+        Only gigs inserted with ``alerts_sent_at: None`` qualify. Gigs stored before saved
+        searches existed have no such field and count as sent, so activating one of them
+        does not alert students about an old gig.
+        """
+        result = await self.collection.update_one(
+            {"_id": to_object_id(id), "alerts_sent_at": {"$exists": True, "$eq": None}},
+            {"$set": {"alerts_sent_at": datetime.utcnow()}},
+        )
+        return result.modified_count > 0
+
+    async def insert(self, document: dict) -> ObjectId:
+        return await super().insert({**document, "lsh_bands": band_keys(document), "alerts_sent_at": None})
+
+    async def update_and_get(self, id: Union[str, ObjectId], fields: dict) -> Optional[dict]:
+        """``$set`` fields, keeping lsh_bands current; closed gigs leave the similarity index"""
+        gig = await super().update_and_get(id, fields)
+        if not gig:
+            return gig
+        if gig.get("status") == "closed":
+            if "lsh_bands" in gig:
+                await self.collection.update_one({"_id": gig["_id"]}, {"$unset": {"lsh_bands": ""}})
+                forget(self.collection, gig["_id"])
+                del gig["lsh_bands"]
+        elif "lsh_bands" not in gig or any(field in fields for field in SIMILARITY_FIELDS):
+            gig = await super().update_and_get(id, {"lsh_bands": band_keys(gig)})
+        return gig
+
+    async def similar(self, gig: dict, limit: int, projection=None) -> List[dict]:
+        """Open gigs sharing LSH band keys with ``gig``, most shared keys first"""
+        keys = gig.get("lsh_bands") or band_keys(gig)
+        if not keys:
+            return []
+        wanted = set(keys)
+        fields = {**projection, "lsh_bands": 1} if projection else None
+        scored = []
+        # Bounded so a gig with very common features costs at most this many documents
+        cursor = self.find({"lsh_bands": {"$in": keys}, "status": "open"}, fields,
+                           limit=settings.similar_gigs_max_candidates)
+        async for candidate in cursor:
+            if candidate["_id"] != gig["_id"]:
+                scored.append((len(wanted.intersection(candidate["lsh_bands"])), candidate))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [candidate for _, candidate in scored[:limit]]
+
+    def applicant_inbox(self, professor_id: str, status: Optional[str] = None, gig_id: Optional[str] = None,
+                        before: Optional[ObjectId] = None, limit: int = 20, projection=None):
+        """Applications to a professor's gigs, newest first, in one aggregation
+
+        Each gig's applications are looked up with the filters and cut to ``limit`` before
+        they are merged, so no more than ``limit`` per gig are read. ``before`` is the _id
+        of the last application of the previous page.
+        """
+        gigs = {"professor_id": professor_id}
+        if gig_id is not None:
+            gigs["_id"] = to_object_id(gig_id)
+        applications = {"$expr": {"$eq": ["$gig_id", "$$gig_id"]}}
+        if status:
+            applications["status"] = status
+        if before is not None:
+            applications["_id"] = {"$lt": before}
+        lookup_pipeline = [{"$match": applications}, {"$sort": {"_id": -1}}, {"$limit": limit}]
+        if projection:
+            lookup_pipeline.append({"$project": projection})
+        return self.collection.aggregate([
+            {"$match": gigs},
+            {"$project": {"title": 1}},
+            {"$lookup": {
+                "from": "applications",
+                "let": {"gig_id": {"$toString": "$_id"}},
+                "pipeline": lookup_pipeline,
+                "as": "applications",
+            }},
+            {"$unwind": "$applications"},
+            {"$replaceWith": {"$mergeObjects": ["$applications", {"gig_title": "$title"}]}},
+            {"$sort": {"_id": -1}},
+            {"$limit": limit},
+        ])
+
+    async def backfill_lsh_bands(self) -> int:
+        """Compute lsh_bands for gigs that are not closed and were stored without them"""
+        updated = 0
+        cursor = self.find(
+            {"lsh_bands": {"$exists": False}, "status": {"$ne": "closed"}}, {field: 1 for field in SIMILARITY_FIELDS}
+        )
+        async for gig in cursor:
+            updated += await self.update(gig["_id"], {"lsh_bands": band_keys(gig)})
+        return updated
+
+
+gig_repository = GigRepository()
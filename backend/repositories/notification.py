@@ -0,0 +1,32 @@
+from typing import Optional
+
+from .base import Repository
+
+
+class NotificationRepository(Repository):
+    collection_name = "notifications"
+
+    def for_user(self, user_id: str, projection=None):
+        """A user's notifications, most recent first"""
+        return self.find({"user_id": user_id}, projection, sort=[("created_at", -1)])
+
+    async def unread_count(self, user_id: str) -> int:
+        return await self.count({"user_id": user_id, "read": False})
+
+    async def mark_all_read(self, user_id: str) -> int:
+        """Mark every unread notification of a user read; returns how many changed"""
+        result = await self.collection.update_many({"user_id": user_id, "read": False}, {"$set": {"read": True}})
+        return result.modified_count
+
+    async def unread_application_notice(self, professor_id: str, gig_id: str) -> Optional[dict]:
+        """The professor's unread "new applications" notification for a gig, if any"""
+        return await self.find_one({
+            "user_id": professor_id,
+            "user_type": "professor",
+            "metadata.gig_id": gig_id,
+            "metadata.notification_type": "new_applications",
+            "read": False,
+        })
+
+
+notification_repository = NotificationRepository()
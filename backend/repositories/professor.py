@@ -0,0 +1,87 @@
+import re
+from typing import List, Optional, Union
+
+from bson import ObjectId
+
+from core.cache import TTLCache
+from core.config import settings
+
+from .base import Repository
+
+# Fields the directory search matches against, tokenized into ``search_terms``
+SEARCH_FIELDS = ("name", "research_areas")
+_TOKEN = re.compile(r"[^\W_]+")
+# Indexes walked in name order with search_terms matched in them (core/indexes.py)
+SEARCH_INDEX = "name_1__id_1_search_terms_1"
+DEPARTMENT_SEARCH_INDEX = "department_1_name_1__id_1_search_terms_1"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens, e.g. "Machine Learning, NLP" -> ["machine", "learning", "nlp"]"""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def search_terms(document: dict) -> List[str]:
+    """Distinct tokens of a professor's searchable fields, stored for the multikey index"""
+    return sorted({token for field in SEARCH_FIELDS for token in tokenize(document.get(field))})
+
+
+class ProfessorRepository(Repository):
+    collection_name = "professors"
+
+    def __init__(self, database=None):
+        super().__init__(database)
+        # Encoded default directory page; any professor write in this process clears it
+        self.directory_cache = TTLCache(settings.directory_cache_seconds, max_entries=1)
+
+    async def by_email(self, email: str) -> Optional[dict]:
+        return await self.find_one({"email": email})
+
+    def list(self, projection=None):
+        return self.find({}, projection)
+
+    def directory(self, department: Optional[str] = None, college_name: Optional[str] = None,
+                  q: Optional[str] = None, skip: int = 0, limit: int = 20, projection=None):
+        """One page of professors ordered by name
+
+        Each word of ``q`` must prefix-match a token of the name or research areas, so
+        "mach lear" finds "Machine Learning". Searches are hinted to an index that holds the
+        terms after the name, so matches are found in the index already in name order and
+        the scan stops once the page is full, with no sort in memory.
+        """
+        query = {}
+        if department:
+            query["department"] = department
+        if college_name:
+            query["college_name"] = college_name
+        terms = tokenize(q)
+        hint = None
+        if terms:
+            query["$and"] = [{"search_terms": {"$regex": f"^{re.escape(term)}"}} for term in terms]
+            hint = DEPARTMENT_SEARCH_INDEX if department else SEARCH_INDEX
+        return self.find(query, projection, sort=[("name", 1), ("_id", 1)], skip=skip, limit=limit, hint=hint)
+
+    async def insert(self, document: dict) -> ObjectId:
+        professor_id = await super().insert({**document, "search_terms": search_terms(document)})
+        self.directory_cache.invalidate()
+        return professor_id
+
+    async def update_and_get(self, id: Union[str, ObjectId], fields: dict) -> Optional[dict]:
+        professor = await super().update_and_get(id, fields)
+        if professor and any(field in fields for field in SEARCH_FIELDS):
+            professor = await super().update_and_get(id, {"search_terms": search_terms(professor)})
+        if professor:
+            self.directory_cache.invalidate()
+        return professor
+
+    async def backfill_search_terms(self) -> int:
+        """Compute search_terms for professors stored before the field existed"""
+        updated = 0
+        cursor = self.find({"search_terms": {"$exists": False}}, {field: 1 for field in SEARCH_FIELDS})
+        async for professor in cursor:
+            updated += await self.update(professor["_id"], {"search_terms": search_terms(professor)})
+        self.directory_cache.invalidate()
+        return updated
+
+
+professor_repository = ProfessorRepository()
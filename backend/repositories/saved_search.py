@@ -0,0 +1,44 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from core.percolator import anchor_terms, gig_terms, matches, probe_terms, search_clauses
+
+from .base import Repository, to_object_id
+
+
+class SavedSearchRepository(Repository):
+    collection_name = "saved_searches"
+
+    async def insert(self, document: dict):
+        """Insert a search with its clauses and the anchor terms it is indexed under"""
+        clauses = search_clauses(document)
+        return await super().insert({**document, "clauses": clauses, "terms": anchor_terms(clauses)})
+
+    def for_student(self, student_id: str, projection=None):
+        return self.find({"student_id": student_id}, projection, sort=[("created_at", 1)])
+
+    async def counts_by_student(self) -> Dict[str, int]:
+        """Number of saved searches of each student who has any"""
+        return dict(Counter([search["student_id"] async for search in self.find({}, {"student_id": 1})]))
+
+    async def delete_for_student(self, student_id: str, search_id: str) -> bool:
+        """Delete one of a student's searches; False if the student has no such search"""
+        oid = to_object_id(search_id)
+        result = await self.collection.delete_one({"_id": oid, "student_id": student_id})
+        return result.deleted_count > 0
+
+    def candidates(self, terms: Iterable[str]):
+        """Searches indexed under any of ``terms`` (see core/percolator.py)"""
+        return self.find({"terms": {"$in": list(terms)}}, {"student_id": 1, "clauses": 1})
+
+    async def matching_students(self, gig: dict) -> List[str]:
+        """Students with at least one saved search the gig matches, each listed once"""
+        terms = gig_terms(gig)
+        students = {}
+        async for search in self.candidates(probe_terms(terms)):
+            if matches(search["clauses"], terms):
+                students[search["student_id"]] = None
+        return list(students)
+
+
+saved_search_repository = SavedSearchRepository()
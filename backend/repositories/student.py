@@ -0,0 +1,47 @@
+from typing import Dict, Optional, Union
+
+from bson import ObjectId
+
+from .base import Repository, to_object_id
+
+
+class StudentRepository(Repository):
+    collection_name = "students"
+
+    async def by_email(self, email: str) -> Optional[dict]:
+        return await self.find_one({"email": email})
+
+    async def reserve_saved_search(self, id: Union[str, ObjectId], limit: int) -> bool:
+        """Count one more saved search for the student; False if they already have ``limit``
+
+        The check and the increment are one conditional update, so concurrent requests
+        cannot both take the last place. A missing ``saved_search_count`` counts as 0.
+        """
+        result = await self.collection.update_one(
+            {
+                "_id": to_object_id(id),
+                "$or": [{"saved_search_count": {"$lt": limit}}, {"saved_search_count": {"$exists": False}}],
+            },
+            {"$inc": {"saved_search_count": 1}},
+        )
+        return result.modified_count > 0
+
+    async def release_saved_search(self, id: Union[str, ObjectId]):
+        """Give back a place taken by ``reserve_saved_search``"""
+        await self.collection.update_one(
+            {"_id": to_object_id(id), "saved_search_count": {"$gt": 0}}, {"$inc": {"saved_search_count": -1}}
+        )
+
+    async def backfill_saved_search_counts(self, counts: Dict[str, int]) -> int:
+        """Set saved_search_count for students whose searches were stored before it was kept"""
+        updated = 0
+        for student_id, count in counts.items():
+            result = await self.collection.update_one(
+                {"_id": to_object_id(student_id), "saved_search_count": {"$exists": False}},
+                {"$set": {"saved_search_count": count}},
+            )
+            updated += result.modified_count
+        return updated
+
+
+student_repository = StudentRepository()
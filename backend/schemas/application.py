@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -26,3 +26,28 @@ class ApplicationResponse(ApplicationBase):
 
     class Config:
         from_attributes = True
+
+
+class ApplicationSummary(BaseModel):
+    """An application in a professor's inbox, without the resume link and cover letter"""
+    id: str
+    gig_id: str
+    gig_title: Optional[str] = None
+    student_id: Optional[str] = None
+    student_name: str
+    student_email: EmailStr
+    student_year: Optional[str] = None
+    student_cgpa: Optional[str] = None
+    status: str
+    applied_at: datetime
+
+
+class InboxApplication(ApplicationSummary):
+    # Only with view=full
+    resume_link: Optional[str] = None
+    cover_letter: Optional[str] = None
+
+
+class ApplicantInbox(BaseModel):
+    items: List[InboxApplication]
+    next_cursor: Optional[str] = None  # Pass as ``before`` for the next, older page
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Generic, List, TypeVar
+
+# Upper bound on ids accepted by a single batch lookup
+MAX_BATCH_IDS = 200
+
+T = TypeVar("T")
+
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+    @field_validator("ids")
+    @classmethod
+    def drop_repeated_ids(cls, ids: List[str]) -> List[str]:
+        # Keep the first occurrence so results follow the requested order
+        return list(dict.fromkeys(ids))
+
+
+class BatchResponse(BaseModel, Generic[T]):
+    items: List[T]
+    missing: List[str] = []
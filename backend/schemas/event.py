@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class EventResponse(BaseModel):
+    id: str
+    type: str
+    gig_id: str
+    user_ids: List[str] = []
+    application_id: Optional[str] = None
+    status: Optional[str] = None
+    reason: Optional[str] = None
+    created_at: datetime
+
+
+class EventPage(BaseModel):
+    items: List[EventResponse]
+    next_cursor: Optional[str] = None  # Pass as ``before`` for the next, older page
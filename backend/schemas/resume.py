@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ResumeInfo(BaseModel):
+    file_id: str
+    filename: str
+    content_type: str
+    size: int
+    etag: str
+    uploaded_at: datetime
+    resume_url: str
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
+from datetime import datetime
+
+from core.percolator import MAX_YEAR
+
+
+class SavedSearchBase(BaseModel):
+    name: Optional[str] = Field(default=None, max_length=100)
+    area_of_study: Optional[str] = Field(default=None, max_length=100)
+    technologies: List[str] = Field(default=[], max_length=20)  # Any one of them
+    funded: Optional[bool] = None
+    year: Optional[int] = Field(default=None, ge=1, le=MAX_YEAR)  # Gigs open to students in this year
+
+
+class SavedSearchCreate(SavedSearchBase):
+    @model_validator(mode="after")
+    def require_criteria(self):
+        if not (self.area_of_study or self.technologies or self.funded is not None or self.year is not None):
+            raise ValueError("A saved search needs at least one of area_of_study, technologies, funded or year")
+        return self
+
+
+class SavedSearchResponse(SavedSearchBase):
+    id: str
+    student_id: str
+    created_at: datetime
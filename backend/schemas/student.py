@@ -38,3 +38,16 @@ class StudentResponse(StudentBase):
 
     class Config:
         from_attributes = True
+
+
+class StudentImportError(BaseModel):
+    index: int
+    email: str
+    reg_no: str
+    detail: str
+
+
+class StudentImportResult(BaseModel):
+    inserted_count: int
+    inserted_ids: List[str]
+    errors: List[StudentImportError] = []
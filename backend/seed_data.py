@@ -0,0 +1,411 @@
+"""
+Generate a production-sized synthetic ProfHub dataset and bulk load it into MongoDB
+
+    cd backend
+    python seed_data.py --applications 1000000 --drop
+
+Content is fully determined by --seed: the same seed and sizes produce the same documents,
+_ids included, so tuning runs can be repeated against identical data. Documents are written
+in unordered insert_many batches with up to --workers batches in flight. Indexes are built
+after the load (--indexes-first to build them before), which is much faster for large loads.
+
+Everyone shares the password ``password123``; it is hashed once, not per user.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from api.routers.student import hash_password
+from core.auth import get_password_hash
+from core.config import settings
+from core.database import create_client
+from core.fixtures import AREAS, TECHNOLOGIES, VOCABULARY
+from core.indexes import ensure_indexes
+from core.similarity import band_keys
+from repositories.professor import search_terms
+
+PASSWORD = "password123"
+COLLECTIONS = ["professors", "students", "gigs", "applications", "notifications", "events", "saved_searches"]
+
+FIRST_NAMES = [
+    "Aarav", "Ananya", "Arjun", "Diya", "Ishaan", "Kavya", "Rohan", "Saanvi", "Vihaan", "Meera",
+    "Aditya", "Priya", "Kabir", "Riya", "Nikhil", "Sneha", "Rahul", "Pooja", "Karan", "Neha",
+]
+LAST_NAMES = [
+    "Sharma", "Patel", "Iyer", "Reddy", "Nair", "Gupta", "Singh", "Das", "Menon", "Rao",
+    "Kulkarni", "Joshi", "Bose", "Chatterjee", "Mehta", "Pillai", "Verma", "Kapoor",
+]
+DEPARTMENTS = ["Computer Science", "Electrical", "Mechanical", "Mathematics", "Physics", "Biotechnology"]
+COLLEGES = ["National Institute of Technology", "State University", "Institute of Science", "City College"]
+QUALIFICATIONS = ["PhD", "PhD, Postdoc", "M.Tech, PhD"]
+TARGET_TYPES = ["Conference", "Journal", "Workshop", "Patent"]
+PAPER_TYPES = ["Research", "Survey", "Short paper", "Case study"]
+TIMELINES = ["3 months", "6 months", "1 year"]
+YEAR_REQUIREMENTS = ["1st year+", "2nd year+", "3rd year+", "4th year"]
+
+# Share of generated documents in each state, roughly what a mid-semester database holds
+GIG_STATUS = (("open", 0.65), ("closed", 0.2), ("on-hold", 0.15))
+APPLICATION_STATUS = (("pending", 0.7), ("accepted", 0.1), ("rejected", 0.2))
+# Applications from before student_id was stored, matched by e-mail only
+LEGACY_APPLICATION_SHARE = 0.05
+
+EPOCH = datetime(2024, 8, 1)
+SPAN = timedelta(days=365)
+
+
+def object_id(rng: random.Random, when: datetime) -> ObjectId:
+    """Deterministic ObjectId whose timestamp is ``when``"""
+    seconds = int((when - datetime(1970, 1, 1)).total_seconds())
+    return ObjectId(struct.pack(">I", seconds) + rng.getrandbits(64).to_bytes(8, "big"))
+
+
+def moment(rng: random.Random) -> datetime:
+    return EPOCH + timedelta(seconds=rng.randrange(int(SPAN.total_seconds())))
+
+
+def pick(rng: random.Random, shares) -> str:
+    roll = rng.random()
+    for value, share in shares:
+        roll -= share
+        if roll < 0:
+            return value
+    return shares[-1][0]
+
+
+def words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, k=count))
+
+
+def person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+class Dataset:
+    """Generators for each collection, each with its own RNG stream derived from the seed
+
+    Later collections refer to earlier ones by index (gigs to professors, applications to
+    students and gigs), so only the small parent collections' ids and a few fields are
+    kept in memory; applications and notifications are streamed.
+    """
+
+    def __init__(self, seed: int, professors: int, students: int, gigs_per_professor: int, applications: int):
+        self.seed = seed
+        self.sizes = {
+            "professors": professors,
+            "students": students,
+            "gigs": professors * gigs_per_professor,
+            "applications": applications,
+        }
+        self.gigs_per_professor = gigs_per_professor
+        self.professor_ids: List[str] = []
+        self.students: List[tuple] = []  # (id, name, email, year)
+        self.gigs: List[tuple] = []  # (id, professor_id, title)
+        self.hashed_password = get_password_hash(PASSWORD)
+
+    def rng(self, collection: str) -> random.Random:
+        return random.Random(f"{self.seed}:{collection}")
+
+    def professor_documents(self) -> Iterator[dict]:
+        rng = self.rng("professors")
+        for i in range(self.sizes["professors"]):
+            _id = object_id(rng, moment(rng))
+            self.professor_ids.append(str(_id))
+            professor = {
+                "_id": _id,
+                "name": f"Dr. {person(rng)}",
+                "email": f"professor{i}@faculty.profhub.edu",
+                "hashed_password": self.hashed_password,
+                "department": rng.choice(DEPARTMENTS),
+                "college_name": rng.choice(COLLEGES),
+                "qualification": rng.choice(QUALIFICATIONS),
+                "research_areas": ", ".join(rng.sample(AREAS, 2)),
+                "experience_years": rng.randint(1, 35),
+                "previous_publications": words(rng, 20),
+            }
+            professor["search_terms"] = search_terms(professor)
+            yield professor
+
+    def student_documents(self) -> Iterator[dict]:
+        hashed = hash_password(PASSWORD)
+        rng = self.rng("students")
+        for i in range(self.sizes["students"]):
+            created_at = moment(rng)
+            _id = object_id(rng, created_at)
+            name, email, year = person(rng), f"student{i}@profhub.edu", rng.randint(1, 4)
+            self.students.append((str(_id), name, email, year))
+            yield {
+                "_id": _id,
+                "name": name,
+                "email": email,
+                "reg_no": f"REG{i:08d}",
+                "department": rng.choice(DEPARTMENTS),
+                "year": year,
+                "college_name": rng.choice(COLLEGES),
+                "password": hashed,
+                "skills": rng.sample(TECHNOLOGIES, rng.randint(0, 4)),
+                "resume_url": None,
+                "bio": words(rng, 25) if rng.random() < 0.4 else None,
+                "created_at": created_at,
+            }
+
+    def gig_documents(self) -> Iterator[dict]:
+        rng = self.rng("gigs")
+        for professor_id in self.professor_ids:
+            for _ in range(self.gigs_per_professor):
+                area = rng.choice(AREAS)
+                _id = object_id(rng, moment(rng))
+                title = f"{area}: {words(rng, 4)}"
+                self.gigs.append((str(_id), professor_id, title))
+                status = pick(rng, GIG_STATUS)
+                gig = {
+                    "_id": _id,
+                    "professor_id": professor_id,
+                    "title": title,
+                    "description": words(rng, 80),
+                    "area_of_study": area,
+                    "technologies": ", ".join(rng.sample(TECHNOLOGIES, 3)),
+                    "target_type": rng.choice(TARGET_TYPES),
+                    "paper_type": rng.choice(PAPER_TYPES),
+                    "timeline": rng.choice(TIMELINES),
+                    "year_requirement": rng.choice(YEAR_REQUIREMENTS),
+                    "cgpa_requirement": f"{rng.choice([7.0, 7.5, 8.0, 8.5])}",
+                    "funded": rng.random() < 0.3,
+                    "candidate_count": rng.randint(1, 5),
+                    "status": status,
+                    "publication_link": None,
+                    "publication_venue": None,
+                    "paused_reason": "Funding review" if status == "on-hold" else None,
+                }
+                # Closed gigs are left out of the similar-gigs index, as GigRepository does
+                if status != "closed":
+                    gig["lsh_bands"] = band_keys(gig)
+                yield gig
+
+    def applications_and_notifications(self) -> Iterator[tuple]:
+        """Yield ("applications", doc) and ("notifications", doc) pairs
+
+        Popularity follows a power law, so a few gigs get thousands of applicants. Decided
+        applications produce the student's status notification; at the end every gig with
+        pending applications gets the professor's aggregated "new applications" notice,
+        as create_or_update_application_notification would have left it.
+        """
+        rng = self.rng("applications")
+        if not self.gigs or not self.students:
+            return
+        weights = list(itertools.accumulate(rng.paretovariate(1.2) for _ in self.gigs))
+        pending_per_gig: Dict[int, int] = {}
+        gig_indexes = range(len(self.gigs))
+        for _ in range(self.sizes["applications"]):
+            gig_index = rng.choices(gig_indexes, cum_weights=weights)[0]
+            gig_id, _, title = self.gigs[gig_index]
+            student_id, name, email, year = rng.choice(self.students)
+            applied_at = moment(rng)
+            status = pick(rng, APPLICATION_STATUS)
+            application = {
+                "_id": object_id(rng, applied_at),
+                "gig_id": gig_id,
+                "student_name": name,
+                "student_email": email,
+                "student_year": str(year),
+                "student_cgpa": f"{rng.uniform(6.0, 9.9):.2f}",
+                "resume_link": f"https://drive.profhub.edu/resumes/{student_id}.pdf",
+                "cover_letter": words(rng, rng.randint(40, 160)),
+                "status": status,
+                "applied_at": applied_at,
+            }
+            if rng.random() >= LEGACY_APPLICATION_SHARE:
+                application["student_id"] = student_id
+            yield "applications", application
+
+            if status == "pending":
+                pending_per_gig[gig_index] = pending_per_gig.get(gig_index, 0) + 1
+            else:
+                accepted = status == "accepted"
+                yield "notifications", {
+                    "_id": object_id(rng, applied_at),
+                    "user_id": student_id,
+                    "user_type": "student",
+                    "title": "Application Accepted" if accepted else "Application Update",
+                    "message": (
+                        f"Your application for {title} has been accepted!" if accepted
+                        else f"Your application for {title} was not selected this time."
+                    ),
+                    "type": "success" if accepted else "warning",
+                    "read": rng.random() < 0.6,
+                    "link": f"/student/gigs/{gig_id}",
+                    "metadata": {"gig_id": gig_id, "notification_type": f"application_{status}"},
+                    "created_at": applied_at + timedelta(days=rng.randint(1, 14)),
+                }
+
+        for gig_index, count in sorted(pending_per_gig.items()):
+            gig_id, professor_id, title = self.gigs[gig_index]
+            created_at = moment(rng)
+            yield "notifications", {
+                "_id": object_id(rng, created_at),
+                "user_id": professor_id,
+                "user_type": "professor",
+                "title": "New Application",
+                "message": (
+                    f"You have {count} new applications for {title}" if count > 1
+                    else f"You have 1 new application for {title}"
+                ),
+                "type": "info",
+                "read": False,
+                "link": f"/professor/gigs/{gig_id}/applications",
+                "metadata": {"gig_id": gig_id, "notification_type": "new_applications", "count": count},
+                "created_at": created_at,
+            }
+
+
+class BulkWriter:
+    """Buffers documents per collection and writes full batches, at most ``workers`` at a time
+
+    Batches are unordered so a duplicate does not stop the rest of the batch; write errors
+    are counted and reported rather than aborting the load.
+    """
+
+    def __init__(self, db, batch_size: int, workers: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.slots = asyncio.Semaphore(workers)
+        self.buffers: Dict[str, List[dict]] = {}
+        self.inserted: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.tasks = set()
+
+    async def add(self, collection: str, document: dict):
+        buffer = self.buffers.setdefault(collection, [])
+        buffer.append(document)
+        if len(buffer) >= self.batch_size:
+            self.buffers[collection] = []
+            await self._submit(collection, buffer)
+
+    async def _submit(self, collection: str, batch: List[dict]):
+        await self.slots.acquire()  # backpressure: generation waits while all workers are busy
+        task = asyncio.create_task(self._write(collection, batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _write(self, collection: str, batch: List[dict]):
+        try:
+            try:
+                await self.db[collection].insert_many(batch, ordered=False)
+                inserted = len(batch)
+            except BulkWriteError as e:
+                inserted = e.details.get("nInserted", 0)
+                self.errors[collection] = self.errors.get(collection, 0) + len(e.details.get("writeErrors", []))
+            self.inserted[collection] = self.inserted.get(collection, 0) + inserted
+        finally:
+            self.slots.release()
+
+    async def flush(self):
+        for collection, buffer in list(self.buffers.items()):
+            if buffer:
+                self.buffers[collection] = []
+                await self._submit(collection, buffer)
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks))
+
+
+async def report_progress(writer: BulkWriter, started: float, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        elapsed = time.perf_counter() - started
+        total = sum(writer.inserted.values())
+        parts = ", ".join(f"{name} {count:,}" for name, count in writer.inserted.items())
+        print(f"  {elapsed:7.1f}s  {total:>12,} docs  {total / elapsed:>9,.0f} docs/s  ({parts})", flush=True)
+
+
+async def seed(args):
+    settings.database_name = args.database or settings.database_name
+    if args.mongodb_url:
+        settings.mongodb_url = args.mongodb_url
+    settings.mongodb_max_pool_size = max(settings.mongodb_max_pool_size, args.workers)
+    client = create_client()
+    db = client[settings.database_name]
+
+    print(f"Connecting to MongoDB at {settings.mongodb_url}...")
+    try:
+        await client.admin.command("ping")
+        print("✓ Connected to MongoDB successfully!")
+    except Exception as e:
+        print(f"✗ Failed to connect to MongoDB: {e}")
+        return
+
+    if args.drop:
+        for name in COLLECTIONS:
+            await db.drop_collection(name)
+        print(f"✓ Dropped {', '.join(COLLECTIONS)}")
+
+    if args.indexes_first:
+        await ensure_indexes(db)
+        print("✓ Indexes created")
+
+    dataset = Dataset(args.seed, args.professors, args.students, args.gigs_per_professor, args.applications)
+    writer = BulkWriter(db, args.batch_size, args.workers)
+    print(
+        f"\nGenerating {args.professors:,} professors, {args.students:,} students, "
+        f"{dataset.sizes['gigs']:,} gigs and {args.applications:,} applications "
+        f"(seed {args.seed}, batches of {args.batch_size:,}, {args.workers} workers)"
+    )
+
+    started = time.perf_counter()
+    progress = asyncio.create_task(report_progress(writer, started, args.progress_interval))
+    try:
+        # Parents first: later generators reference the ids they record
+        for name, documents in (
+            ("professors", dataset.professor_documents()),
+            ("students", dataset.student_documents()),
+            ("gigs", dataset.gig_documents()),
+        ):
+            for document in documents:
+                await writer.add(name, document)
+        for name, document in dataset.applications_and_notifications():
+            await writer.add(name, document)
+        await writer.flush()
+    finally:
+        progress.cancel()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'collection':<16} {'inserted':>12} {'errors':>8}")
+    for name in COLLECTIONS:
+        print(f"{name:<16} {writer.inserted.get(name, 0):>12,} {writer.errors.get(name, 0):>8,}")
+    total = sum(writer.inserted.values())
+    print(f"\n✓ Loaded {total:,} documents in {elapsed:.1f}s ({total / elapsed:,.0f} docs/s)")
+
+    if not args.indexes_first:
+        started = time.perf_counter()
+        await ensure_indexes(db)
+        print(f"✓ Built indexes in {time.perf_counter() - started:.1f}s")
+
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load a deterministic synthetic ProfHub dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--professors", type=int, default=1_000)
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--gigs-per-professor", type=int, default=5)
+    parser.add_argument("--applications", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, default=8, help="insert_many batches in flight")
+    parser.add_argument("--drop", action="store_true", help="drop the collections first")
+    parser.add_argument("--indexes-first", action="store_true",
+                        help="create indexes before loading (default: after)")
+    parser.add_argument("--mongodb-url", help=f"default: {settings.mongodb_url}")
+    parser.add_argument("--database", help=f"default: {settings.database_name}")
+    parser.add_argument("--progress-interval", type=float, default=2.0, help="seconds between progress lines")
+    asyncio.run(seed(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Shared fixtures: the app on the in-memory engine (core/memory.py), no MongoDB needed
+
+Each test gets a fresh database: the ``client`` fixture runs the app lifespan, which
+opens a new in-memory client. Async tests are marked ``anyio`` and run on asyncio.
+"""
+import os
+
+# Before any app module reads the settings
+os.environ["MONGODB_URL"] = "memory://"
+
+import httpx
+import pytest
+
+from core.config import settings
+from main import app
+from repositories import professor_repository
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    """HTTP client for the app; admission control is off unless a test turns it on"""
+    monkeypatch.setattr(settings, "admission_enabled", False)
+    professor_repository.directory_cache.invalidate()
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
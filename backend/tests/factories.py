@@ -0,0 +1,33 @@
+"""Create documents through the API, with defaults a test overrides as it needs"""
+
+
+async def create_professor(client, **fields) -> dict:
+    body = {"name": "Ada Lovelace", "email": "ada@example.edu", "department": "Computer Science",
+            "qualification": "PhD", **fields}
+    response = await client.post("/api/professors", json=body)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def create_student(client, **fields) -> dict:
+    body = {"name": "Sam Student", "email": "sam@example.edu", "reg_no": "R001",
+            "department": "Computer Science", "year": 3, "password": "secret123", **fields}
+    response = await client.post("/api/students/register", json=body)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def create_gig(client, professor_id: str, **fields) -> dict:
+    body = {"title": "Graph learning", "description": "Study scalable learning on large graphs",
+            "area_of_study": "Machine Learning", "professor_id": professor_id, **fields}
+    response = await client.post("/api/gigs", json=body)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def apply(client, gig_id: str, student: dict) -> dict:
+    body = {"gig_id": gig_id, "student_id": student["id"], "student_name": student["name"],
+            "student_email": student["email"], "resume_link": "https://example.edu/cv.pdf"}
+    response = await client.post("/api/applications", json=body)
+    assert response.status_code == 201, response.text
+    return response.json()
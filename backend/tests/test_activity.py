@@ -0,0 +1,58 @@
+import pytest
+
+from factories import apply, create_gig, create_professor, create_student
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def application(client):
+    professor = await create_professor(client)
+    gig = await create_gig(client, professor["id"])
+    student = await create_student(client)
+    return {"professor": professor, "gig": gig, "student": student,
+            **await apply(client, gig["id"], student)}
+
+
+async def set_status(client, application_id, status):
+    response = await client.put(f"/api/applications/{application_id}/status", params={"status": status})
+    assert response.status_code == 200, response.text
+
+
+async def test_only_status_transitions_are_recorded(client, application):
+    for status in ["accepted", "accepted", "pending", "rejected", "rejected"]:
+        await set_status(client, application["id"], status)
+
+    feed = (await client.get(f"/api/activity/gigs/{application['gig']['id']}")).json()
+
+    assert [(event["type"], event["status"]) for event in feed["items"]] == [
+        ("application_rejected", "rejected"), ("application_accepted", "accepted"),
+    ]
+    assert feed["next_cursor"] is None
+    notifications = (await client.get(f"/api/notifications/{application['student']['id']}")).json()
+    assert len(notifications) == 2
+
+
+async def test_gig_and_user_feeds_page_newest_first(client, application):
+    gig_id = application["gig"]["id"]
+    await client.put(f"/api/gigs/{gig_id}/hold", json={"paused_reason": "Funding review"})
+    await client.put(f"/api/gigs/{gig_id}/activate")
+    await set_status(client, application["id"], "accepted")
+    await client.put(f"/api/gigs/{gig_id}/close", json={})
+
+    first = (await client.get(f"/api/activity/gigs/{gig_id}", params={"limit": 3})).json()
+    rest = (await client.get(f"/api/activity/gigs/{gig_id}", params={"before": first["next_cursor"]})).json()
+
+    assert [event["type"] for event in first["items"] + rest["items"]] == [
+        "gig_closed", "application_accepted", "gig_activated", "gig_on_hold",
+    ]
+    assert rest["next_cursor"] is None
+    student_feed = (await client.get(f"/api/activity/users/{application['student']['id']}")).json()
+    assert [event["type"] for event in student_feed["items"]] == ["application_accepted"]
+    professor_feed = (await client.get(f"/api/activity/users/{application['professor']['id']}")).json()
+    assert len(professor_feed["items"]) == 4
+
+
+async def test_invalid_cursor_is_rejected(client, application):
+    response = await client.get(f"/api/activity/gigs/{application['gig']['id']}", params={"before": "nope"})
+    assert response.status_code == 400
@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core import admission
+from core.config import settings
+from core.metrics import Registry
+from main import app
+
+from factories import create_student
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_login_is_rate_limited_per_client(client, monkeypatch):
+    await create_student(client)
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    _, burst = admission.RATE_LIMITS["login_student"]
+    credentials = {"email": "sam@example.edu", "password": "wrong"}
+
+    async def login(address):
+        transport = httpx.ASGITransport(app=app, client=(address, 1))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as other:
+            return await other.post("/api/students/login", json=credentials)
+
+    statuses = [(await login("10.9.9.9")).status_code for _ in range(burst)]
+    limited = await login("10.9.9.9")
+
+    assert statuses == [401] * burst
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) >= 1
+    assert (await login("10.9.9.10")).status_code == 401
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = admission.TokenBucket(2, now=0.0)
+
+    assert bucket.take(1.0, 2, now=0.0) == 0
+    assert bucket.take(1.0, 2, now=0.0) == 0
+    assert bucket.take(1.0, 2, now=0.0) == pytest.approx(1.0)
+    assert bucket.take(1.0, 2, now=0.5) == pytest.approx(0.5)
+    assert bucket.take(1.0, 2, now=1.0) == 0
+
+
+def test_route_key_shares_one_entry_per_path_template():
+    first = {"method": "GET", "path": "/api/gigs/0123456789abcdef01234567/applications"}
+    second = {"method": "GET", "path": "/api/gigs/fedcba9876543210fedcba98/applications"}
+
+    assert admission.route_key(first) == admission.route_key(second) == ("GET", "/api/gigs/{id}/applications")
+
+
+@pytest.fixture
+def middleware(monkeypatch):
+    """Admission in front of an endpoint that runs until ``release`` is set"""
+    monkeypatch.setattr(admission, "REGISTRY", Registry())
+    monkeypatch.setattr(settings, "admission_enabled", True)
+    release = asyncio.Event()
+
+    async def endpoint(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    guarded = admission.AdmissionMiddleware(endpoint)
+    guarded.release = release
+    return guarded
+
+
+async def call(middleware, path="/api/professors", client=("10.0.0.1", 1)):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "app": app, "headers": [], "client": client,
+             "query_string": b"", "root_path": ""}
+    await middleware(scope, None, send)
+    return messages[0]["status"]
+
+
+async def test_requests_past_the_route_concurrency_are_shed(middleware, monkeypatch):
+    monkeypatch.setitem(admission.ROUTE_CONCURRENCY, "list_professors", 1)
+    monkeypatch.setattr(settings, "admission_queue_timeout_ms", 20)
+
+    running = asyncio.ensure_future(call(middleware))
+    await asyncio.sleep(0)
+    assert await call(middleware) == 503
+    middleware.release.set()
+    assert await running == 200
+
+
+async def test_buckets_and_route_names_are_bounded(middleware, monkeypatch):
+    monkeypatch.setattr(admission, "MAX_BUCKETS", 2)
+    monkeypatch.setattr(admission, "MAX_CACHED_ROUTES", 2)
+    for address in ("10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.3"):
+        middleware._take_token("login", address, 1.0, 10)
+    for path in ("/api/gigs", "/api/professors", "/api/gigs", "/api/students/batch"):
+        middleware._route_name({"type": "http", "method": "GET", "path": path, "app": app})
+
+    # The least recently used entry is the one dropped
+    assert list(middleware._buckets) == [("login", "10.0.0.1"), ("login", "10.0.0.3")]
+    assert list(middleware._route_names) == [("GET", "/api/gigs"), ("GET", "/api/students/batch")]
@@ -0,0 +1,81 @@
+import argparse
+
+import pytest
+
+import backfill_student_ids
+from core.config import settings
+from core.memory import MemoryClient
+
+from factories import create_gig, create_professor, create_student
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    """One in-memory client the backfill connects to, instead of a fresh one per create_client"""
+    client = MemoryClient()
+    monkeypatch.setattr(backfill_student_ids, "create_client", lambda: client)
+    return client[settings.database_name]
+
+
+def arguments(**overrides):
+    values = dict(batch_size=2, pause_ms=0, restart=False, status=False, mongodb_url=None, database=None)
+    return argparse.Namespace(**{**values, **overrides})
+
+
+async def seed(db):
+    student_ids = [str(oid) for oid in (await db.students.insert_many(
+        [{"email": "a@example.edu"}, {"email": "b@example.edu"}]
+    )).inserted_ids]
+    await db.applications.insert_many([
+        {"student_email": "a@example.edu"},
+        {"student_email": "b@example.edu", "student_id": None},
+        {"student_email": "a@example.edu", "student_id": ""},
+        {"student_email": "nobody@example.edu"},
+        {"student_email": "b@example.edu", "student_id": "kept"},
+    ])
+    return student_ids
+
+
+async def test_backfill_resolves_emails_and_reports_the_rest(memory):
+    a, b = await seed(memory)
+
+    await backfill_student_ids.backfill(arguments())
+
+    by_email = {}
+    async for application in memory.applications.find({}).sort("_id", 1):
+        by_email.setdefault(application["student_email"], []).append(application.get("student_id"))
+    assert by_email == {"a@example.edu": [a, a], "b@example.edu": [b, "kept"], "nobody@example.edu": [None]}
+    state = await memory.migrations.find_one({"_id": backfill_student_ids.MIGRATION_ID})
+    assert (state["scanned"], state["updated"], state["unresolved"]) == (4, 3, 1)
+    assert state["completed_at"] is not None
+
+
+async def test_backfill_resumes_after_the_saved_batch(memory):
+    await seed(memory)
+    first = await memory.applications.find_one({})
+    # An earlier run finished the first batch and stopped; that application is left alone
+    await memory.migrations.insert_one({
+        "_id": backfill_student_ids.MIGRATION_ID, "last_id": first["_id"], "scanned": 1, "updated": 0,
+        "unresolved": 0, "started_at": None, "completed_at": None,
+    })
+
+    await backfill_student_ids.backfill(arguments())
+
+    assert (await memory.applications.find_one({"_id": first["_id"]})).get("student_id") is None
+    assert await memory.applications.count_documents(backfill_student_ids.LEGACY) == 2
+
+
+async def test_applications_get_student_id_from_a_registered_email(client, monkeypatch):
+    professor = await create_professor(client)
+    gig = await create_gig(client, professor["id"])
+    student = await create_student(client)
+    body = {"gig_id": gig["id"], "student_name": student["name"], "student_email": student["email"],
+            "resume_link": "https://example.edu/cv.pdf"}
+    assert (await client.post("/api/applications", json=body)).status_code == 201
+    monkeypatch.setattr(settings, "applications_by_student_id", True)
+
+    response = await client.get(f"/api/students/{student['id']}/applications")
+
+    assert [application["gig_id"] for application in response.json()] == [gig["id"]]
@@ -0,0 +1,43 @@
+import pytest
+from bson import ObjectId
+
+from schemas.batch import MAX_BATCH_IDS
+
+from factories import apply, create_gig, create_professor, create_student
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_gigs_batch_keeps_order_and_reports_missing(client):
+    professor = await create_professor(client)
+    gigs = [await create_gig(client, professor["id"], title=f"Gig {n}") for n in range(3)]
+    unknown = str(ObjectId())
+    ids = [gigs[2]["id"], unknown, gigs[0]["id"], "not-an-id", gigs[2]["id"]]
+
+    response = await client.post("/api/gigs/batch", json={"ids": ids})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [gig["title"] for gig in body["items"]] == ["Gig 2", "Gig 0"]
+    assert body["missing"] == [unknown, "not-an-id"]
+
+
+async def test_students_and_applications_batches(client):
+    professor = await create_professor(client)
+    gig = await create_gig(client, professor["id"])
+    student = await create_student(client)
+    application = await apply(client, gig["id"], student)
+
+    students = (await client.post("/api/students/batch", json={"ids": [student["id"]]})).json()
+    applications = (await client.post("/api/applications/batch", json={"ids": [application["id"]]})).json()
+
+    assert [item["email"] for item in students["items"]] == [student["email"]]
+    assert "password" not in students["items"][0]
+    assert [item["id"] for item in applications["items"]] == [application["id"]]
+    assert students["missing"] == applications["missing"] == []
+
+
+@pytest.mark.parametrize("ids", [[], [str(ObjectId()) for _ in range(MAX_BATCH_IDS + 1)]])
+async def test_batch_size_is_bounded(client, ids):
+    response = await client.post("/api/gigs/batch", json={"ids": ids})
+    assert response.status_code == 422
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from fastapi.utils import create_model_field
+
+from benchmarks.serialization import codec_path, current_path, make_gigs
+from benchmarks.suite import get_student_applications, list_all_gigs, measure, select
+from core import database
+from core.codec import DocumentCodec
+from core.config import settings
+from schemas.gig import GigResponse
+
+
+def test_both_serialization_paths_produce_the_same_json():
+    field = create_model_field(name="Response_list_all_gigs", type_=list[GigResponse], mode="serialization")
+    gigs = make_gigs(50)
+
+    expected = json.loads(current_path([dict(gig) for gig in gigs], field))
+    actual = json.loads(codec_path([dict(gig) for gig in gigs], DocumentCodec(GigResponse)))
+
+    assert actual == expected
+
+
+def test_generated_gigs_depend_only_on_the_seed():
+    first, second = make_gigs(20, seed=3), make_gigs(20, seed=3)
+
+    assert [gig["description"] for gig in first] == [gig["description"] for gig in second]
+
+
+def test_select_filters_by_name():
+    assert [benchmark.name for benchmark in select("verify")] == ["verify_password"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("benchmark", [list_all_gigs(50), get_student_applications(5)], ids=lambda b: b.name)
+async def test_router_benchmarks_run_against_a_fresh_database(benchmark, monkeypatch):
+    monkeypatch.setattr(settings, "mongodb_min_pool_size", settings.mongodb_min_pool_size)
+    benchmark.number = 1
+    try:
+        result = await measure(benchmark, repeat=2)
+    finally:
+        database.close()
+
+    assert 0 < result["best_s"] <= result["median_s"]
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import orjson
+import pytest
+from bson import ObjectId
+
+from core.codec import DocumentCodec, dumps
+from factories import create_gig, create_professor
+from schemas.gig import GigResponse
+from schemas.student import StudentResponse
+
+
+def test_codec_output_matches_the_response_model():
+    doc = {"_id": ObjectId(), "title": "T", "description": "D", "area_of_study": "ML", "funded": True,
+           "professor_id": str(ObjectId()), "status": "open", "lsh_bands": ["a"], "alerts_sent_at": None}
+    expected = GigResponse(id=str(doc["_id"]), **{k: v for k, v in doc.items() if k != "_id"}).model_dump()
+
+    assert DocumentCodec(GigResponse).to_dict(doc) == expected
+
+
+def test_fields_outside_the_model_are_never_sent():
+    codec = DocumentCodec(StudentResponse)
+    doc = {"_id": ObjectId(), "name": "S", "email": "s@example.edu", "reg_no": "1", "department": "CS",
+           "year": 2, "password": "$2b$hash"}
+
+    result = codec.to_dict(doc)
+
+    assert "password" not in result and "password" not in codec.projection
+    assert result["skills"] == []
+
+
+def test_datetimes_and_object_ids_are_encoded():
+    oid = ObjectId()
+
+    assert orjson.loads(dumps({"id": oid, "at": datetime(2024, 1, 2, 3, 4, 5)})) == {
+        "id": str(oid), "at": "2024-01-02T03:04:05",
+    }
+
+
+@pytest.mark.anyio
+async def test_gig_list_is_encoded_by_the_codec(client):
+    professor = await create_professor(client)
+    gig = await create_gig(client, professor["id"])
+
+    response = await client.get("/api/gigs")
+
+    assert response.status_code == 200
+    assert response.json() == [gig]
+    assert set(response.json()[0]) == set(GigResponse.model_fields)
@@ -0,0 +1,91 @@
+import gzip
+import zlib
+
+import pytest
+
+from core.compression import _CompressingSend, compress, level_for, negotiate
+from core.metrics import Registry
+from factories import create_gig, create_professor
+
+
+def test_negotiation_takes_the_highest_q_value_then_server_preference():
+    preference = ["zstd", "br", "gzip"]
+
+    assert negotiate("gzip, br", preference) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", preference) == "gzip"
+    assert negotiate("br;q=0, gzip", preference) == "gzip"
+    assert negotiate("*", preference) == "zstd"
+    assert negotiate("identity", preference) is None
+
+
+@pytest.mark.parametrize("encoding, module", [("gzip", "gzip"), ("br", "brotli"), ("zstd", "zstandard")])
+def test_every_encoding_round_trips(encoding, module):
+    decoder = pytest.importorskip(module).decompress
+    body = b'{"title": "Graph learning"}' * 200
+
+    assert decoder(compress(encoding, body, level_for(encoding, len(body)))) == body
+
+
+@pytest.mark.anyio
+async def test_large_lists_are_compressed_for_clients_that_accept_it(client):
+    professor = await create_professor(client)
+    for number in range(10):
+        await create_gig(client, professor["id"], title=f"Gig {number}")
+
+    compressed = await client.get("/api/gigs", headers={"Accept-Encoding": "gzip"})
+    plain = await client.get("/api/gigs", headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.json() == plain.json()
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["vary"] == plain.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.anyio
+async def test_small_responses_are_sent_as_they_are(client):
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+async def run_send(encoding, messages):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    compressing = _CompressingSend(send, encoding, 1024, Registry().counter("bytes", "Bytes", ("encoding", "stage")))
+    for message in messages:
+        await compressing(message)
+    return sent
+
+
+@pytest.mark.anyio
+async def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    chunks = [b'{"n": %d}\n' % number * 10 for number in range(3)]
+    start = {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]}
+    bodies = [{"type": "http.response.body", "body": chunk, "more_body": True} for chunk in chunks]
+    bodies.append({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = await run_send("gzip", [start, *bodies])
+
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    # Each chunk can be decoded as soon as it arrives
+    for chunk, message in zip(chunks, sent[1:]):
+        assert decoder.decompress(message["body"]) == chunk
+    assert gzip.decompress(b"".join(message["body"] for message in sent[1:])) == b"".join(chunks)
+
+
+@pytest.mark.anyio
+async def test_already_encoded_responses_are_left_alone():
+    body = gzip.compress(b"x" * 4096)
+    start = {"type": "http.response.start", "status": 200,
+             "headers": [(b"content-type", b"application/json"), (b"content-encoding", b"gzip")]}
+
+    sent = await run_send("gzip", [start, {"type": "http.response.body", "body": body}])
+
+    assert sent[0] is start and sent[1]["body"] == body
@@ -0,0 +1,89 @@
+import argparse
+from datetime import datetime
+
+import pytest
+
+import data_transfer
+from core.memory import MemoryClient
+
+pytestmark = pytest.mark.anyio
+
+
+def arguments(directory, **overrides):
+    values = dict(directory=directory, format="ndjson", compress="none", resume=False, filter={},
+                  projection=None, batch_size=100, drop=False)
+    return argparse.Namespace(**{**values, **overrides})
+
+
+@pytest.fixture
+async def source():
+    db = MemoryClient()["source"]
+    await db["gigs"].insert_many([{"n": i, "posted": datetime(2024, 1, 1, i % 24)} for i in range(250)])
+    return db
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "bson"])
+@pytest.mark.parametrize("compress", ["none", "gzip"])
+async def test_export_then_import_round_trips(source, tmp_path, fmt, compress):
+    args = arguments(tmp_path, format=fmt, compress=compress)
+    await data_transfer.export_collection(source, "gigs", args)
+    path = data_transfer.data_file(tmp_path, "gigs", fmt, compress)
+    target = MemoryClient()["target"]
+
+    await data_transfer.import_collection(target, path, args)
+
+    original = await source["gigs"].find({}).sort("_id", 1).to_list(None)
+    copied = await target["gigs"].find({}).sort("_id", 1).to_list(None)
+    assert copied == original
+    assert not data_transfer.Checkpoint(path, "export").path.exists()
+    assert not data_transfer.Checkpoint(path, "import").path.exists()
+
+
+async def test_filter_and_projection_are_applied(source, tmp_path):
+    args = arguments(tmp_path, filter={"n": {"$lt": 10}}, projection={"n": 1})
+    await data_transfer.export_collection(source, "gigs", args)
+    target = MemoryClient()["target"]
+
+    await data_transfer.import_collection(target, data_transfer.data_file(tmp_path, "gigs", "ndjson", "none"), args)
+
+    copied = await target["gigs"].find({}).to_list(None)
+    assert sorted(document["n"] for document in copied) == list(range(10))
+    assert all(set(document) == {"_id", "n"} for document in copied)
+
+
+async def test_resume_continues_after_the_checkpoint(source, tmp_path):
+    args = arguments(tmp_path)
+    path = data_transfer.data_file(tmp_path, "gigs", "ndjson", "none")
+    await data_transfer.export_collection(source, "gigs", args)
+    lines = path.read_bytes().splitlines(keepends=True)
+    # Simulate a crash after the first batch, with half of the second batch written
+    first_batch = b"".join(lines[:100])
+    path.write_bytes(first_batch + b"".join(lines[100:150]))
+    last = await source["gigs"].find({}).sort("_id", 1).skip(99).limit(1).to_list(None)
+    data_transfer.Checkpoint(path, "export").save({"count": 100, "offset": len(first_batch), "last_id": last[0]["_id"]})
+
+    await data_transfer.export_collection(source, "gigs", arguments(tmp_path, resume=True))
+
+    assert path.read_bytes().splitlines(keepends=True) == lines
+
+
+async def test_resume_without_the_data_file_exports_from_the_start(source, tmp_path):
+    path = data_transfer.data_file(tmp_path, "gigs", "ndjson", "none")
+    first = await source["gigs"].find_one({})
+    data_transfer.Checkpoint(path, "export").save({"count": 100, "offset": 12345, "last_id": first["_id"]})
+
+    await data_transfer.export_collection(source, "gigs", arguments(tmp_path, resume=True))
+
+    assert len(path.read_bytes().splitlines()) == 250
+
+
+async def test_reimport_counts_duplicates_instead_of_failing(source, tmp_path):
+    args = arguments(tmp_path)
+    await data_transfer.export_collection(source, "gigs", args)
+    path = data_transfer.data_file(tmp_path, "gigs", "ndjson", "none")
+    target = MemoryClient()["target"]
+
+    await data_transfer.import_collection(target, path, args)
+    await data_transfer.import_collection(target, path, args)
+
+    assert await target["gigs"].count_documents({}) == 250
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core import database
+from core.config import settings
+from core.database import PoolStats, duplicate_key_field
+from core.indexes import INDEXES
+from main import app
+
+
+@pytest.mark.anyio
+async def test_startup_creates_the_manifest_indexes(client):
+    db = database.get_database_handle()
+    for collection, indexes in INDEXES.items():
+        existing = await db[collection].index_information()
+        for index in indexes:
+            assert index.document["name"] in existing, (collection, index.document["name"])
+
+
+@pytest.mark.anyio
+async def test_ready_reports_latency_and_pool_usage(client):
+    response = await client.get("/ready")
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["status"] == "ready"
+    assert body["database"]["latency_ms"] >= 0
+    assert body["database"]["pool"]["max_size"] == settings.mongodb_max_pool_size
+
+
+@pytest.mark.anyio
+async def test_the_database_is_closed_with_the_lifespan():
+    async with app.router.lifespan_context(app):
+        assert database.get_database_handle() is not None
+    with pytest.raises(RuntimeError):
+        database.get_database_handle()
+
+
+def test_pool_stats_follow_checkouts_of_the_busiest_server():
+    stats = PoolStats()
+    primary, secondary = SimpleNamespace(address=("a", 27017)), SimpleNamespace(address=("b", 27017))
+    for event in (primary, primary, secondary):
+        stats.connection_created(event)
+        stats.connection_check_out_started(event)
+        stats.connection_checked_out(event)
+    stats.connection_checked_in(secondary)
+
+    snapshot = stats.snapshot()
+
+    assert (snapshot["open"], snapshot["checked_out"], snapshot["waiting"]) == (2, 2, 0)
+    assert snapshot["saturation"] == round(2 / settings.mongodb_max_pool_size, 3)
+
+
+def test_duplicate_key_field_from_key_pattern_or_message():
+    assert duplicate_key_field({"keyPattern": {"reg_no": 1}}) == "reg_no"
+    assert duplicate_key_field({"errmsg": "E11000 duplicate key error index: email_1 dup key"}) == "email"
+    assert duplicate_key_field(None) is None
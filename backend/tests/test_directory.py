@@ -0,0 +1,63 @@
+import pytest
+
+from core.cache import TTLCache
+from repositories import professor_repository
+
+from factories import create_professor
+
+pytestmark = pytest.mark.anyio
+
+PROFESSORS = [
+    ("Grace Hopper", "Computer Science", "Compilers, programming languages"),
+    ("Alan Turing", "Mathematics", "Computability, machine learning"),
+    ("Barbara Liskov", "Computer Science", "Distributed systems"),
+    ("Emmy Noether", "Mathematics", "Abstract algebra"),
+]
+
+
+@pytest.fixture
+async def professors(client):
+    for number, (name, department, areas) in enumerate(PROFESSORS):
+        await create_professor(client, name=name, email=f"p{number}@example.edu", department=department,
+                               research_areas=areas)
+
+
+async def names(client, **params):
+    response = await client.get("/api/professors", params=params)
+    assert response.status_code == 200, response.text
+    return [professor["name"] for professor in response.json()]
+
+
+async def test_directory_pages_in_name_order(client, professors):
+    assert await names(client, limit=2) == ["Alan Turing", "Barbara Liskov"]
+    assert await names(client, limit=2, skip=2) == ["Emmy Noether", "Grace Hopper"]
+    assert (await client.get("/api/professors", params={"limit": 1000})).status_code == 422
+
+
+async def test_directory_filters_and_searches_by_prefix(client, professors):
+    assert await names(client, department="Mathematics") == ["Alan Turing", "Emmy Noether"]
+    assert await names(client, q="mach") == ["Alan Turing"]
+    assert await names(client, q="comp") == ["Alan Turing", "Grace Hopper"]
+    assert await names(client, q="comp", department="Computer Science") == ["Grace Hopper"]
+    assert await names(client, q="distributed sys") == ["Barbara Liskov"]
+
+
+async def test_writes_invalidate_the_cached_default_page(client, professors):
+    cache = professor_repository.directory_cache
+    assert "Ada Lovelace" not in await names(client)
+    assert cache.get("default") is not None
+
+    await create_professor(client)
+
+    assert "Ada Lovelace" in await names(client)
+
+
+async def test_a_page_read_across_an_invalidation_is_not_cached():
+    cache = TTLCache(60)
+    generation = cache.generation
+    cache.invalidate()
+
+    cache.set("default", b"stale", generation)
+    assert cache.get("default") is None
+    cache.set("default", b"fresh", cache.generation)
+    assert cache.get("default") == b"fresh"
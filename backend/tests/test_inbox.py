@@ -0,0 +1,55 @@
+import pytest
+
+from factories import apply, create_gig, create_professor, create_student
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def inbox(client):
+    """Two gigs of one professor with three applicants each, and another professor's gig"""
+    professor = await create_professor(client)
+    gigs = [await create_gig(client, professor["id"], title=f"Gig {n}") for n in range(2)]
+    other = await create_gig(client, (await create_professor(client, email="other@example.edu"))["id"])
+    applications = []
+    for number in range(6):
+        student = await create_student(client, name=f"Student {number}", email=f"s{number}@example.edu",
+                                       reg_no=f"R{number}")
+        applications.append(await apply(client, gigs[number % 2]["id"], student))
+        await apply(client, other["id"], student)
+    return {"professor_id": professor["id"], "gigs": gigs, "applications": applications}
+
+
+async def page(client, professor_id, **params):
+    response = await client.get(f"/api/professors/{professor_id}/applications", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_inbox_pages_newest_first_across_gigs(client, inbox):
+    newest_first = [application["id"] for application in reversed(inbox["applications"])]
+
+    first = await page(client, inbox["professor_id"], limit=4)
+    second = await page(client, inbox["professor_id"], limit=4, before=first["next_cursor"])
+
+    assert [item["id"] for item in first["items"] + second["items"]] == newest_first
+    assert second["next_cursor"] is None
+    assert first["items"][0]["gig_title"] == "Gig 1"
+    assert "cover_letter" not in first["items"][0]
+
+
+async def test_inbox_filters_by_gig_and_status(client, inbox):
+    accepted = inbox["applications"][2]
+    await client.put(f"/api/applications/{accepted['id']}/status", params={"status": "accepted"})
+
+    by_gig = await page(client, inbox["professor_id"], gig_id=inbox["gigs"][0]["id"])
+    by_status = await page(client, inbox["professor_id"], status="accepted", view="full")
+
+    assert [item["id"] for item in by_gig["items"]] == [inbox["applications"][n]["id"] for n in (4, 2, 0)]
+    assert [item["id"] for item in by_status["items"]] == [accepted["id"]]
+    assert by_status["items"][0]["resume_link"] == "https://example.edu/cv.pdf"
+
+
+async def test_inbox_rejects_invalid_ids(client, inbox):
+    response = await client.get(f"/api/professors/{inbox['professor_id']}/applications", params={"before": "x"})
+    assert response.status_code == 400
@@ -0,0 +1,44 @@
+import pytest
+
+from core.indexes import INDEXES, OBSOLETE_INDEXES, QUERY_SHAPES, QueryShape, ensure_indexes, prune_indexes
+from core.memory import MemoryClient
+from verify_indexes import judge, static_check
+
+
+@pytest.mark.parametrize("shape", QUERY_SHAPES, ids=lambda shape: shape.name)
+def test_every_query_shape_is_served_by_the_manifest(shape):
+    ok, detail = static_check(shape)
+    assert ok, detail
+
+
+def test_static_check_rejects_unindexed_and_unsorted_shapes():
+    assert not static_check(QueryShape("unindexed", "gigs", {"no_such_field": 1}))[0]
+    ok, detail = static_check(QueryShape("unsorted", "gigs", {"professor_id": "x"}, sort=[("no_such_field", 1)]))
+    assert not ok and "SORT" in detail
+
+
+def test_judge_fails_collection_scans_and_blocking_sorts():
+    shape = QueryShape("shape", "gigs", {"professor_id": "x"})
+
+    assert judge(shape, [{"stage": "FETCH"}, {"stage": "IXSCAN", "indexName": "professor_id_1"}])[0]
+    assert not judge(shape, [{"stage": "COLLSCAN"}])[0]
+    assert not judge(shape, [{"stage": "SORT"}, {"stage": "IXSCAN", "indexName": "professor_id_1"}])[0]
+    assert judge(shape._replace(full_scan=True), [{"stage": "COLLSCAN"}])[0]
+    assert not judge(shape._replace(hint="other_1"), [{"stage": "IXSCAN", "indexName": "professor_id_1"}])[0]
+
+
+@pytest.mark.anyio
+async def test_ensure_indexes_creates_the_manifest_and_prunes_obsolete_ones():
+    db = MemoryClient()["test"]
+    for collection, names in OBSOLETE_INDEXES.items():
+        for name in names:
+            await db[collection].create_index(name.rsplit("_", 1)[0], name=name)
+
+    await ensure_indexes(db)
+    dropped = await prune_indexes(db)
+
+    assert dropped == OBSOLETE_INDEXES
+    for collection, indexes in INDEXES.items():
+        existing = await db[collection].index_information()
+        assert {index.document["name"] for index in indexes} <= set(existing)
+        assert not set(OBSOLETE_INDEXES.get(collection, [])) & set(existing)
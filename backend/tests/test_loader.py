@@ -0,0 +1,68 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from bson import ObjectId
+
+from core.loader import RequestLoaders, current_loaders, forget, load, load_many
+from core.memory import MemoryClient
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def gigs():
+    collection = MemoryClient()["test"]["gigs"]
+    await collection.insert_many([{"n": n} for n in range(5)])
+    return collection
+
+
+@contextmanager
+def request_scope():
+    """Loaders scoped like one request's, as LoaderMiddleware sets them"""
+    loaders = RequestLoaders()
+    token = current_loaders.set(loaders)
+    try:
+        yield loaders
+    finally:
+        current_loaders.reset(token)
+
+
+async def test_concurrent_loads_share_one_query(gigs):
+    with request_scope() as loaders:
+        ids = [document["_id"] async for document in gigs.find({})]
+
+        documents = await asyncio.gather(*(load(gigs, oid) for oid in ids), load(gigs, ids[0]))
+
+        assert [document["n"] for document in documents] == [0, 1, 2, 3, 4, 0]
+        assert loaders.batches == 1
+
+
+async def test_load_many_keeps_order_and_fills_gaps(gigs):
+    with request_scope() as loaders:
+        ids = [document["_id"] async for document in gigs.find({})]
+
+        documents = await load_many(gigs, [ids[2], None, ObjectId(), ids[0]])
+
+        assert [document and document["n"] for document in documents] == [2, None, None, 0]
+        assert loaders.batches == 1
+
+
+async def test_documents_are_cached_for_the_request_until_forgotten(gigs):
+    with request_scope() as loaders:
+        oid = (await gigs.find_one({"n": 3}))["_id"]
+        await load(gigs, oid)
+        await gigs.update_one({"_id": oid}, {"$set": {"n": 30}})
+
+        assert (await load(gigs, oid))["n"] == 3
+        forget(gigs, oid)
+        assert (await load(gigs, oid))["n"] == 30
+        assert loaders.batches == 2
+
+
+async def test_outside_a_request_nothing_is_cached(gigs):
+    oid = (await gigs.find_one({"n": 1}))["_id"]
+    await load(gigs, oid)
+    await gigs.update_one({"_id": oid}, {"$set": {"n": 10}})
+
+    assert (await load(gigs, oid))["n"] == 10
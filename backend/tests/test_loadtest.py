@@ -0,0 +1,45 @@
+import pytest
+
+from loadtest.population import seed
+from loadtest.runner import MIN_COMPARE_SAMPLES, compare, percentile, run
+
+
+def route_stats(count: int, p95_ms: float, rps: float) -> dict:
+    return {"count": count, "p95_ms": p95_ms, "rps": rps}
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(number) for number in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.95) == 0.0
+
+
+def test_compare_flags_p95_and_throughput_regressions_beyond_the_tolerance():
+    samples = MIN_COMPARE_SAMPLES
+    baseline = {"routes": {"GET /api/gigs": route_stats(samples, 10, 100), "GET /health": route_stats(samples, 1, 100)},
+                "total": route_stats(samples * 2, 10, 200)}
+    report = {"routes": {"GET /api/gigs": route_stats(samples, 13, 100), "GET /health": route_stats(samples, 1, 80)},
+              "total": route_stats(samples * 2, 10.5, 190)}
+
+    _, regressions = compare(report, baseline, tolerance=0.15)
+
+    assert regressions == [
+        "GET /api/gigs: p95 10.00 ms -> 13.00 ms",
+        "GET /health: throughput 100.0 -> 80.0 req/s",
+    ]
+
+
+@pytest.mark.anyio
+async def test_a_short_run_exercises_the_scenarios_without_server_errors(client):
+    population = await seed(client, professors=2, gigs_per_professor=2, students=4, applications=4)
+
+    report = await run(client, population, users=3, duration=0.3)
+
+    assert len(population.gigs) == 4 and len(population.students) == 4
+    assert report["total"]["count"] > 0
+    assert report["total"]["errors"] == 0
+    assert sum(report["scenarios"].values()) > 0
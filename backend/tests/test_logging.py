@@ -0,0 +1,81 @@
+import json
+import logging
+
+import pytest
+
+from core.config import settings
+from core.log import REDACTED, ContextFilter, JsonFormatter, redact
+
+from factories import apply, create_gig, create_professor, create_student
+
+pytestmark = pytest.mark.anyio
+
+
+class Collect(logging.Handler):
+    """Formats records the way the log writer would, in the logging call's context"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.addFilter(ContextFilter())
+        self.setFormatter(JsonFormatter())
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(json.loads(self.format(record)))
+
+
+@pytest.fixture
+def records(monkeypatch):
+    monkeypatch.setattr(settings, "log_debug_sample_rate", 1.0)
+    logger = logging.getLogger("api.routers.applications")
+    handler = Collect()
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield handler.lines
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+
+def test_redact_masks_secrets_at_any_depth_without_mutating():
+    document = {"name": "Sam", "password": "x", "applications": [{"cover_letter": "Dear", "gig_id": "g"}]}
+
+    assert redact(document) == {"name": "Sam", "password": REDACTED,
+                                "applications": [{"cover_letter": REDACTED, "gig_id": "g"}]}
+    assert document["password"] == "x"
+
+
+async def test_request_logs_carry_the_request_id_and_no_document(client, records):
+    professor = await create_professor(client)
+    gig = await create_gig(client, professor["id"])
+    application = await apply(client, gig["id"], await create_student(client))
+
+    response = await client.put(f"/api/applications/{application['id']}/status", params={"status": "accepted"},
+                                headers={"x-request-id": "review-42"})
+
+    assert response.headers["x-request-id"] == "review-42"
+    updated, returning = [line for line in records if line.get("request_id") == "review-42"]
+    assert updated["message"] == "Application status updated"
+    assert (updated["previous_status"], updated["status"]) == ("pending", "accepted")
+    assert (returning["level"], returning["application_id"], returning["status"]) == ("DEBUG", application["id"], "accepted")
+    assert not {"application", "resume_link", "cover_letter", "student_email"} & set(returning)
+
+
+async def test_invalid_request_ids_are_replaced(client):
+    response = await client.get("/health", headers={"x-request-id": "bad id\twith spaces"})
+
+    assert response.headers["x-request-id"] != "bad id\twith spaces"
+    assert len(response.headers["x-request-id"]) == 32
+
+
+def test_extras_are_redacted_when_the_record_is_made():
+    handler = Collect()
+    logger = logging.getLogger("tests.logging")
+    logger.addHandler(handler)
+    try:
+        logger.warning("Login failed", extra={"token": "abc", "student": {"email": "s@example.edu", "password": "pw"}})
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.lines[0]["token"] == REDACTED
+    assert handler.lines[0]["student"] == {"email": "s@example.edu", "password": REDACTED}
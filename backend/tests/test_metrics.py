@@ -0,0 +1,51 @@
+import pytest
+from bson import ObjectId
+
+from core.metrics import Registry
+
+
+def sample(exposition: str, series: str) -> float:
+    for line in exposition.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@pytest.mark.anyio
+async def test_requests_are_counted_per_route_template(client):
+    series = 'profhub_http_requests_total{method="GET",route="/api/gigs/{gig_id}",status="404"}'
+    before = sample((await client.get("/metrics")).text, series)
+
+    gig_ids = [str(ObjectId()) for _ in range(2)]
+    for gig_id in gig_ids:
+        assert (await client.get(f"/api/gigs/{gig_id}")).status_code == 404
+    response = await client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert sample(response.text, series) == before + 2
+    assert not any(gig_id in response.text for gig_id in gig_ids)
+    latency = 'profhub_http_request_duration_seconds_count{method="GET",route="/api/gigs/{gig_id}"}'
+    assert sample(response.text, latency) >= 2
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("sizes", "Sizes", ("route",), buckets=(10, 100))
+    for value in (5, 50, 500):
+        histogram.observe(("/x",), value)
+
+    exposition = registry.render()
+
+    assert "# TYPE sizes histogram" in exposition
+    assert sample(exposition, 'sizes_bucket{route="/x",le="10"}') == 1
+    assert sample(exposition, 'sizes_bucket{route="/x",le="100"}') == 2
+    assert sample(exposition, 'sizes_bucket{route="/x",le="+Inf"}') == 3
+    assert sample(exposition, 'sizes_sum{route="/x"}') == 555
+
+
+def test_metric_names_are_registered_once():
+    registry = Registry()
+    registry.counter("requests", "Requests")
+
+    with pytest.raises(ValueError):
+        registry.counter("requests", "Requests")
@@ -0,0 +1,49 @@
+import json
+
+import httpx
+import pytest
+
+from core.config import settings
+from core.profiling import ProfilingMiddleware, _authorized
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+TOKEN = "s3cret&token=+/"
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiling_token", TOKEN)
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_sample_rate", 0.0)
+    return tmp_path
+
+
+@pytest.mark.parametrize("scope, authorized", [
+    ({"headers": [(b"x-profile", TOKEN.encode())]}, True),
+    ({"query_string": str(httpx.QueryParams({"token": TOKEN})).encode()}, True),
+    ({"query_string": b"token=s3cret&token=+/"}, False),
+    ({"headers": [(b"x-profile", b"wrong")]}, False),
+    ({}, False),
+])
+def test_token_is_compared_after_query_decoding(profiling, scope, authorized):
+    assert _authorized(scope) is authorized
+
+
+async def test_requested_profiles_are_written_and_served(client, profiling):
+    pytest.importorskip("pyinstrument")
+    transport = httpx.ASGITransport(app=ProfilingMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as profiled:
+        plain = await profiled.get("/api/professors")
+        response = await profiled.get("/api/professors", headers={"x-profile": TOKEN})
+        location = response.headers["x-profile-url"]
+
+        assert "x-profile-url" not in plain.headers
+        assert (await profiled.get(location)).status_code == 403
+        download = await profiled.get(location, params={"token": TOKEN})
+
+    assert response.status_code == 200
+    assert download.status_code == 200
+    assert "speedscope" in json.loads(download.content)["$schema"]
+    assert [path.name for path in profiling.iterdir()] == [location.rsplit("/", 1)[1]]
@@ -0,0 +1,63 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from core.config import settings
+from core.query_stats import QueryStatsListener, RequestQueryStats, current_query_stats, filter_shape
+from factories import create_gig, create_professor
+
+
+@pytest.mark.anyio
+async def test_commands_are_reported_per_request(client, monkeypatch):
+    professor = await create_professor(client)
+    gig = await create_gig(client, professor["id"])
+    monkeypatch.setattr(settings, "query_stats_headers", True)
+    monkeypatch.setattr(settings, "query_budget", 0)
+
+    response = await client.get(f"/api/gigs/{gig['id']}")
+
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'queries"' in response.headers["server-timing"]
+    issued, budget = response.headers["x-query-budget-exceeded"].split("/")
+    assert int(issued) >= 1 and budget == "0"
+
+
+@pytest.mark.anyio
+async def test_headers_are_off_by_default(client):
+    response = await client.get("/health")
+
+    assert "server-timing" not in response.headers
+
+
+def test_filter_shape_keeps_fields_and_operators_only():
+    query = {"$or": [{"student_id": "abc"}, {"student_email": "x@y"}], "status": {"$in": ["a", "b"]}}
+
+    assert filter_shape(query) == {"$or": [{"student_id": "?"}, {"student_email": "?"}], "status": {"$in": ["?"]}}
+
+
+def test_slow_commands_are_logged_with_their_shape_and_counted(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_ms", 50)
+    listener = QueryStatsListener()
+    stats = RequestQueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        for request_id, micros in ((1, 80_000), (2, 1_000)):
+            command = {"find": "applications", "filter": {"student_email": "x@example.edu"}}
+            listener.started(SimpleNamespace(
+                command_name="find", connection_id=("db", 27017), request_id=request_id,
+                database_name="profhub", command=command,
+            ))
+            with caplog.at_level(logging.WARNING, logger="core.query_stats"):
+                listener.succeeded(SimpleNamespace(
+                    connection_id=("db", 27017), request_id=request_id, duration_micros=micros,
+                    reply={"cursor": {"firstBatch": [{}, {}]}},
+                ))
+    finally:
+        current_query_stats.reset(token)
+
+    assert (stats.count, stats.documents, stats.breakdown()) == (2, 4, "find x2")
+    [record] = caplog.records
+    assert "Slow find on profhub.applications" in record.getMessage()
+    assert '{"student_email": "?"}' in record.getMessage()
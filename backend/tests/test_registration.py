@@ -0,0 +1,50 @@
+import pytest
+
+from factories import create_student
+
+pytestmark = pytest.mark.anyio
+
+
+def roster_row(number: int, **fields) -> dict:
+    return {"name": f"Student {number}", "email": f"s{number}@example.edu", "reg_no": f"R{number:03d}",
+            "department": "Physics", "year": 2, "password": "secret123", **fields}
+
+
+async def test_duplicate_registration_is_rejected_by_the_unique_indexes(client):
+    await create_student(client)
+
+    same_email = await client.post("/api/students/register", json=roster_row(2, email="sam@example.edu"))
+    same_reg_no = await client.post("/api/students/register", json=roster_row(3, reg_no="R001"))
+
+    assert same_email.status_code == 400
+    assert same_email.json()["detail"] == "Email already registered"
+    assert same_reg_no.status_code == 400
+    assert same_reg_no.json()["detail"] == "Registration number already exists"
+
+
+async def test_professor_registration_rejects_a_duplicate_email(client):
+    body = {"name": "Ada", "email": "ada@example.edu", "password": "secret123", "department": "CS",
+            "qualification": "PhD"}
+    assert (await client.post("/api/auth/register", json=body)).status_code == 201
+
+    response = await client.post("/api/auth/register", json=body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+async def test_roster_import_stores_every_row_but_the_duplicates(client):
+    await create_student(client, email="s1@example.edu", reg_no="R900")
+    rows = [roster_row(1), roster_row(2), roster_row(3, reg_no="R002"), roster_row(4)]
+
+    response = await client.post("/api/students/import", json=rows)
+
+    result = response.json()
+    assert response.status_code == 200
+    assert result["inserted_count"] == 2
+    assert [(error["index"], error["detail"]) for error in result["errors"]] == [
+        (0, "Email already registered"),
+        (2, "Registration number already exists"),
+    ]
+    for student_id in result["inserted_ids"]:
+        assert (await client.get(f"/api/students/{student_id}")).status_code == 200
@@ -0,0 +1,77 @@
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from core.memory import MemoryClient
+from repositories import Repository, StudentRepository
+
+pytestmark = pytest.mark.anyio
+
+
+class Things(Repository):
+    collection_name = "things"
+
+
+@pytest.fixture
+def db():
+    return MemoryClient()["test"]
+
+
+async def test_crud_through_a_repository(db):
+    things = Things(db)
+    thing_id = await things.insert({"name": "a", "tags": ["x"]})
+
+    assert (await things.get(str(thing_id)))["name"] == "a"
+    assert await things.get("not-an-id") is None
+    assert await things.update(thing_id, {"name": "b"})
+    assert (await things.update_and_get(thing_id, {"size": 2}))["name"] == "b"
+    assert await things.delete(thing_id)
+    assert await things.get(thing_id) is None
+    assert not await things.update(thing_id, {"name": "c"})
+
+
+async def test_get_many_keeps_the_order_of_the_ids(db):
+    things = Things(db)
+    first, second = await things.insert_many([{"n": 1}, {"n": 2}])
+
+    found = await things.get_many([second, "bad", ObjectId(), first])
+
+    assert [thing and thing["n"] for thing in found] == [2, None, None, 1]
+
+
+async def test_find_sorts_skips_limits_and_projects(db):
+    things = Things(db)
+    await things.insert_many([{"n": n, "even": n % 2 == 0, "secret": "s"} for n in range(10)])
+
+    page = [thing async for thing in things.find({"even": True}, {"n": 1}, sort=[("n", -1)], skip=1, limit=2)]
+
+    assert page == [{"_id": page[0]["_id"], "n": 6}, {"_id": page[1]["_id"], "n": 4}]
+    assert await things.count({"n": {"$gte": 5}, "$or": [{"even": True}, {"n": 9}]}) == 3
+
+
+async def test_unique_indexes_reject_duplicates(db):
+    students = StudentRepository(db)
+    await db.students.create_indexes([IndexModel([("email", ASCENDING)], unique=True)])
+    await students.insert({"email": "a@example.edu"})
+
+    with pytest.raises(DuplicateKeyError) as error:
+        await students.insert({"email": "a@example.edu"})
+    with pytest.raises(BulkWriteError) as bulk:
+        await students.insert_many([{"email": "b@example.edu"}, {"email": "a@example.edu"}], ordered=False)
+
+    assert error.value.details["keyPattern"] == {"email": 1}
+    assert [e["index"] for e in bulk.value.details["writeErrors"]] == [1]
+    assert await students.by_email("b@example.edu") is not None
+
+
+async def test_update_operators_and_array_queries(db):
+    await db.things.insert_one({"_id": 1, "n": 1, "tags": ["a"], "items": [{"k": "x", "v": 1}]})
+
+    await db.things.update_one({"_id": 1}, {"$inc": {"n": 2}, "$push": {"tags": "b"}, "$unset": {"items": ""}})
+    thing = await db.things.find_one({"tags": "b", "n": {"$in": [3]}})
+
+    assert thing == {"_id": 1, "n": 3, "tags": ["a", "b"]}
+    await db.things.insert_one({"_id": 2, "items": [{"k": "x", "v": 1}, {"k": "y", "v": 5}]})
+    assert await db.things.count_documents({"items": {"$elemMatch": {"k": "y", "v": {"$gt": 4}}}}) == 1
+    assert await db.things.count_documents({"items.k": "y"}) == 1
@@ -0,0 +1,80 @@
+import io
+import zipfile
+
+import pytest
+
+from core import storage
+from core.config import settings
+
+from factories import apply, create_gig, create_professor, create_student
+
+pytestmark = pytest.mark.anyio
+
+PDF = b"%PDF-1.7 " + bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def resume_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_storage", storage.LocalStorage(str(tmp_path)))
+    return tmp_path
+
+
+async def upload(client, student_id, content=PDF, content_type="application/pdf", filename="cv.pdf"):
+    return await client.put(f"/api/students/{student_id}/resume", params={"filename": filename},
+                            content=content, headers={"content-type": content_type})
+
+
+async def test_upload_then_download_whole_and_ranged(client):
+    student = await create_student(client)
+    info = (await upload(client, student["id"])).json()
+    url = info["resume_url"]
+    assert info["size"] == len(PDF)
+
+    whole = await client.get(url)
+    assert whole.status_code == 200 and whole.content == PDF
+    etag = whole.headers["etag"]
+
+    part = await client.get(url, headers={"range": "bytes=10-19"})
+    assert part.status_code == 206
+    assert part.content == PDF[10:20]
+    assert part.headers["content-range"] == f"bytes 10-19/{len(PDF)}"
+    assert (await client.get(url, headers={"range": "bytes=-5"})).content == PDF[-5:]
+    assert (await client.get(url, headers={"range": f"bytes={len(PDF)}-"})).status_code == 416
+    # A stale If-Range validator gets the whole file
+    stale = await client.get(url, headers={"range": "bytes=0-9", "if-range": '"old"'})
+    assert stale.status_code == 200 and stale.content == PDF
+    assert (await client.get(url, headers={"if-none-match": etag})).status_code == 304
+
+
+async def test_upload_is_validated_and_replaces_the_previous_file(client, resume_directory, monkeypatch):
+    student = await create_student(client)
+    assert (await upload(client, student["id"], content_type="text/plain")).status_code == 415
+    assert (await upload(client, student["id"], content=b"")).status_code == 400
+    with monkeypatch.context() as limited:
+        limited.setattr(settings, "resume_max_bytes", 100)
+        assert (await upload(client, student["id"])).status_code == 413
+
+    first = (await upload(client, student["id"])).json()
+    second = (await upload(client, student["id"], content=b"%PDF new")).json()
+
+    assert (await client.get(second["resume_url"])).content == b"%PDF new"
+    assert not (resume_directory / first["file_id"]).exists()
+
+
+async def test_gig_zip_holds_each_applicants_resume(client):
+    professor = await create_professor(client)
+    gig = await create_gig(client, professor["id"])
+    contents = {}
+    for number in range(3):
+        student = await create_student(client, name=f"Student {number}", email=f"s{number}@example.edu",
+                                       reg_no=f"R{number}")
+        await apply(client, gig["id"], student)
+        if number < 2:
+            contents[f"Student {number} - R{number}.pdf"] = b"%PDF " + bytes([number]) * 1000
+            await upload(client, student["id"], content=contents[f"Student {number} - R{number}.pdf"])
+
+    response = await client.get(f"/api/gigs/{gig['id']}/resumes.zip")
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert {name: archive.read(name) for name in archive.namelist()} == contents
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from core.config import settings
+from core.percolator import eligible_years
+from repositories import gig_repository, student_repository
+
+from factories import create_gig, create_professor, create_student
+
+pytestmark = pytest.mark.anyio
+
+
+async def alerts(client, student_id):
+    notifications = (await client.get(f"/api/notifications/{student_id}")).json()
+    return [n["metadata"]["gig_id"] for n in notifications if n["metadata"].get("notification_type") == "saved_search_match"]
+
+
+async def test_new_gigs_alert_students_whose_searches_match(client):
+    professor = await create_professor(client)
+    student = await create_student(client)
+    saved = await client.post(f"/api/students/{student['id']}/saved-searches",
+                              json={"area_of_study": "Machine Learning", "technologies": ["PyTorch", "JAX"], "year": 3})
+    assert saved.status_code == 201, saved.text
+
+    match = await create_gig(client, professor["id"], technologies="Python, JAX", year_requirement="2nd year and above")
+    await create_gig(client, professor["id"], technologies="Python", title="No listed technology")
+    await create_gig(client, professor["id"], technologies="JAX", year_requirement="4th year only", title="Too junior")
+    await create_gig(client, professor["id"], technologies="JAX", area_of_study="Databases", title="Other area")
+
+    assert await alerts(client, student["id"]) == [match["id"]]
+
+
+async def test_each_student_keeps_at_most_the_limit_even_when_racing(client, monkeypatch):
+    monkeypatch.setattr(settings, "saved_searches_per_student", 3)
+    student = await create_student(client)
+    url = f"/api/students/{student['id']}/saved-searches"
+
+    responses = await asyncio.gather(*(client.post(url, json={"technologies": ["Rust"]}) for _ in range(6)))
+
+    assert sorted(response.status_code for response in responses) == [201] * 3 + [400] * 3
+    created = [response.json()["id"] for response in responses if response.status_code == 201]
+    assert (await client.delete(f"{url}/{created[0]}")).status_code == 204
+    assert (await client.post(url, json={"technologies": ["Rust"]})).status_code == 201
+    assert len((await client.get(url)).json()) == 3
+    assert (await student_repository.get(student["id"]))["saved_search_count"] == 3
+
+
+async def test_a_reactivated_gig_alerts_only_once(client):
+    professor = await create_professor(client)
+    student = await create_student(client)
+    await client.post(f"/api/students/{student['id']}/saved-searches", json={"technologies": ["Rust"]})
+    gig = await create_gig(client, professor["id"], technologies="Rust")
+
+    assert (await client.put(f"/api/gigs/{gig['id']}/hold", json={"paused_reason": "Funding review"})).status_code == 200
+    assert (await client.put(f"/api/gigs/{gig['id']}/activate")).status_code == 200
+
+    assert await alerts(client, student["id"]) == [gig["id"]]
+
+
+async def test_gigs_stored_before_alerts_existed_do_not_alert(client):
+    professor = await create_professor(client)
+    student = await create_student(client)
+    await client.post(f"/api/students/{student['id']}/saved-searches", json={"technologies": ["Rust"]})
+    legacy = await gig_repository.collection.insert_one({
+        "title": "Old", "description": "d", "area_of_study": "ML", "technologies": "Rust",
+        "professor_id": professor["id"], "status": "on-hold",
+    })
+
+    assert (await client.put(f"/api/gigs/{legacy.inserted_id}/activate")).status_code == 200
+
+    assert await alerts(client, student["id"]) == []
+
+
+@pytest.mark.parametrize("requirement, years", [
+    ("3rd year and above", [3, 4, 5]),
+    ("2nd-4th year", [2, 3, 4]),
+    ("up to 2nd year", [1, 2]),
+    ("3rd or 4th year", [3, 4]),
+    ("CGPA 8+", [1, 2, 3, 4, 5]),
+    (None, [1, 2, 3, 4, 5]),
+])
+def test_year_requirements_are_parsed_generously(requirement, years):
+    assert eligible_years(requirement) == years
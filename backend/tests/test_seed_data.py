@@ -0,0 +1,97 @@
+import argparse
+
+import pytest
+
+from core import database
+from core.memory import MemoryClient
+from seed_data import BulkWriter, Dataset, seed
+
+pytestmark = pytest.mark.anyio
+
+
+def generate(seed_value: int) -> dict:
+    dataset = Dataset(seed_value, professors=3, students=5, gigs_per_professor=2, applications=20)
+    documents = {
+        "professors": list(dataset.professor_documents()),
+        "students": list(dataset.student_documents()),
+        "gigs": list(dataset.gig_documents()),
+        "applications": [],
+        "notifications": [],
+    }
+    for collection, document in dataset.applications_and_notifications():
+        documents[collection].append(document)
+    # Password hashes are salted, everything else is fixed by the seed
+    for document in documents["professors"] + documents["students"]:
+        document.pop("hashed_password", None)
+        document.pop("password", None)
+    return documents
+
+
+async def test_the_dataset_depends_only_on_the_seed():
+    first, second, other = generate(7), generate(7), generate(8)
+
+    assert first == second
+    assert first["gigs"] != other["gigs"]
+
+
+async def test_documents_refer_to_generated_parents():
+    documents = generate(1)
+    professor_ids = {str(professor["_id"]) for professor in documents["professors"]}
+    student_ids = {str(student["_id"]) for student in documents["students"]}
+    gig_ids = {str(gig["_id"]) for gig in documents["gigs"]}
+
+    assert {gig["professor_id"] for gig in documents["gigs"]} <= professor_ids
+    assert {application["gig_id"] for application in documents["applications"]} <= gig_ids
+    assert {a["student_id"] for a in documents["applications"] if "student_id" in a} <= student_ids
+    assert len(documents["applications"]) == 20
+    assert all(("lsh_bands" in gig) == (gig["status"] != "closed") for gig in documents["gigs"])
+
+
+async def test_bulk_writer_counts_inserted_and_duplicate_documents():
+    db = MemoryClient()["seed"]
+    await db.things.insert_one({"_id": 3})
+    writer = BulkWriter(db, batch_size=4, workers=2)
+
+    for number in range(10):
+        await writer.add("things", {"_id": number})
+    await writer.flush()
+
+    assert writer.inserted == {"things": 9}
+    assert writer.errors == {"things": 1}
+    assert await db.things.count_documents({}) == 10
+
+
+async def test_seeded_data_is_served_by_the_app(client):
+    db = database.get_database_handle()
+    dataset = Dataset(5, professors=4, students=4, gigs_per_professor=3, applications=10)
+    writer = BulkWriter(db, batch_size=100, workers=1)
+    for collection, documents in (
+        ("professors", dataset.professor_documents()),
+        ("students", dataset.student_documents()),
+        ("gigs", dataset.gig_documents()),
+    ):
+        for document in documents:
+            await writer.add(collection, document)
+    await writer.flush()
+    professor = await db.professors.find_one({})
+    open_gig = await db.gigs.find_one({"status": "open"})
+
+    directory = await client.get("/api/professors")
+    search = await client.get("/api/professors", params={"q": professor["search_terms"][0]})
+    similar = await client.get(f"/api/gigs/{open_gig['_id']}/similar")
+
+    assert len(directory.json()) == 4
+    assert str(professor["_id"]) in [found["id"] for found in search.json()]
+    assert similar.status_code == 200
+
+
+async def test_seed_cli_loads_and_indexes(capsys):
+    args = argparse.Namespace(
+        seed=1, professors=2, students=3, gigs_per_professor=2, applications=5, batch_size=10, workers=2,
+        drop=True, indexes_first=False, mongodb_url="memory://", database="seed_cli", progress_interval=60,
+    )
+
+    await seed(args)
+
+    output = capsys.readouterr().out
+    assert "Loaded" in output and "Built indexes" in output
@@ -0,0 +1,67 @@
+import pytest
+from bson import ObjectId
+
+from core.fixtures import AREAS, VOCABULARY
+from core.similarity import band_keys, features, signature
+
+from factories import create_gig, create_professor
+
+pytestmark = pytest.mark.anyio
+
+DESCRIPTION = ("We study scalable robust learning models for large graphs with a focus on latency and privacy; "
+               "students will design and evaluate prototype systems")
+
+
+async def titles(client, gig_id, **params):
+    response = await client.get(f"/api/gigs/{gig_id}/similar", params=params)
+    assert response.status_code == 200, response.text
+    return [gig["title"] for gig in response.json()]
+
+
+@pytest.fixture
+async def gigs(client):
+    professor_id = (await create_professor(client))["id"]
+    words = sorted(VOCABULARY)
+    created = {}
+    for title, description, area, technologies in [
+        ("Graphs", DESCRIPTION, "Machine Learning", "Python, PyTorch"),
+        ("Graphs again", DESCRIPTION.replace("privacy", "fairness"), "Machine Learning", "PyTorch, Python"),
+        ("Graphs in Rust", DESCRIPTION + " energy memory", "Machine Learning", "Rust"),
+        ("Unrelated", " ".join(words[:40]), AREAS[-1], "Fortran"),
+    ]:
+        created[title] = await create_gig(client, professor_id, title=title, description=description,
+                                          area_of_study=area, technologies=technologies)
+    return created
+
+
+async def test_similar_gigs_are_ranked_by_shared_bands(client, gigs):
+    similar = await titles(client, gigs["Graphs"]["id"])
+
+    assert similar[0] == "Graphs again"
+    assert "Graphs" not in similar and "Unrelated" not in similar
+    assert len(await titles(client, gigs["Graphs"]["id"], limit=1)) == 1
+
+
+async def test_closed_and_edited_gigs_drop_out(client, gigs):
+    closed = await client.put(f"/api/gigs/{gigs['Graphs again']['id']}/close", json={})
+    edited = await client.put(f"/api/gigs/{gigs['Graphs in Rust']['id']}",
+                              json={"description": "Sensors and actuators for legged robots", "area_of_study": "Robotics"})
+    assert closed.status_code == edited.status_code == 200
+
+    assert await titles(client, gigs["Graphs"]["id"]) == []
+
+
+async def test_unknown_and_invalid_gigs(client):
+    assert (await client.get(f"/api/gigs/{ObjectId()}/similar")).status_code == 404
+    assert (await client.get("/api/gigs/not-an-id/similar")).status_code == 400
+
+
+def test_near_duplicates_share_more_band_keys_than_unrelated_gigs():
+    gig = {"description": DESCRIPTION, "area_of_study": "Machine Learning", "technologies": "Python"}
+    near = {**gig, "description": DESCRIPTION.replace("privacy", "fairness")}
+    far = {"description": "Sensors and actuators for legged robots", "area_of_study": "Robotics"}
+
+    keys = set(band_keys(gig))
+    assert len(keys & set(band_keys(near))) > len(keys & set(band_keys(far)))
+    assert signature(features(gig)) == signature(features(dict(gig)))
+    assert band_keys({}) == []
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from core.singleflight import SingleFlight
+
+from factories import create_gig, create_professor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+    release = asyncio.Event()
+
+    async def query():
+        calls.append(1)
+        await release.wait()
+        return b"body"
+
+    waiting = [asyncio.ensure_future(flight.do("key", query)) for _ in range(5)]
+    other = asyncio.ensure_future(flight.do("other", query))
+    await asyncio.sleep(0)
+    assert flight.in_flight == 2
+    release.set()
+
+    assert await asyncio.gather(*waiting, other) == [b"body"] * 6
+    assert len(calls) == 2
+    await asyncio.sleep(0)
+    assert flight.in_flight == 0
+
+
+async def test_a_later_call_runs_again():
+    flight = SingleFlight("test")
+    results = iter([1, 2])
+
+    async def query():
+        return next(results)
+
+    assert await flight.do("key", query) == 1
+    await asyncio.sleep(0)
+    assert await flight.do("key", query) == 2
+
+
+async def test_errors_are_shared():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def query():
+        await release.wait()
+        raise HTTPException(status_code=404, detail="Gig not found")
+
+    waiting = [asyncio.ensure_future(flight.do("key", query)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiting, return_exceptions=True)
+    assert [result.status_code for result in results] == [404] * 3
+
+
+async def test_a_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def query():
+        await release.wait()
+        return "done"
+
+    leader = asyncio.ensure_future(flight.do("key", query))
+    follower = asyncio.ensure_future(flight.do("key", query))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    assert await follower == "done"
+    assert leader.cancelled()
+
+
+async def test_concurrent_gig_reads_return_the_same_body(client):
+    gig = await create_gig(client, (await create_professor(client))["id"])
+
+    responses = await asyncio.gather(*(client.get(f"/api/gigs/{gig['id']}") for _ in range(5)))
+
+    assert {response.content for response in responses} == {responses[0].content}
+    assert responses[0].json()["title"] == gig["title"]
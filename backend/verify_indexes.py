@@ -0,0 +1,218 @@
+"""
+Verify that every router query shape is served by an index from the manifest
+
+    cd backend
+    python verify_indexes.py                       # explain() against a seeded scratch database
+    python verify_indexes.py --static              # no server: check shapes against the manifest
+
+With a MongoDB server, the manifest (core/indexes.py) is applied to a scratch database
+seeded with synthetic data, and each shape in QUERY_SHAPES is run through explain().
+A winning plan containing a COLLSCAN (outside shapes marked full_scan) or a blocking SORT
+stage fails the check, and a shape with a hint must also use the index its repository
+forces. --static applies the same rules by matching each shape against the manifest's key
+patterns (equality fields as an index prefix, then the sort keys, then range fields),
+which also works without a server and in CI.
+
+Exits with status 1 if any shape fails.
+"""
+import argparse
+import asyncio
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+from bson import SON
+from pymongo.errors import PyMongoError
+
+from core.config import settings
+from core.database import create_client
+from core.indexes import INDEXES, QUERY_SHAPES, QueryShape, ensure_indexes
+from core.memory import is_memory_url
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$exists", "$regex"}
+
+
+def plan_stages(plan: dict) -> Iterator[dict]:
+    """Every stage of an explain plan tree"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan
+        for value in plan.values():
+            if isinstance(value, (dict, list)):
+                yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+def judge(shape: QueryShape, stages: List[dict]) -> Tuple[bool, str]:
+    names = [stage["stage"] for stage in stages]
+    indexes = sorted({stage["indexName"] for stage in stages if "indexName" in stage})
+    summary = " > ".join(dict.fromkeys(names)) + (f" using {', '.join(indexes)}" if indexes else "")
+    if "COLLSCAN" in names and not shape.full_scan:
+        return False, f"COLLSCAN ({summary})"
+    if shape.hint and shape.hint not in indexes:
+        return False, f"hinted index {shape.hint} not used ({summary})"
+    if "SORT" in names:
+        return False, f"in-memory SORT ({summary})"
+    return True, summary
+
+
+async def explain(db, shape: QueryShape) -> Tuple[bool, str]:
+    command = SON([("find", shape.collection), ("filter", shape.filter)])
+    if shape.sort:
+        command["sort"] = SON(shape.sort)
+    if shape.hint:
+        command["hint"] = shape.hint
+    result = await db.command(SON([("explain", command), ("verbosity", "queryPlanner")]))
+    return judge(shape, list(plan_stages(result["queryPlanner"]["winningPlan"])))
+
+
+def _split(filter: dict) -> Tuple[set, set]:
+    equality, ranges = set(), set()
+    for field, condition in filter.items():
+        if field == "$and":
+            for clause in condition:
+                clause_equality, clause_ranges = _split(clause)
+                equality |= clause_equality
+                ranges |= clause_ranges
+            continue
+        if field.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(op in RANGE_OPERATORS for op in condition):
+            ranges.add(field)
+        else:
+            equality.add(field)  # plain values, $eq and $in all seek the index
+    return equality, ranges
+
+
+def _index_serves(keys: List[Tuple[str, int]], filter: dict, sort: Optional[List[Tuple[str, int]]]) -> int:
+    """Length of the equality prefix `keys` offers for the shape, 0 when it cannot serve it"""
+    equality, ranges = _split(filter)
+    position = 0
+    while position < len(keys) and keys[position][0] in equality:
+        position += 1
+    if position == 0 and keys[0][0] not in ranges:
+        # A walk of an index whose leading key is unconstrained serves an unfiltered sort, or
+        # a sort whose range fields come after it in the index and are matched there
+        after_sort = {field for field, _ in keys[len(sort or ()):]}
+        if not sort or equality or not ranges <= after_sort:
+            return 0
+    score = max(position, 1)
+    if not sort:
+        return score
+    following = keys[position:position + len(sort)]
+    if [field for field, _ in following] != [field for field, _ in sort]:
+        return 0
+    same = all(direction == wanted for (_, direction), (_, wanted) in zip(following, sort))
+    reversed_ = all(direction == -wanted for (_, direction), (_, wanted) in zip(following, sort))
+    return score if same or reversed_ else 0
+
+
+def _index_name(keys: List[Tuple[str, int]]) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def static_check(shape: QueryShape) -> Tuple[bool, str]:
+    if shape.full_scan:
+        return True, "full scan by design"
+    key_patterns = [list(index.document["key"].items()) for index in INDEXES.get(shape.collection, [])]
+
+    def served_by(filter: dict, sort) -> Optional[str]:
+        # Prefer the index with the longest equality prefix, as the planner would
+        score, keys = max(((_index_serves(keys, filter, sort), keys) for keys in key_patterns),
+                          key=lambda candidate: candidate[0], default=(0, None))
+        return _index_name(keys) if score else None
+
+    if "$or" in shape.filter:
+        names = [served_by(clause, None) for clause in shape.filter["$or"]]
+        if None in names:
+            return False, "COLLSCAN: an $or branch has no index"
+        if shape.sort:
+            return False, "in-memory SORT: $or with sort"
+        return True, f"OR of {', '.join(names)}"
+
+    if shape.hint:
+        hinted = [keys for keys in key_patterns if _index_name(keys) == shape.hint]
+        if not hinted:
+            return False, f"hinted index {shape.hint} is not in the manifest"
+        if _index_serves(hinted[0], shape.filter, shape.sort):
+            return True, f"IXSCAN using {shape.hint} (hinted)"
+        if _index_serves(hinted[0], shape.filter, None):
+            return False, f"in-memory SORT: hinted index {shape.hint} does not provide the sort order"
+        return False, f"COLLSCAN: hinted index {shape.hint} has no prefix on the filtered fields"
+
+    name = served_by(shape.filter, shape.sort)
+    if name:
+        return True, f"IXSCAN using {name}"
+    if served_by(shape.filter, None):
+        return False, "in-memory SORT: no index provides the sort order"
+    return False, "COLLSCAN: no index has a prefix on the filtered fields"
+
+
+async def seed_scratch(db, args):
+    """Load a small synthetic dataset so the planner has real data to choose plans against"""
+    from seed_data import COLLECTIONS, BulkWriter, Dataset
+
+    for name in COLLECTIONS:
+        await db.drop_collection(name)
+    await ensure_indexes(db)
+    dataset = Dataset(args.seed, args.professors, args.professors * 20, 5, args.professors * 100)
+    writer = BulkWriter(db, 1000, 4)
+    for name, documents in (
+        ("professors", dataset.professor_documents()),
+        ("students", dataset.student_documents()),
+        ("gigs", dataset.gig_documents()),
+    ):
+        for document in documents:
+            await writer.add(name, document)
+    for name, document in dataset.applications_and_notifications():
+        await writer.add(name, document)
+    await writer.flush()
+    return sum(writer.inserted.values())
+
+
+async def verify(args) -> int:
+    if args.mongodb_url:
+        settings.mongodb_url = args.mongodb_url
+    static = args.static or is_memory_url(settings.mongodb_url)
+
+    if static:
+        print("Checking query shapes against the index manifest (static)\n")
+        results = [(shape, static_check(shape)) for shape in QUERY_SHAPES]
+    else:
+        client = create_client()
+        db = client[args.database]
+        try:
+            await client.admin.command("ping")
+        except PyMongoError as e:
+            print(f"✗ Failed to connect to MongoDB at {settings.mongodb_url}: {e}")
+            print("  Use --static to check against the manifest without a server")
+            return 1
+        inserted = await seed_scratch(db, args)
+        print(f"Seeded {inserted:,} documents into '{args.database}'; explaining query shapes\n")
+        results = [(shape, await explain(db, shape)) for shape in QUERY_SHAPES]
+        if not args.keep:
+            await client.drop_database(args.database)
+        client.close()
+
+    failures = 0
+    for shape, (ok, detail) in results:
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} {shape.collection:<14} {shape.name:<44} {detail}")
+    print(f"\n{len(results) - failures}/{len(results)} query shapes served by indexes")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check router query shapes against the index manifest")
+    parser.add_argument("--static", action="store_true", help="check key patterns only, no server needed")
+    parser.add_argument("--mongodb-url", help=f"default: {settings.mongodb_url}")
+    parser.add_argument("--database", default="profhub_verify_indexes", help="scratch database (dropped after)")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    parser.add_argument("--professors", type=int, default=50, help="seed size (students x20, applications x100)")
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(asyncio.run(verify(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()